@@ -0,0 +1,86 @@
+"""
+Measures compile time of C++ practice harnesses: the prelude parsed from
+source on every compile (how /api/practice/verify used to work) against
+compiles that pick up the precompiled prelude, for each compile profile.
+
+Every run compiles a harness with different arguments, so nothing is
+served from the compile cache.
+
+Usage:
+    python bench_cpp_compile.py --runs 10
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+from src.cpp_prelude import COMPILER, COMPILE_PROFILES, HARNESS_STD, HEADER_NAME, PRELUDE, Prelude
+
+SOLUTION = """class Solution {
+public:
+  vector<int> twoSum(vector<int>& nums, int target) {
+    unordered_map<int, int> seen;
+    for (int i = 0; i < (int)nums.size(); i++) {
+      if (seen.count(target - nums[i])) return {seen[target - nums[i]], i};
+      seen[nums[i]] = i;
+    }
+    return {};
+  }
+};
+"""
+
+
+def _harness(n, inline):
+    prelude = PRELUDE if inline else f'#include "{HEADER_NAME}"\n'
+    return (f"{prelude}\n{SOLUTION}\nint main() {{\n  vector<int> arg0 = {{2, 7, {n + 100}, 15}};\n  int arg1 = {n + 107};\n"
+            f"  Solution sol;\n  auto result = sol.twoSum(arg0, arg1);\n  voxcoder_print_result(result);\n  return 0;\n}}\n")
+
+
+def _measure(workdir, command, inline, runs):
+    latencies = []
+    for n in range(runs):
+        source = os.path.join(workdir, "practice_harness.cpp")
+        with open(source, "w") as f:
+            f.write(_harness(n, inline))
+        start = time.perf_counter()
+        result = subprocess.run(command + ["-o", os.path.join(workdir, "harness"), source],
+                                capture_output=True, text=True, timeout=60)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert result.returncode == 0, result.stderr
+        output = subprocess.run([os.path.join(workdir, "harness")], capture_output=True, text=True).stdout
+        assert output == "[1,2]", output
+    latencies.sort()
+    return statistics.median(latencies), latencies[round(0.95 * (len(latencies) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    if shutil.which(COMPILER) is None:
+        parser.error(f"{COMPILER} not found")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        prelude = Prelude(os.path.join(workdir, "pch"))
+        no_pch = Prelude(os.path.join(workdir, "no-pch"))  # header only, never precompiled
+        for profile in COMPILE_PROFILES:
+            prelude.build(profile)
+        rows = [("before (inline prelude)", [COMPILER, HARNESS_STD], True)]
+        for profile in COMPILE_PROFILES:
+            rows.append((f"{profile}, no pch", no_pch.compile_command(profile), False))
+            rows.append((f"{profile}, pch", prelude.compile_command(profile), False))
+
+        print(f"\n📊 C++ harness compile time, {args.runs} run(s) each")
+        print(f"{'configuration':<24} {'p50 ms':>8} {'p95 ms':>8} {'speedup':>8}")
+        baseline = None
+        for name, command, inline in rows:
+            p50, p95 = _measure(workdir, command, inline, args.runs)
+            baseline = baseline or p50
+            print(f"{name:<24} {p50:>8.0f} {p95:>8.0f} {baseline / p50:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmarks the Whisper decode profiles on a fixture set.
+
+A fixture set is a directory of clips with matching transcripts:
+
+    fixtures/voice/add_loop.wav
+    fixtures/voice/add_loop.txt    <- reference text
+
+Without a fixture set, --synthetic generates speech-like clips instead
+(voiced harmonics under a syllable-rate envelope). They have no reference
+text, so only latency is reported. --random-weights builds the model
+architecture with random weights for hosts that cannot download the
+checkpoint; latency then reflects the architecture, not real transcripts.
+
+Usage:
+    python bench_decode_profiles.py --fixtures fixtures/voice --model base
+    python bench_decode_profiles.py --synthetic 5 --model base
+"""
+import argparse
+import glob
+import os
+import re
+import statistics
+import time
+
+import numpy as np
+import torch
+import whisper
+
+import src.transcriber as transcriber
+from src.audio_ingest import decode_audio_bytes, trim_silence
+from src.transcriber import DECODE_PROFILES, ModelRegistry, transcribe_audio
+
+SAMPLE_RATE = 16000
+
+# Published architectures, for --random-weights
+MODEL_DIMS = {
+    "tiny": dict(n_audio_state=384, n_audio_head=6, n_audio_layer=4, n_text_state=384, n_text_head=6, n_text_layer=4),
+    "base": dict(n_audio_state=512, n_audio_head=8, n_audio_layer=6, n_text_state=512, n_text_head=8, n_text_layer=6),
+    "small": dict(n_audio_state=768, n_audio_head=12, n_audio_layer=12, n_text_state=768, n_text_head=12,
+                  n_text_layer=12),
+}
+
+
+def _words(text):
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level Levenshtein distance divided by the reference length."""
+    ref, hyp = _words(reference), _words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        cur = [i]
+        for j, h in enumerate(hyp, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h)))
+        prev = cur
+    return prev[-1] / len(ref)
+
+
+def load_fixtures(directory):
+    fixtures = []
+    for wav in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        txt = os.path.splitext(wav)[0] + ".txt"
+        if not os.path.exists(txt):
+            continue
+        with open(wav, "rb") as f:
+            audio = trim_silence(decode_audio_bytes(f.read()))
+        with open(txt, "r") as f:
+            fixtures.append((os.path.basename(wav), audio, f.read().strip()))
+    return fixtures
+
+
+def synthetic_fixtures(count, seconds=4.0, seed=0):
+    """Speech-like clips with no reference text (None), for hosts without a fixture set."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    fixtures = []
+    for i in range(count):
+        pitch = 100 + 80 * rng.random() + 20 * np.sin(2 * np.pi * 0.5 * t)
+        phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 10))
+        syllables = np.clip(np.sin(2 * np.pi * (3 + 2 * rng.random()) * t + 6 * rng.random()), 0, None)
+        audio = 0.1 * voiced * syllables + 0.005 * rng.standard_normal(t.size)
+        fixtures.append((f"synthetic_{i}", audio.astype(np.float32), None))
+    return fixtures
+
+
+def random_model(model_size):
+    """model_size's architecture with random weights (no checkpoint download)."""
+    torch.manual_seed(0)
+    dims = whisper.model.ModelDimensions(n_mels=80, n_audio_ctx=1500, n_vocab=51865, n_text_ctx=448,
+                                         **MODEL_DIMS[model_size])
+    return whisper.model.Whisper(dims).eval()
+
+
+def fixture_args(parser):
+    parser.add_argument("--fixtures", default="fixtures/voice")
+    parser.add_argument("--synthetic", type=int, default=0, help="use N synthetic clips instead of --fixtures")
+    parser.add_argument("--random-weights", action="store_true", help="random weights instead of the checkpoint")
+
+
+def load_args_fixtures(args):
+    return synthetic_fixtures(args.synthetic) if args.synthetic else load_fixtures(args.fixtures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    fixture_args(parser)
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--profiles", default=",".join(DECODE_PROFILES))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    if args.random_weights:
+        transcriber.registry = ModelRegistry(loader=random_model)
+
+    fixtures = load_args_fixtures(args)
+    if not fixtures:
+        print(f"❌ No .wav/.txt pairs found in {args.fixtures}")
+        return
+
+    # Warm the model so the first profile doesn't pay for loading it
+    transcribe_audio(fixtures[0][1], args.model)
+
+    rows = []
+    for profile in args.profiles.split(","):
+        latencies, errors = [], []
+        for name, audio, reference in fixtures:
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                text = transcribe_audio(audio, args.model, profile)
+                latencies.append((time.perf_counter() - start) * 1000)
+            if reference is not None:
+                errors.append(word_error_rate(reference, text))
+        latencies.sort()
+        rows.append((
+            profile,
+            statistics.mean(latencies),
+            latencies[round(0.95 * (len(latencies) - 1))],
+            f"{statistics.mean(errors) * 100:.1f}" if errors else "n/a",
+        ))
+
+    weights = " (random weights)" if args.random_weights else ""
+    print(f"\n📊 Whisper '{args.model}'{weights} on {len(fixtures)} clip(s), {args.repeat} run(s) each")
+    print(f"{'profile':<10} {'mean ms':>10} {'p95 ms':>10} {'WER %':>8}")
+    for profile, mean_ms, p95_ms, wer in rows:
+        print(f"{profile:<10} {mean_ms:>10.0f} {p95_ms:>10.0f} {wer:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Load-tests the LLM request paths against the local LLM stub, offline.
+
+Starts src.llm_stub in-process, points LLM_BACKEND at it and drives the
+server's own code paths concurrently: code edits (generate_code, as a voice
+command runs it), /api/debug_practice, /api/stream/debug_practice and test
+case generation. Every request bypasses the LLM cache so each one reaches
+the stub; rate limits are off unless --rpm/--tpm are given.
+
+Usage:
+    python bench_llm_backend.py --requests 200 --concurrency 16
+    python bench_llm_backend.py --latency-ms 300 --tokens-per-s 300 --error-rate 0.05 --error-status 429,503
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.llm_stub import start_stub
+
+EDIT_CODE = "".join(f"def helper_{i}(x):\n    y = x + {i}\n    return y * 2\n\n\n" for i in range(30))
+BUGGY_CODE = "def two_sum(nums, target):\n    for i in range(len(nums)):\n        for j in range(i, len(nums)):\n" \
+             "            if nums[i] + nums[j] == target:\n                return [i, j]\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenarios", default="edit,debug,stream,test_cases")
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--tokens-per-s", type=float, default=500)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", default="503")
+    parser.add_argument("--rpm", default="0", help="LLM_RATE_RPM for the scheduler (0 = unlimited)")
+    parser.add_argument("--tpm", default="0", help="LLM_RATE_TPM for the scheduler (0 = unlimited)")
+    args = parser.parse_args()
+
+    stub, url = start_stub(latency_ms=args.latency_ms, tokens_per_s=args.tokens_per_s,
+                           error_rate=args.error_rate, error_status=args.error_status)
+    os.environ.update(LLM_BACKEND="stub", LLM_STUB_URL=url, LLM_CACHE_DB="",
+                      LLM_RATE_RPM=args.rpm, LLM_RATE_TPM=args.tpm)
+    import server  # reads the environment above at import time
+    from src.llm_engine import generate_code
+
+    client = server.app.test_client()
+
+    def edit(i):
+        code = generate_code(f"make helper_{i % 30} return y * {i}", EDIT_CODE, bypass_cache=True)
+        return not code.startswith("# Error"), None
+
+    def debug(i):
+        r = client.post("/api/debug_practice", json={"code": BUGGY_CODE, "error": f"run {i}", "bypass_cache": "1"})
+        return r.status_code == 200 and "fixed_code" in r.get_json(), None
+
+    def stream(i):
+        r = client.post("/api/stream/debug_practice",
+                        json={"code": BUGGY_CODE, "error": f"run {i}", "bypass_cache": "1"})
+        done = json.loads(r.data.decode().rsplit("data: ", 1)[1])
+        return done.get("fixed_code") is not None and not r.data.startswith(b"event: error"), done["first_token_ms"]
+
+    def test_cases(i):
+        cases = server.generate_test_cases_ai(f"Problem {i}", "Return the indices.",
+                                              "def twoSum(self, nums, target):", bypass_cache=True)
+        return len(cases) == 4, None
+
+    scenarios = {"edit": edit, "debug": debug, "stream": stream, "test_cases": test_cases}
+
+    print(f"\n📊 LLM stub: {args.latency_ms:g} ms to first token, {args.tokens_per_s:g} tokens/s, "
+          f"{args.error_rate:.0%} errors; {args.requests} requests x {args.concurrency} concurrent")
+    print(f"{'scenario':<12} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'ttft ms':>8} {'failed':>7}")
+    for name in args.scenarios.split(","):
+        run = scenarios[name]
+
+        def timed(i):
+            start = time.perf_counter()
+            ok, first_token_ms = run(i)
+            return (time.perf_counter() - start) * 1000, ok, first_token_ms
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as executor:
+            results = list(executor.map(timed, range(args.requests)))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(ms for ms, _, _ in results)
+        first_tokens = [ft for _, _, ft in results if ft is not None]
+        ttft = f"{statistics.median(first_tokens):>8.0f}" if first_tokens else f"{'-':>8}"
+        print(f"{name:<12} {len(results) / elapsed:>8.1f} {statistics.median(latencies):>8.0f} "
+              f"{latencies[round(0.95 * (len(latencies) - 1))]:>8.0f} {ttft} "
+              f"{sum(not ok for _, ok, _ in results):>7}")
+
+    print(f"\nstub: {stub.config.stats}")
+    print(f"scheduler: {json.dumps(server.llm_scheduler.stats())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Compares per-run latency of Python scripts started cold (`python script.py`,
+what /api/run used to do) against children forked from the warm zygote.
+
+Usage:
+    python bench_python_run.py --runs 50
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+
+from src.fork_server import ForkServer
+
+SCRIPTS = {
+    "hello": "print('hello')\n",
+    "stdin_sum": "import sys\nprint(sum(int(x) for x in sys.stdin.read().split()))\n",
+    "stdlib": "import collections, heapq, json, re\n"
+              "words = re.findall(r'\\w+', 'the quick brown fox jumps over the lazy dog the end')\n"
+              "print(json.dumps(heapq.nlargest(3, collections.Counter(words).items(), key=lambda kv: kv[1])))\n",
+    "compute": "print(sum(i * i for i in range(300000)))\n",
+}
+STDIN = " ".join(str(i) for i in range(1000))
+
+
+def _measure(run, runs):
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.median(latencies), latencies[round(0.95 * (len(latencies) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--python", default="python")
+    args = parser.parse_args()
+
+    forkserver = ForkServer(python=args.python)
+    forkserver.run(os.devnull)  # start the zygote outside the measurements
+
+    print(f"\n📊 Python script start-up, {args.runs} run(s) each")
+    print(f"{'script':<10} {'cold p50':>9} {'cold p95':>9} {'warm p50':>9} {'warm p95':>9} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, source in SCRIPTS.items():
+            path = os.path.join(workdir, f"{name}.py")
+            with open(path, "w") as f:
+                f.write(source)
+
+            def cold():
+                return subprocess.run([args.python, path], input=STDIN, capture_output=True, text=True, timeout=10)
+
+            def warm():
+                return forkserver.run(path, input=STDIN, timeout=10)
+
+            assert cold().stdout == warm().stdout, f"{name}: outputs differ"
+            cold_p50, cold_p95 = _measure(cold, args.runs)
+            warm_p50, warm_p95 = _measure(warm, args.runs)
+            print(f"{name:<10} {cold_p50:>9.1f} {cold_p95:>9.1f} {warm_p50:>9.1f} {warm_p95:>9.1f} "
+                  f"{cold_p50 / warm_p50:>7.1f}x")
+    forkserver.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Compares the fp32 and int8 dynamically quantized Whisper models on CPU.
+
+Reports decode latency, resident weight memory, the process RSS growth
+caused by loading each variant, and how closely the int8 transcripts agree
+with fp32 (word error rate of int8 against fp32, and exact matches).
+
+--synthetic and --random-weights work as in bench_decode_profiles.py; with
+synthetic clips there is no reference text, so WER is not reported.
+
+Usage:
+    python bench_quantization.py --fixtures fixtures/voice --model base
+    python bench_quantization.py --synthetic 5 --model base --random-weights
+"""
+import argparse
+import gc
+import statistics
+import time
+
+from bench_decode_profiles import fixture_args, load_args_fixtures, random_model, word_error_rate
+from src.transcriber import _model_nbytes, decode_options, load_model, quantize_int8
+
+
+def _rss_mb():
+    """Current resident set size of this process (Linux), in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except OSError:
+        return float("nan")
+    import resource
+    return pages * resource.getpagesize() / 2**20
+
+
+def _load(model_size, quantize, random_weights):
+    if not random_weights:
+        return load_model(model_size, quantize=quantize)
+    model = random_model(model_size)
+    return quantize_int8(model) if quantize == "int8" else model
+
+
+def run_variant(model_size, quantize, fixtures, profile, repeat, random_weights=False):
+    gc.collect()
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    model = _load(model_size, quantize, random_weights)
+    load_s = time.perf_counter() - start
+    rss_growth = _rss_mb() - rss_before
+
+    options = decode_options(profile, model)
+    model.transcribe(fixtures[0][1], **options)  # warm-up
+
+    latencies, texts = [], []
+    for _, audio, _ in fixtures:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            text = model.transcribe(audio, **options)["text"].strip()
+            latencies.append((time.perf_counter() - t0) * 1000)
+        texts.append(text)
+
+    stats = {
+        "load_s": load_s,
+        "weights_mb": _model_nbytes(model) / 2**20,
+        "rss_growth_mb": rss_growth,
+        "mean_ms": statistics.mean(latencies),
+        "p95_ms": sorted(latencies)[round(0.95 * (len(latencies) - 1))],
+    }
+    del model
+    gc.collect()
+    return stats, texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    fixture_args(parser)
+    parser.add_argument("--model", default="base")
+    parser.add_argument("--profile", default="fast")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    fixtures = load_args_fixtures(args)
+    if not fixtures:
+        print(f"❌ No .wav/.txt pairs found in {args.fixtures}")
+        return
+
+    fp32, fp32_texts = run_variant(args.model, "", fixtures, args.profile, args.repeat, args.random_weights)
+    int8, int8_texts = run_variant(args.model, "int8", fixtures, args.profile, args.repeat, args.random_weights)
+
+    agreement_wer = statistics.mean(word_error_rate(a, b) for a, b in zip(fp32_texts, int8_texts)) * 100
+    exact = sum(a == b for a, b in zip(fp32_texts, int8_texts))
+    references = [ref for _, _, ref in fixtures]
+    ref_wer = {
+        name: f"{statistics.mean(word_error_rate(ref, t) for ref, t in zip(references, texts)) * 100:.1f}"
+        if None not in references else "n/a"
+        for name, texts in (("fp32", fp32_texts), ("int8", int8_texts))
+    }
+
+    weights = ", random weights" if args.random_weights else ""
+    print(f"\n📊 Whisper '{args.model}' ({args.profile} profile{weights}) on {len(fixtures)} clip(s), {args.repeat} run(s) each")
+    print(f"{'variant':<8} {'load s':>8} {'weights MB':>11} {'RSS +MB':>9} {'mean ms':>9} {'p95 ms':>9} {'WER %':>7}")
+    for name, s in (("fp32", fp32), ("int8", int8)):
+        print(f"{name:<8} {s['load_s']:>8.1f} {s['weights_mb']:>11.0f} {s['rss_growth_mb']:>9.0f} "
+              f"{s['mean_ms']:>9.0f} {s['p95_ms']:>9.0f} {ref_wer[name]:>7}")
+    print(f"\nint8 vs fp32: {exact}/{len(fixtures)} identical transcripts, {agreement_wer:.1f}% word disagreement")
+    print(f"speed-up: {fp32['mean_ms'] / int8['mean_ms']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
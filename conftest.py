@@ -0,0 +1,19 @@
+import pytest
+
+from src import llm_engine
+from src.llm_cache import LLMCache
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """
+    Isolates llm_engine for one test: an in-memory cache, a dummy API key and,
+    when given, chat as the model. Call it with the fake chat function.
+    """
+    def install(chat=None):
+        if chat is not None:
+            monkeypatch.setattr(llm_engine, "chat_completion", chat)
+        monkeypatch.setattr(llm_engine, "api_key", lambda: "test-key")
+        monkeypatch.setattr(llm_engine, "llm_cache", LLMCache(db_path=""))
+
+    return install
@@ -1,5 +1,5 @@
-from src.audio_recorder import record_audio
-from src.transcriber import transcribe_audio
+from src.audio_recorder import StreamingRecorder
+from src.streaming import transcribe_chunks
 import os
 
 def main():
@@ -9,12 +9,11 @@ def main():
 
     # Step 1: Record Voice
     print("--- Phase 1: Voice to Text ---")
-    input("Press Enter to start recording (5 seconds)...")
+    input("Press Enter and start speaking (recording stops when you go quiet)...")
     
-    audio_file = record_audio(duration=5)
-    
-    # Step 2: Transcribe
-    text = transcribe_audio(audio_file)
+    # Step 2: Transcribe (runs while you are still speaking)
+    recorder = StreamingRecorder()
+    text = transcribe_chunks(recorder.chunks(), on_partial=lambda p: print(f"   … {p}"))
     
     print("\n--- RESULT ---")
     print(f"You said: {text}")
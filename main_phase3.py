@@ -1,5 +1,5 @@
-from src.audio_recorder import record_audio
-from src.transcriber import transcribe_audio
+from src.audio_recorder import StreamingRecorder
+from src.streaming import transcribe_chunks
 from src.llm_engine import generate_code
 import os
 
@@ -13,11 +13,11 @@ def main():
     print("=======================================")
     
     # 2. Record
-    input("Press Enter to record your instruction (5s)...")
-    audio_file = record_audio(duration=5)
+    input("Press Enter and speak your instruction (stops when you go quiet)...")
+    recorder = StreamingRecorder()
     
-    # 3. Transcribe (The Ear)
-    english_text = transcribe_audio(audio_file)
+    # 3. Transcribe (The Ear) - decoding overlaps with recording
+    english_text = transcribe_chunks(recorder.chunks(), on_partial=lambda p: print(f"   … {p}"))
     print(f"\n🗣️  You said: {english_text}")
     
     if not english_text:
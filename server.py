@@ -1,12 +1,38 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 from flask_cors import CORS
 import os
 import subprocess
 import json
 import textwrap
+import time
+import asyncio
+import select
+import socket
 import requests
-from src.llm_engine import generate_code
-from src.transcriber import transcribe_audio
+from src.llm_engine import generate_code, stream_code, clean_code, edit_stats, code_cache_key
+from src import llm_client
+from src.llm_client import LLMError, chat_completion, stream_chat_completion, strip_markdown_fences
+from src.json_stream import JSONFieldStreamer, parse_streamed_object
+from src.llm_cache import llm_cache, response_key
+from src.single_flight import SingleFlight, llm_flight
+from src.llm_scheduler import llm_scheduler
+from src.voice_pipeline import pipeline as voice_pipeline, StageTimeout, Superseded, ClientDisconnected
+from src.voice_pipeline import STAGE_TIMEOUTS as VOICE_STAGE_TIMEOUTS
+from src.speculation import speculator, SPECULATE
+from src.fork_server import python_forkserver, ZygoteUnavailable, FORK_SERVER
+from src.compile_cache import compile_cache, CompileError
+from src.workspace import workspaces, SlotTimeout
+from src.run_stream import stream_command, OutputLimiter
+from src.cpp_prelude import (
+    prelude as cpp_prelude, profile_flags, HEADER_NAME as PRELUDE_HEADER, RUN_PROFILE, VERIFY_PROFILE,
+)
+from src.transcriber import registry as whisper_registry, DECODE_PROFILES, DEFAULT_PROFILE, QUANTIZE
+from src.streaming import sessions as stream_sessions, pcm_from_bytes
+from src.audio_ingest import load_upload, load_audio_bytes
+from src.batch_scheduler import scheduler as transcription_scheduler
+from src.worker_pool import pool as transcription_pool, WorkerCrashed
+from src.transcript_cache import transcript_cache, cache_key as transcript_cache_key
+from src.model_selector import selector as model_selector, DEFAULT_MODEL_SIZE, MODEL_SIZES
 
 app = Flask(__name__)
 CORS(app, origins=["http://localhost:3000"], supports_credentials=True)
@@ -256,6 +282,8 @@ PROBLEM_BANK = {
 
 # ─── LeetCode GraphQL helpers ────────────────────────────────────────────────
 LEETCODE_GRAPHQL = "https://leetcode.com/graphql"
+# Concurrent requests for the same slug share one GraphQL fetch
+leetcode_flight = SingleFlight()
 
 def parse_leetcode_test_cases(example_testcases_str, meta_data_str, py_snippet):
     """Parse LeetCode's exampleTestcases + metaData into structured test cases."""
@@ -301,11 +329,16 @@ def parse_leetcode_test_cases(example_testcases_str, meta_data_str, py_snippet):
         return []
 
 
-def generate_test_cases_ai(title, description, function_signature):
+def generate_test_cases_ai(title, description, function_signature, bypass_cache=False):
     """Use Groq LLM to generate test cases from problem description."""
-    api_key = os.environ.get("GROQ_API_KEY", "")
-    if not api_key:
+    if not llm_client.api_key():
         return []
+
+    key = response_key("test_cases", title, function_signature, llm_client.DEFAULT_MODEL, 0.2,
+                       description=description[:500])
+    cached = llm_cache.get(key, bypass=bypass_cache)
+    if cached is not None:
+        return json.loads(cached)
     
     try:
         import re as _re
@@ -334,34 +367,22 @@ Rules:
 
 Description: {description[:500]}"""
 
-        resp = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": "llama-3.1-8b-instant",
-                "messages": [
-                    {"role": "system", "content": "You generate test cases as JSON arrays. Output ONLY valid JSON. No markdown."},
-                    {"role": "user", "content": prompt},
-                ],
-                "temperature": 0.2,
-                "max_tokens": 600,
-            },
+        content = llm_flight.do(
+            key,
+            chat_completion,
+            [
+                {"role": "system", "content": "You generate test cases as JSON arrays. Output ONLY valid JSON. No markdown."},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.2,
+            max_tokens=600,
             timeout=10,
+            priority="background",
         )
         
-        content = resp.json()["choices"][0]["message"]["content"].strip()
-        # Clean markdown if present
-        if content.startswith("```"):
-            content = content.split("\n", 1)[1] if "\n" in content else content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
-        
-        cases = json.loads(content)
+        cases = json.loads(strip_markdown_fences(content))
         if isinstance(cases, list) and len(cases) > 0:
+            llm_cache.put(key, json.dumps(cases[:4]))
             return cases[:4]
     except Exception as e:
         print(f"⚠️ AI test case generation failed: {e}")
@@ -369,7 +390,7 @@ Description: {description[:500]}"""
     return []
 
 
-def fetch_leetcode_problem(slug):
+def fetch_leetcode_problem(slug, bypass_cache=False):
     """Fetch a problem from LeetCode's GraphQL API with test case parsing."""
     query = """
     query getQuestionDetail($titleSlug: String!) {
@@ -420,7 +441,8 @@ def fetch_leetcode_problem(slug):
             ai_cases = generate_test_cases_ai(
                 q["title"],
                 q.get("content", "")[:1000],
-                py_snippet
+                py_snippet,
+                bypass_cache=bypass_cache,
             )
             if ai_cases:
                 test_cases = ai_cases
@@ -491,6 +513,11 @@ def search_leetcode_problems(query_str):
 def index():
     return render_template("index.html")
 
+@app.errorhandler(SlotTimeout)
+def slot_timeout(e):
+    """Every execution slot stayed busy (EXEC_SLOT_TIMEOUT): the client may retry later."""
+    return jsonify({"error": str(e)}), 503
+
 @app.route("/api/code", methods=["GET"])
 def get_code():
     """Returns the current content of generated_script.py"""
@@ -503,7 +530,8 @@ def get_code():
 LANG_CONFIG = {
     "python": {"ext": ".py", "cmd": lambda f: ["python", f], "compile": None},
     "javascript": {"ext": ".js", "cmd": lambda f: ["node", f], "compile": None},
-    "cpp": {"ext": ".cpp", "cmd": lambda f: [f.replace('.cpp', '.exe')], "compile": lambda f: ["g++", "-o", f.replace('.cpp', '.exe'), f]},
+    # "compile" is the compiler; the compile profile adds its flags, compile_cache returns the binary and "cmd" gets its path
+    "cpp": {"ext": ".cpp", "cmd": lambda exe: [exe], "compile": ["g++"]},
 }
 
 @app.route("/api/save", methods=["POST"])
@@ -518,39 +546,75 @@ def save_code():
         f.write(code)
     return jsonify({"status": "saved", "path": path})
 
+def _run_process(cmd, input_data=None, timeout=10, cwd=None):
+    """
+    subprocess.run with captured text output. `python <script>` runs in a
+    child forked from the warm Python zygote instead of a cold interpreter;
+    only a run the zygote never started falls back to a cold one, so a
+    script is never run twice.
+    """
+    if FORK_SERVER and len(cmd) == 2 and cmd[0] == "python":
+        try:
+            return python_forkserver.run(cmd[1], input=input_data, timeout=timeout, cwd=cwd)
+        except ZygoteUnavailable as e:
+            print(f"⚠️ {e}; starting a fresh interpreter instead")
+    return subprocess.run(cmd, input=input_data, capture_output=True, text=True, timeout=timeout, cwd=cwd)
+
+def _stream_process(cmd, input_data=None, timeout=10, cwd=None):
+    """
+    _run_process, yielding ("stdout" | "stderr", bytes) as the program writes
+    them and a final ("exit", returncode) or ("timeout", None).
+    """
+    if FORK_SERVER and len(cmd) == 2 and cmd[0] == "python":
+        events = python_forkserver.stream(cmd[1], input=input_data, timeout=timeout, cwd=cwd)
+        try:
+            first = next(events)
+        except ZygoteUnavailable as e:
+            print(f"⚠️ {e}; starting a fresh interpreter instead")
+            cmd = ["python", "-u", cmd[1]]
+        else:
+            yield first
+            yield from events
+            return
+    yield from stream_command(cmd, input_data, timeout=timeout, cwd=cwd)
+
+def _run_target(data):
+    """Resolves a /api/run request to (config, script path, compile command, error message)."""
+    language = data.get("language", "python")
+    config = LANG_CONFIG.get(language, LANG_CONFIG["python"])
+    script_path = f"generated_script{config['ext']}"
+    if not os.path.exists(script_path):
+        return config, script_path, None, f"Error: No {language} script found to run."
+    compile_command = None
+    if config["compile"]:
+        try:
+            compile_command = config["compile"] + profile_flags(data.get("compile_profile", RUN_PROFILE))
+        except ValueError as e:
+            return config, script_path, None, f"Error: {e}"
+    return config, script_path, compile_command, None
+
 @app.route("/api/run", methods=["POST"])
 def run_code():
     """Executes the script in the specified language and returns output"""
     input_data = request.json.get("input", "")
-    language = request.json.get("language", "python")
-    
-    config = LANG_CONFIG.get(language, LANG_CONFIG["python"])
-    script_path = f"generated_script{config['ext']}"
-    
-    if not os.path.exists(script_path):
-        return jsonify({"output": f"Error: No {language} script found to run."})
+    config, script_path, compile_command, error = _run_target(request.json)
+    if error:
+        return jsonify({"output": error})
 
     try:
-        # Compile step for C++
-        if config["compile"]:
-            compile_cmd = config["compile"](script_path)
-            compile_result = subprocess.run(
-                compile_cmd,
-                capture_output=True,
-                text=True,
-                timeout=15
-            )
-            if compile_result.returncode != 0:
-                return jsonify({"output": f"Compilation Error:\n{compile_result.stderr}"})
-        
-        run_cmd = config["cmd"](script_path)
-        result = subprocess.run(
-            run_cmd,
-            input=input_data,
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        # Run a copy in a private workspace so concurrent runs don't collide
+        with workspaces.workspace() as ws:
+            ws.copy_in(script_path)
+            # Compile step for C++ (skipped when this exact source was compiled before)
+            if config["compile"]:
+                try:
+                    exe_path = compile_cache.compile(script_path, compile_command, timeout=15, cwd=ws.path)
+                except CompileError as e:
+                    return jsonify({"output": f"Compilation Error:\n{e.stderr}"})
+                run_cmd = config["cmd"](exe_path)
+            else:
+                run_cmd = config["cmd"](script_path)
+            result = _run_process(run_cmd, input_data, timeout=10, cwd=ws.path)
         
         output = result.stdout
         if result.stderr:
@@ -560,44 +624,277 @@ def run_code():
         
     except subprocess.TimeoutExpired:
         return jsonify({"output": "Error: Execution timed out (limit: 10s)."})
+    except SlotTimeout as e:
+        return jsonify({"output": f"Error: server busy. {e}"}), 503
     except Exception as e:
         return jsonify({"output": f"Error executing script: {str(e)}"})
 
+def _transcriber():
+    """Worker processes when WHISPER_WORKERS > 0, otherwise the in-process batching scheduler."""
+    return transcription_pool if transcription_pool.size > 0 else transcription_scheduler
+
+def _choose_model_size(audio, latency_budget_ms=None):
+    """
+    With a latency budget the largest model predicted to finish in time is
+    used, based on measured decode speed and the current queue depth.
+    """
+    if not latency_budget_ms:
+        return DEFAULT_MODEL_SIZE
+    model_size, predicted = model_selector.choose(
+        audio.size / 16000, float(latency_budget_ms), _transcriber().depth()
+    )
+    print(f"🎯 Budget {latency_budget_ms} ms → Whisper '{model_size}' (predicted {predicted:.0f} ms)")
+    return model_size
+
+def _transcript_key(audio, model_size, profile):
+    # Retries and repeated commands send byte-identical audio; skip the decode.
+    # int8 and fp32 weights can transcribe differently, and the disk tier outlives a restart that switches them
+    options = dict(DECODE_PROFILES[profile], profile=profile, quantize=QUANTIZE or "fp32")
+    return transcript_cache_key(audio, model_size, options)
+
+def _transcribe_upload(audio_file, latency_budget_ms=None, profile=DEFAULT_PROFILE):
+    """
+    Decodes an uploaded clip in memory, trims silence and transcribes it.
+    Returns (text, model_size); text is "" for pure silence.
+    profile names one of the decode profiles in src/transcriber.py.
+    """
+    if profile not in DECODE_PROFILES:
+        raise ValueError(f"Unknown decode profile '{profile}'")
+    audio = load_upload(audio_file)
+    if audio.size == 0:
+        return "", None
+
+    model_size = _choose_model_size(audio, latency_budget_ms)
+    key = _transcript_key(audio, model_size, profile)
+    text = transcript_cache.get(key)
+    if text is None:
+        text = _transcriber().transcribe(audio, model_size, profile)
+        transcript_cache.put(key, text)
+    else:
+        print("⚡ Transcript cache hit")
+    return text, model_size
+
+def _read_script():
+    if not os.path.exists(SCRIPT_PATH):
+        return ""
+    with open(SCRIPT_PATH, "r") as f:
+        return f.read()
+
+def _write_script(code):
+    with open(SCRIPT_PATH, "w") as f:
+        f.write(code)
+
+# ─── Async Voice Pipeline ────────────────────────────────────────────────────
+# /api/process_voice and /api/debug_voice run as coroutines on the shared
+# pipeline loop (src/voice_pipeline.py): decoding and transcription overlap
+# with loading the editor contents, each stage has its own timeout, and a
+# newer command from the same session_id (or a client disconnect) cancels
+# the old one before it can overwrite SCRIPT_PATH.
+async def _transcribe_async(audio, latency_budget_ms, profile):
+    model_size = _choose_model_size(audio, latency_budget_ms)
+    key = _transcript_key(audio, model_size, profile)
+    text = transcript_cache.get(key)
+    if text is not None:
+        print("⚡ Transcript cache hit")
+    elif transcription_pool.size > 0:
+        text = await voice_pipeline.blocking(transcription_pool.transcribe, audio, model_size, profile)
+    else:
+        # Awaits the scheduler's Future; cancelling drops the clip if it is still queued
+        text = await asyncio.wrap_future(transcription_scheduler.submit(audio, model_size, profile))
+    if text is not None:
+        transcript_cache.put(key, text)
+    return text, model_size
+
+async def _voice_transcript(data, form, load_script=False):
+    """Returns (text, model_size, current_code) for an uploaded voice command."""
+    profile = form.get("profile", DEFAULT_PROFILE)
+    if profile not in DECODE_PROFILES:
+        raise ValueError(f"Unknown decode profile '{profile}'")
+
+    current_code = form.get("currentCode", "")
+    read_code = None
+    if load_script and not current_code:
+        read_code = asyncio.ensure_future(voice_pipeline.stage("read_code", voice_pipeline.blocking(_read_script)))
+    try:
+        audio = await voice_pipeline.stage("decode", voice_pipeline.blocking(load_audio_bytes, data))
+        text, model_size = "", None
+        if audio.size:
+            text, model_size = await voice_pipeline.stage(
+                "transcribe", _transcribe_async(audio, form.get("latency_budget_ms"), profile)
+            )
+        if read_code is not None:
+            current_code = await read_code
+    finally:
+        if read_code is not None and not read_code.done():
+            read_code.cancel()
+    print(f"📝 Text: {text}")
+    return text, model_size, current_code
+
+async def _voice_command(data, form):
+    text, model_size, current_code = await _voice_transcript(data, form, load_script=True)
+    if not text:
+        return None
+    new_code = await voice_pipeline.stage("llm", voice_pipeline.llm(
+        generate_code, text, current_code=current_code, bypass_cache=_bypass_cache(form)
+    ))
+    await voice_pipeline.stage("write_code", voice_pipeline.blocking(_write_script, new_code))
+    return {"status": "success", "transcription": text, "code": new_code, "model": model_size}
+
+async def _voice_debug(data, form):
+    text, model_size, current_code = await _voice_transcript(data, form)
+    if not text:
+        return None
+    terminal_output = form.get("terminalOutput", "")
+    language = form.get("language", "python")
+    try:
+        debug_result = await voice_pipeline.stage("llm", voice_pipeline.llm(
+            _debug_completion,
+            _debug_voice_messages(language, text, current_code, terminal_output),
+            _debug_voice_key(language, text, current_code, terminal_output),
+            _bypass_cache(form),
+        ))
+    except StageTimeout:
+        raise  # a 504, not an empty analysis
+    except Exception as e:
+        print(f"⚠️ Debug analysis failed: {e}")
+        debug_result = {
+            "diagnosis": "Could not analyze the code. Please try again.",
+            "suggestion": str(e),
+            "fixed_code": current_code,
+        }
+    debug_result["transcription"] = text
+    debug_result["model"] = model_size
+    return debug_result
+
+def _client_disconnected():
+    """True once the client has closed its connection (werkzeug and gunicorn expose the socket)."""
+    sock = request.environ.get("werkzeug.socket") or request.environ.get("gunicorn.socket")
+    if sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+        return bool(readable) and sock.recv(1, socket.MSG_PEEK) == b""
+    except (OSError, ValueError):
+        return True
+
+def _run_voice_pipeline(command):
+    """Runs a voice coroutine for the current request and maps its failures to responses."""
+    if "audio" not in request.files:
+        return jsonify({"error": "No audio file provided"}), 400
+    data = request.files["audio"].read()
+    form = request.form.to_dict()
+    try:
+        result = voice_pipeline.run(
+            command(data, form), session_id=form.get("session_id"), disconnected=_client_disconnected
+        )
+    except StageTimeout as e:
+        return jsonify({"error": str(e), "stage": e.stage}), 504
+    except ValueError as e:  # undecodable audio or unknown profile
+        return jsonify({"error": str(e)}), 400
+    except (TimeoutError, WorkerCrashed) as e:
+        return jsonify({"error": f"Transcription failed: {e}"}), 503
+    except Superseded:
+        return jsonify({"error": "Superseded by a newer voice command"}), 409
+    except ClientDisconnected:
+        return jsonify({"error": "Client disconnected"}), 499
+    if result is None:
+        return jsonify({"error": "No speech detected"}), 400
+    return jsonify(result)
+
 @app.route("/api/process_voice", methods=["POST"])
 def process_voice():
     """Receives audio blob, transcibes, and updates code"""
-    if "audio" not in request.files:
-        return jsonify({"error": "No audio file provided"}), 400
-    
-    audio_file = request.files["audio"]
-    temp_path = os.path.join("recordings", "web_input.wav")
-    audio_file.save(temp_path)
-    
     print("🎙️ Transcribing audio from web...")
-    text = transcribe_audio(temp_path)
-    print(f"📝 Text: {text}")
-    
-    if not text:
-        return jsonify({"error": "No speech detected"}), 400
+    return _run_voice_pipeline(_voice_command)
 
-    current_code = ""
-    current_code = request.form.get("currentCode", "")
-    
-    if not current_code and os.path.exists(SCRIPT_PATH):
-         with open(SCRIPT_PATH, "r") as f:
-            current_code = f.read()
+def _bypass_cache(values):
+    """True when the request asks for a fresh LLM reply (bypass_cache=1/true)."""
+    return str(values.get("bypass_cache", "")).lower() in ("1", "true")
+
+def _apply_voice_instruction(text, current_code="", bypass_cache=False, speculation=None):
+    """
+    Runs a transcribed instruction through the LLM and saves the result to SCRIPT_PATH.
+    With a speculation, its early request is used when it guessed the transcript right.
+    """
+    if not current_code:
+        current_code = _read_script()
 
     print("🧠 Sending to LLM...")
-    new_code = generate_code(text, current_code=current_code)
-    
-    with open(SCRIPT_PATH, "w") as f:
-        f.write(new_code)
-        
-    return jsonify({
+    if speculation is not None:
+        new_code = speculation.resolve(text, current_code, bypass_cache, timeout=VOICE_STAGE_TIMEOUTS["llm"])
+    else:
+        new_code = generate_code(text, current_code=current_code, bypass_cache=bypass_cache)
+    _write_script(new_code)
+
+    return {
         "status": "success",
         "transcription": text,
         "code": new_code
-    })
+    }
+
+# ─── Streaming Voice Endpoints ───────────────────────────────────────────────
+# The client opens a session, posts raw 16 kHz mono PCM chunks while the user
+# is still speaking, and gets back partial transcripts. Finishing the session
+# decodes only the short uncommitted tail before handing off to the LLM.
+# With speculation on, code generation starts as soon as the partial transcript
+# stops changing, and finishing reuses it if the final transcript agrees.
+@app.route("/api/voice_stream/start", methods=["POST"])
+def start_voice_stream():
+    """Opens a streaming transcription session (speculate=1/0 overrides VOICE_SPECULATE)."""
+    profile = request.form.get("profile", DEFAULT_PROFILE)
+    if profile not in DECODE_PROFILES:
+        return jsonify({"error": f"Unknown decode profile '{profile}'"}), 400
+    model_size = request.form.get("model", "base")
+    if model_size not in MODEL_SIZES and model_size != DEFAULT_MODEL_SIZE:
+        return jsonify({"error": f"Unknown model '{model_size}'. Choose from: {', '.join(MODEL_SIZES)}"}), 400
+    session = stream_sessions.create(model_size, profile)
+    if request.form.get("speculate", "1" if SPECULATE else "0").lower() in ("1", "true"):
+        current_code = request.form.get("currentCode", "") or _read_script()
+        session.speculation = speculator.track(current_code, _bypass_cache(request.form))
+    return jsonify({"session_id": session.id, "sample_rate": 16000, "speculate": session.speculation is not None})
+
+@app.route("/api/voice_stream/<session_id>/chunk", methods=["POST"])
+def voice_stream_chunk(session_id):
+    """Appends a PCM chunk (int16 by default, ?format=f32 for float32) and returns the partial transcript."""
+    session = stream_sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": "Unknown or expired session"}), 404
+
+    if "audio" in request.files:
+        data = request.files["audio"].read()
+    else:
+        data = request.get_data()
+    if not data:
+        return jsonify({"error": "Empty audio chunk"}), 400
+
+    samples = pcm_from_bytes(data, request.args.get("format", "pcm16"))
+    snapshot = session.add_audio(samples)
+    if session.speculation is not None:
+        session.speculation.observe(snapshot["partial"])
+    return jsonify(snapshot)
+
+@app.route("/api/voice_stream/<session_id>/finish", methods=["POST"])
+def finish_voice_stream(session_id):
+    """Flushes the session; returns the final transcript and, unless transcribe_only is set, the generated code."""
+    session = stream_sessions.pop(session_id)
+    if session is None:
+        return jsonify({"error": "Unknown or expired session"}), 404
+
+    text = session.finish()
+    print(f"📝 Text: {text}")
+    if not text or request.form.get("transcribe_only") in ("1", "true"):
+        if session.speculation is not None:
+            session.speculation.cancel()
+        if not text:
+            return jsonify({"error": "No speech detected"}), 400
+        return jsonify({"status": "success", "transcription": text})
+    try:
+        result = _apply_voice_instruction(
+            text, request.form.get("currentCode", ""), _bypass_cache(request.form), session.speculation
+        )
+    except TimeoutError as e:  # the speculative request used up the LLM stage
+        return jsonify({"error": str(e), "stage": "llm", "transcription": text}), 504
+    return jsonify(result)
 
 # ─── LeetCode Problem Endpoints ─────────────────────────────────────────────
 @app.route("/api/leetcode/problem", methods=["GET"])
@@ -615,7 +912,8 @@ def get_leetcode_problem():
         return jsonify({"problem": problem})
     
     # Try LeetCode GraphQL
-    problem = fetch_leetcode_problem(slug)
+    bypass = _bypass_cache(request.args)
+    problem = leetcode_flight.do((slug, bypass), fetch_leetcode_problem, slug, bypass)
     if problem:
         return jsonify({"problem": problem})
     
@@ -680,115 +978,110 @@ def verify_code():
     function_name = data.get("function_name", "")
     test_cases = data.get("test_cases", [])
     language = data.get("language", "python")
+    compile_profile = data.get("compile_profile", VERIFY_PROFILE)
     
     if not code or not function_name or not test_cases:
         return jsonify({"error": "Missing code, function_name, or test_cases"}), 400
+    if language == "cpp":
+        try:
+            compile_command = cpp_prelude.compile_command(compile_profile)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        # Started here rather than at import, so Whisper workers and the reloader never build it;
+        # this compile parses the header, later ones use the .gch
+        cpp_prelude.warm_up()
     
     results = []
     
-    for i, tc in enumerate(test_cases):
-        input_args = tc.get("input", {})
-        expected = tc.get("expected")
+    # All cases share one private workspace, removed when verification ends
+    with workspaces.workspace() as ws:
+        for i, tc in enumerate(test_cases):
+            input_args = tc.get("input", {})
+            expected = tc.get("expected")
         
-        is_inplace = expected is not None and function_name in ["reverseString", "moveZeroes"]
+            is_inplace = expected is not None and function_name in ["reverseString", "moveZeroes"]
         
-        if language == "python":
-            harness, harness_path, run_cmd = _build_python_harness(code, function_name, input_args, is_inplace)
-        elif language == "javascript":
-            harness, harness_path, run_cmd = _build_js_harness(code, function_name, input_args, is_inplace)
-        elif language == "cpp":
-            harness, harness_path, run_cmd = _build_cpp_harness(code, function_name, input_args, is_inplace)
-        else:
-            harness, harness_path, run_cmd = _build_python_harness(code, function_name, input_args, is_inplace)
+            if language == "python":
+                harness, harness_path, run_cmd = _build_python_harness(code, function_name, input_args, is_inplace)
+            elif language == "javascript":
+                harness, harness_path, run_cmd = _build_js_harness(code, function_name, input_args, is_inplace)
+            elif language == "cpp":
+                harness, harness_path, run_cmd = _build_cpp_harness(code, function_name, input_args, is_inplace)
+            else:
+                harness, harness_path, run_cmd = _build_python_harness(code, function_name, input_args, is_inplace)
         
-        try:
-            with open(harness_path, "w") as f:
-                f.write(harness)
+            try:
+                ws.write(harness_path, harness)
+            
+                # For C++, compile first against the precompiled prelude (or reuse the binary of an identical harness)
+                if language == "cpp":
+                    try:
+                        exe_path = compile_cache.compile(harness_path, compile_command, timeout=10, cwd=ws.path)
+                    except CompileError as e:
+                        results.append({
+                            "case": i + 1,
+                            "status": "runtime_error",
+                            "input": input_args,
+                            "expected": expected,
+                            "actual": None,
+                            "error": e.stderr.strip().split("\n")[-1] if e.stderr else "Compilation error",
+                        })
+                        continue
+                    run_cmd = [exe_path]
+            
+                proc = _run_process(run_cmd, timeout=5, cwd=ws.path)
             
-            # For C++, compile first
-            exe_path = None
-            if language == "cpp":
-                exe_path = "practice_harness.exe"
-                compile_proc = subprocess.run(
-                    ["g++", "-o", exe_path, harness_path, "-std=c++17"],
-                    capture_output=True, text=True, timeout=10,
-                )
-                if compile_proc.returncode != 0:
+                if proc.returncode != 0:
                     results.append({
                         "case": i + 1,
                         "status": "runtime_error",
                         "input": input_args,
                         "expected": expected,
                         "actual": None,
-                        "error": compile_proc.stderr.strip().split("\n")[-1] if compile_proc.stderr else "Compilation error",
+                        "error": proc.stderr.strip().split("\n")[-1] if proc.stderr else "Runtime error",
                     })
-                    continue
-                run_cmd = [f"./{exe_path}"]
-            
-            proc = subprocess.run(
-                run_cmd,
-                capture_output=True,
-                text=True,
-                timeout=5,
-                shell=(language == "cpp"),
-            )
-            
-            if proc.returncode != 0:
+                else:
+                    try:
+                        actual = json.loads(proc.stdout.strip())
+                    except:
+                        actual = proc.stdout.strip()
+                
+                    # Compare (sort lists for comparison if both are lists)
+                    passed = False
+                    if isinstance(actual, list) and isinstance(expected, list):
+                        if sorted(map(str, actual)) == sorted(map(str, expected)):
+                            passed = True
+                        if actual == expected:
+                            passed = True
+                    else:
+                        passed = actual == expected
+                
+                    results.append({
+                        "case": i + 1,
+                        "status": "passed" if passed else "wrong_answer",
+                        "input": input_args,
+                        "expected": expected,
+                        "actual": actual,
+                    })
+                
+            except subprocess.TimeoutExpired:
                 results.append({
                     "case": i + 1,
-                    "status": "runtime_error",
+                    "status": "tle",
                     "input": input_args,
                     "expected": expected,
                     "actual": None,
-                    "error": proc.stderr.strip().split("\n")[-1] if proc.stderr else "Runtime error",
+                    "error": "Time limit exceeded (5s)",
                 })
-            else:
-                try:
-                    actual = json.loads(proc.stdout.strip())
-                except:
-                    actual = proc.stdout.strip()
-                
-                # Compare (sort lists for comparison if both are lists)
-                passed = False
-                if isinstance(actual, list) and isinstance(expected, list):
-                    if sorted(map(str, actual)) == sorted(map(str, expected)):
-                        passed = True
-                    if actual == expected:
-                        passed = True
-                else:
-                    passed = actual == expected
-                
+            except Exception as e:
                 results.append({
                     "case": i + 1,
-                    "status": "passed" if passed else "wrong_answer",
+                    "status": "runtime_error",
                     "input": input_args,
                     "expected": expected,
-                    "actual": actual,
+                    "actual": None,
+                    "error": str(e),
                 })
-                
-        except subprocess.TimeoutExpired:
-            results.append({
-                "case": i + 1,
-                "status": "tle",
-                "input": input_args,
-                "expected": expected,
-                "actual": None,
-                "error": "Time limit exceeded (5s)",
-            })
-        except Exception as e:
-            results.append({
-                "case": i + 1,
-                "status": "runtime_error",
-                "input": input_args,
-                "expected": expected,
-                "actual": None,
-                "error": str(e),
-            })
-        finally:
-            if os.path.exists(harness_path):
-                os.remove(harness_path)
-            if language == "cpp" and exe_path and os.path.exists(exe_path):
-                os.remove(exe_path)
     
     passed_count = sum(1 for r in results if r["status"] == "passed")
     return jsonify({
@@ -862,13 +1155,7 @@ def _build_cpp_harness(code, function_name, input_args, is_inplace):
     call_str = ", ".join(call_args)
     
     lines = [
-        "#include <iostream>",
-        "#include <vector>",
-        "#include <string>",
-        "#include <algorithm>",
-        "#include <unordered_map>",
-        "#include <sstream>",
-        "using namespace std;",
+        f'#include "{PRELUDE_HEADER}"',  # includes + using namespace std, precompiled by src/cpp_prelude.py
         "",
         code,
         "",
@@ -877,60 +1164,32 @@ def _build_cpp_harness(code, function_name, input_args, is_inplace):
     lines.extend(arg_decls)
     lines.append(f"  Solution sol;")
     lines.append(f"  auto result = sol.{function_name}({call_str});")
-    
-    # Print result as JSON
-    lines.append('  // Print result as JSON')
-    lines.append('  cout << "[";')  # fallback for vectors
-    lines.append(f'  auto _r = result;')
-    lines.append('  if constexpr(is_same_v<decltype(_r), vector<int>>) {')
-    lines.append('    for(int i=0;i<_r.size();i++){if(i)cout<<",";cout<<_r[i];}')
-    lines.append('  } else if constexpr(is_same_v<decltype(_r), int>) {')
-    lines.append('    cout << _r; return 0;')
-    lines.append('  } else if constexpr(is_same_v<decltype(_r), bool>) {')
-    lines.append('    cout << (_r?"true":"false"); return 0;')
-    lines.append('  } else if constexpr(is_same_v<decltype(_r), string>) {')
-    lines.append('    cout << "\\"" << _r << "\\""; return 0;')
-    lines.append('  }')
-    lines.append('  cout << "]";')
+    lines.append("  voxcoder_print_result(result);")
     lines.append("  return 0;")
     lines.append("}")
     
     return "\n".join(lines) + "\n", "practice_harness.cpp", ["g++"]  # run_cmd overridden after compile
 
 # ─── Voice-Driven Debugging Endpoint ─────────────────────────────────────────
-@app.route("/api/debug_voice", methods=["POST"])
-def debug_voice():
-    """Receives audio + code + terminal output, returns AI debug diagnosis."""
-    if "audio" not in request.files:
-        return jsonify({"error": "No audio file provided"}), 400
-    
-    audio_file = request.files["audio"]
-    temp_path = os.path.join("recordings", "debug_input.wav")
-    audio_file.save(temp_path)
-    
-    text = transcribe_audio(temp_path)
-    if not text:
-        return jsonify({"error": "No speech detected"}), 400
-    
-    current_code = request.form.get("currentCode", "")
-    terminal_output = request.form.get("terminalOutput", "")
-    language = request.form.get("language", "python")
-    
-    api_key = os.environ.get("GROQ_API_KEY", "")
-    if not api_key:
-        return jsonify({"error": "Missing API key for debug analysis"}), 500
-    
-    try:
-        resp = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": "llama-3.1-8b-instant",
-                "messages": [
-                    {"role": "system", "content": f"""You are an expert {language} debugger. The user will give you their code, terminal output (which may contain errors), and a voice command about debugging.
+def _debug_completion(messages, key, bypass=False):
+    """Parsed debug JSON for messages, from llm_cache when the same request was answered before."""
+    content = llm_cache.get(key, bypass=bypass)
+    if content is not None:
+        print("⚡ LLM cache hit")
+        return json.loads(strip_markdown_fences(content), strict=False)
+    content = llm_flight.do(key, chat_completion, messages, temperature=0.1, max_tokens=1500, timeout=15,
+                            priority="debug")
+    result = json.loads(strip_markdown_fences(content), strict=False)
+    llm_cache.put(key, content)
+    return result
+
+def _debug_voice_key(language, text, current_code, terminal_output):
+    return response_key("debug_voice", text, current_code, llm_client.DEFAULT_MODEL, 0.1,
+                        language=language, terminal_output=terminal_output)
+
+def _debug_voice_messages(language, text, current_code, terminal_output):
+    return [
+        {"role": "system", "content": f"""You are an expert {language} debugger. The user will give you their code, terminal output (which may contain errors), and a voice command about debugging.
 
 Your response must be a JSON object with these fields:
 - "diagnosis": A clear explanation of what's wrong (2-4 sentences)
@@ -938,67 +1197,34 @@ Your response must be a JSON object with these fields:
 - "fixed_code": The complete corrected code (full file, not a snippet)
 
 Output ONLY valid JSON. No markdown fences."""},
-                    {"role": "user", "content": f"Voice command: {text}\n\nCode:\n{current_code}\n\nTerminal output:\n{terminal_output}"},
-                ],
-                "temperature": 0.1,
-                "max_tokens": 1500,
-            },
-            timeout=15,
-        )
-        
-        content = resp.json()["choices"][0]["message"]["content"].strip()
-        # Clean markdown fences if present
-        if content.startswith("```"):
-            content = content.split("\n", 1)[1] if "\n" in content else content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
-        
-        debug_result = json.loads(content, strict=False)
-        debug_result["transcription"] = text
-        return jsonify(debug_result)
-    except Exception as e:
-        print(f"⚠️ Debug analysis failed: {e}")
-        return jsonify({
-            "diagnosis": "Could not analyze the code. Please try again.",
-            "suggestion": str(e),
-            "fixed_code": current_code,
-            "transcription": text,
-        })
+        {"role": "user", "content": f"Voice command: {text}\n\nCode:\n{current_code}\n\nTerminal output:\n{terminal_output}"},
+    ]
+
+@app.route("/api/debug_voice", methods=["POST"])
+def debug_voice():
+    """Receives audio + code + terminal output, returns AI debug diagnosis."""
+    if not llm_client.api_key():
+        return jsonify({"error": "Missing API key for debug analysis"}), 500
+    return _run_voice_pipeline(_voice_debug)
 
 # ─── Text-Based Debug for Practice ───────────────────────────────────────────
-@app.route("/api/debug_practice", methods=["POST"])
-def debug_practice():
-    """Accepts code + error + problem context, returns AI debug diagnosis (no voice needed)."""
-    data = request.json
+def _debug_practice_key(data):
+    context = {k: data.get(k, "") for k in ("error", "problem_title", "problem_description", "test_results")}
+    return response_key("debug_practice", "", data.get("code", ""), llm_client.DEFAULT_MODEL, 0.1, **context)
+
+def _debug_practice_messages(data):
     code = data.get("code", "")
     error_output = data.get("error", "")
     problem_title = data.get("problem_title", "")
     problem_description = data.get("problem_description", "")[:500]
     test_results_str = data.get("test_results", "")
 
-    if not code:
-        return jsonify({"error": "No code provided"}), 400
-
-    api_key = os.environ.get("GROQ_API_KEY", "")
-    if not api_key:
-        return jsonify({"error": "GROQ_API_KEY not set"}), 500
-
-    try:
-        context = f"Problem: {problem_title}\nDescription: {problem_description}\n" if problem_title else ""
-        error_ctx = f"\nError/Output:\n{error_output}\n" if error_output else ""
-        test_ctx = f"\nTest Results:\n{test_results_str}\n" if test_results_str else ""
+    context = f"Problem: {problem_title}\nDescription: {problem_description}\n" if problem_title else ""
+    error_ctx = f"\nError/Output:\n{error_output}\n" if error_output else ""
+    test_ctx = f"\nTest Results:\n{test_results_str}\n" if test_results_str else ""
 
-        resp = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "model": "llama-3.1-8b-instant",
-                "messages": [
-                    {"role": "system", "content": """You are a coding tutor helping debug practice problems. Analyze the code, error, and test results.
+    return [
+        {"role": "system", "content": """You are a coding tutor helping debug practice problems. Analyze the code, error, and test results.
 Return a JSON object with these keys:
 - "diagnosis": brief explanation of what's wrong (1-2 sentences)
 - "suggestion": how to fix it (1-3 sentences, educational)
@@ -1006,22 +1232,25 @@ Return a JSON object with these keys:
 - "hint": a learning tip related to this bug
 
 Output ONLY valid JSON. No markdown fences."""},
-                    {"role": "user", "content": f"{context}Code:\n```\n{code}\n```{error_ctx}{test_ctx}"},
-                ],
-                "temperature": 0.1,
-                "max_tokens": 1500,
-            },
-            timeout=15,
-        )
+        {"role": "user", "content": f"{context}Code:\n```\n{code}\n```{error_ctx}{test_ctx}"},
+    ]
 
-        content = resp.json()["choices"][0]["message"]["content"].strip()
-        if content.startswith("```"):
-            content = content.split("\n", 1)[1] if "\n" in content else content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
+@app.route("/api/debug_practice", methods=["POST"])
+def debug_practice():
+    """Accepts code + error + problem context, returns AI debug diagnosis (no voice needed)."""
+    data = request.json
+    code = data.get("code", "")
 
-        debug_result = json.loads(content, strict=False)
+    if not code:
+        return jsonify({"error": "No code provided"}), 400
+
+    if not llm_client.api_key():
+        return jsonify({"error": "GROQ_API_KEY not set"}), 500
+
+    try:
+        debug_result = _debug_completion(
+            _debug_practice_messages(data), _debug_practice_key(data), _bypass_cache(data)
+        )
         return jsonify(debug_result)
     except Exception as e:
         print(f"⚠️ Practice debug failed: {e}")
@@ -1032,6 +1261,241 @@ Output ONLY valid JSON. No markdown fences."""},
             "hint": "",
         })
 
+# ─── Token Streaming (SSE) Endpoints ─────────────────────────────────────────
+# Same inputs as the JSON endpoints above, but the reply is a text/event-stream
+# so the editor can render code and diagnoses while the model is still writing.
+# Events: "transcription" (voice routes), "token" (raw code text) or "field"
+# (decoded JSON string content), then one "done" carrying the same payload the
+# JSON endpoint would return plus timings, or "error".
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _sse_response(events):
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def _stream_debug_fields(messages, key, fallback, extra=None, bypass=False):
+    """
+    Streams a JSON debug reply as "field" events and finishes with the parsed
+    object (plus extra). A cached reply is replayed as a single burst.
+    """
+    start = time.perf_counter()
+    first_token_ms = None
+    streamer = JSONFieldStreamer()
+    raw = []
+    cached = llm_cache.get(key, bypass=bypass)
+    try:
+        if cached is not None:
+            deltas = [cached]
+        else:
+            deltas = stream_chat_completion(messages, temperature=0.1, max_tokens=1500, timeout=15,
+                                            priority="debug")
+        for delta in deltas:
+            if first_token_ms is None:
+                first_token_ms = (time.perf_counter() - start) * 1000
+            raw.append(delta)
+            for field, text in streamer.feed(delta):
+                yield _sse("field", {"field": field, "text": text})
+        result = parse_streamed_object("".join(raw), streamer)
+        if cached is None and streamer.done:
+            llm_cache.put(key, "".join(raw))
+    except Exception as e:
+        print(f"⚠️ Streamed debug analysis failed: {e}")
+        result = dict(fallback, diagnosis="Could not analyze the code. Please try again.", suggestion=str(e))
+    result.update(extra or {})
+    yield _sse("done", dict(result, cached=cached is not None, first_token_ms=first_token_ms,
+                            elapsed_ms=(time.perf_counter() - start) * 1000))
+
+def _stream_transcribe_form():
+    """Transcribes request.files["audio"] for the streaming voice routes; returns (text, model_size, error response)."""
+    if "audio" not in request.files:
+        return None, None, (jsonify({"error": "No audio file provided"}), 400)
+    try:
+        text, model_size = _transcribe_upload(
+            request.files["audio"],
+            request.form.get("latency_budget_ms"),
+            request.form.get("profile", DEFAULT_PROFILE),
+        )
+    except ValueError as e:
+        return None, None, (jsonify({"error": str(e)}), 400)
+    except (TimeoutError, WorkerCrashed) as e:
+        return None, None, (jsonify({"error": f"Transcription failed: {e}"}), 503)
+    if not text:
+        return None, None, (jsonify({"error": "No speech detected"}), 400)
+    return text, model_size, None
+
+@app.route("/api/stream/process_voice", methods=["POST"])
+def stream_process_voice():
+    """process_voice, streaming the generated code token by token."""
+    text, model_size, error = _stream_transcribe_form()
+    if error:
+        return error
+    if not llm_client.api_key():
+        return jsonify({"error": "GROQ_API_KEY not set"}), 500
+
+    current_code = request.form.get("currentCode", "") or _read_script()
+    key = code_cache_key(text, current_code)
+    cached = llm_cache.get(key, bypass=_bypass_cache(request.form))
+
+    def events():
+        yield _sse("transcription", {"text": text, "model": model_size})
+        start = time.perf_counter()
+        first_token_ms = None
+        parts = []
+        try:
+            for delta in [cached] if cached is not None else stream_code(text, current_code):
+                if first_token_ms is None:
+                    first_token_ms = (time.perf_counter() - start) * 1000
+                parts.append(delta)
+                yield _sse("token", {"text": delta})
+        except LLMError as e:
+            print(f"❌ Error: {e}")
+            yield _sse("error", {"error": str(e), "transcription": text})
+            return
+
+        new_code = clean_code("".join(parts))
+        if cached is None:
+            llm_cache.put(key, new_code)
+        _write_script(new_code)
+        yield _sse("done", {
+            "status": "success",
+            "transcription": text,
+            "code": new_code,
+            "model": model_size,
+            "cached": cached is not None,
+            "first_token_ms": first_token_ms,
+            "elapsed_ms": (time.perf_counter() - start) * 1000,
+        })
+
+    return _sse_response(events())
+
+@app.route("/api/stream/debug_voice", methods=["POST"])
+def stream_debug_voice():
+    """debug_voice, streaming diagnosis / suggestion / fixed_code as they are written."""
+    text, model_size, error = _stream_transcribe_form()
+    if error:
+        return error
+    if not llm_client.api_key():
+        return jsonify({"error": "Missing API key for debug analysis"}), 500
+
+    current_code = request.form.get("currentCode", "")
+    language = request.form.get("language", "python")
+    terminal_output = request.form.get("terminalOutput", "")
+    messages = _debug_voice_messages(language, text, current_code, terminal_output)
+    key = _debug_voice_key(language, text, current_code, terminal_output)
+    bypass = _bypass_cache(request.form)
+
+    def events():
+        yield _sse("transcription", {"text": text, "model": model_size})
+        yield from _stream_debug_fields(
+            messages, key, {"fixed_code": current_code}, {"transcription": text, "model": model_size}, bypass
+        )
+
+    return _sse_response(events())
+
+@app.route("/api/stream/debug_practice", methods=["POST"])
+def stream_debug_practice():
+    """debug_practice, streaming the diagnosis fields as they are written."""
+    data = request.json
+    code = data.get("code", "")
+    if not code:
+        return jsonify({"error": "No code provided"}), 400
+    if not llm_client.api_key():
+        return jsonify({"error": "GROQ_API_KEY not set"}), 500
+
+    return _sse_response(_stream_debug_fields(
+        _debug_practice_messages(data), _debug_practice_key(data), {"fixed_code": code, "hint": ""},
+        bypass=_bypass_cache(data),
+    ))
+
+# ─── Streaming Run Endpoint ──────────────────────────────────────────────────
+# Same input as /api/run, as a text/event-stream: "output" events carry stdout
+# / stderr text as the program writes it (at most EXEC_STREAM_MAX_BYTES, then a
+# truncation marker), then one "done" with the exit status and wall time, or
+# "error" when the program could not be started.
+@app.route("/api/stream/run", methods=["POST"])
+def stream_run_code():
+    """run_code, forwarding output while the program runs."""
+    input_data = request.json.get("input", "")
+    config, script_path, compile_command, error = _run_target(request.json)
+    if error:
+        return jsonify({"error": error}), 400
+
+    def events():
+        start = time.perf_counter()
+        limiter = OutputLimiter()
+        status = None
+        try:
+            with workspaces.workspace() as ws:
+                ws.copy_in(script_path)
+                if compile_command:
+                    try:
+                        exe_path = compile_cache.compile(script_path, compile_command, timeout=15, cwd=ws.path)
+                    except CompileError as e:
+                        yield _sse("error", {"error": f"Compilation Error:\n{e.stderr}"})
+                        return
+                    run_cmd = config["cmd"](exe_path)
+                else:
+                    run_cmd = config["cmd"](script_path)
+                run_start = time.perf_counter()
+                for kind, data in _stream_process(run_cmd, input_data, timeout=10, cwd=ws.path):
+                    if kind in ("stdout", "stderr"):
+                        for stream, text in limiter.feed(kind, data):
+                            yield _sse("output", {"stream": stream, "text": text})
+                    else:
+                        status = (kind, data)
+                wall_ms = (time.perf_counter() - run_start) * 1000
+            for stream, text in limiter.flush():
+                yield _sse("output", {"stream": stream, "text": text})
+        except subprocess.TimeoutExpired:
+            yield _sse("error", {"error": "Compilation timed out (limit: 15s)."})
+            return
+        except SlotTimeout as e:
+            yield _sse("error", {"error": f"Server busy: {e}"})
+            return
+        except Exception as e:
+            yield _sse("error", {"error": f"Error executing script: {e}"})
+            return
+
+        timed_out = status[0] == "timeout"
+        yield _sse("done", {
+            "returncode": None if timed_out else status[1],
+            "timed_out": timed_out,
+            "truncated": limiter.truncated,
+            "bytes": limiter.bytes,
+            "wall_ms": wall_ms,
+            "elapsed_ms": (time.perf_counter() - start) * 1000,
+        })
+
+    return _sse_response(events())
+
+# ─── Runtime Metrics ─────────────────────────────────────────────────────────
+@app.route("/api/metrics", methods=["GET"])
+def get_metrics():
+    """Reports cache and load counters for the voice pipeline."""
+    return jsonify({
+        "whisper_models": whisper_registry.stats(),
+        "voice_stream_sessions": len(stream_sessions),
+        "transcription_scheduler": transcription_scheduler.stats(),
+        "transcription_workers": transcription_pool.stats(),
+        "transcript_cache": transcript_cache.stats(),
+        "model_selector": model_selector.stats(),
+        "llm_client": llm_client.stats(),
+        "code_edits": edit_stats(),
+        "llm_cache": llm_cache.stats(),
+        "single_flight": {"llm": llm_flight.stats(), "leetcode": leetcode_flight.stats()},
+        "llm_scheduler": llm_scheduler.stats(),
+        "voice_pipeline": voice_pipeline.stats(),
+        "speculation": speculator.stats(),
+        "python_forkserver": python_forkserver.stats(),
+        "cpp_compile_cache": compile_cache.stats(),
+        "cpp_prelude": cpp_prelude.stats(),
+        "workspaces": workspaces.stats(),
+    })
+
 if __name__ == "__main__":
     print("🚀 Starting Web IDE at http://localhost:5000")
     app.run(debug=True, port=5000)
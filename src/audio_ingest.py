@@ -0,0 +1,129 @@
+import io
+import os
+import subprocess
+import wave
+from math import gcd
+
+import numpy as np
+from scipy.signal import resample_poly
+
+SAMPLE_RATE = 16000  # what Whisper expects
+
+# Energy VAD settings: frames quieter than (loudest frame - VAD_RANGE_DB) count as silence
+VAD_FRAME_MS = 30
+VAD_RANGE_DB = float(os.environ.get("VAD_RANGE_DB", "35"))
+VAD_FLOOR_DB = -60.0
+VAD_PAD_MS = 200
+
+
+class AudioDecodeError(ValueError):
+    """Raised when an uploaded blob cannot be decoded as audio."""
+
+
+def _resample(audio, orig_sr, target_sr=SAMPLE_RATE):
+    if orig_sr == target_sr:
+        return audio
+    g = gcd(orig_sr, target_sr)
+    return resample_poly(audio, target_sr // g, orig_sr // g).astype(np.float32)
+
+
+def _decode_wav(data):
+    """Fast path for PCM WAV uploads: parse in-process, no ffmpeg. None for sample widths it cannot read."""
+    with wave.open(io.BytesIO(data), "rb") as wf:
+        channels = wf.getnchannels()
+        width = wf.getsampwidth()
+        sr = wf.getframerate()
+        frames = wf.readframes(wf.getnframes())
+
+    if width == 1:
+        audio = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        audio = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        # 24-bit: place each sample in the top three bytes of an int32, which also sign-extends it
+        padded = np.zeros((len(frames) // 3, 4), dtype=np.uint8)
+        padded[:, 1:] = np.frombuffer(frames, dtype=np.uint8, count=padded.shape[0] * 3).reshape(-1, 3)
+        audio = padded.view("<i4").ravel().astype(np.float32) / 2147483648.0
+    elif width == 4:
+        audio = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        return None
+
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    return _resample(audio, sr)
+
+
+def _decode_ffmpeg(data):
+    """Pipes any container ffmpeg understands (webm/ogg/mp4...) through stdin -> stdout."""
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0",
+        "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE),
+        "pipe:1",
+    ]
+    try:
+        out = subprocess.run(cmd, input=data, capture_output=True, check=True).stdout
+    except FileNotFoundError:
+        raise AudioDecodeError("ffmpeg is not installed")
+    except subprocess.CalledProcessError as e:
+        raise AudioDecodeError(f"ffmpeg could not decode audio: {e.stderr.decode(errors='ignore')[-200:]}")
+    return np.frombuffer(out, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def decode_audio_bytes(data):
+    """
+    Decodes an uploaded audio blob entirely in memory.
+
+    Returns a 16 kHz mono float32 NumPy array ready for Whisper.
+    """
+    if not data:
+        raise AudioDecodeError("Empty audio upload")
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        try:
+            audio = _decode_wav(data)
+        except (wave.Error, EOFError):
+            audio = None
+        if audio is not None:
+            return audio
+        # e.g. float WAV or an unusual sample width; let ffmpeg deal with it
+    return _decode_ffmpeg(data)
+
+
+def trim_silence(audio, sr=SAMPLE_RATE, frame_ms=VAD_FRAME_MS, range_db=VAD_RANGE_DB, pad_ms=VAD_PAD_MS):
+    """
+    Energy-based VAD: drops leading and trailing silence.
+
+    Frame energies are computed in one vectorized pass. A frame is voiced if
+    it is within range_db of the loudest frame and above an absolute floor.
+    Returns an empty array when nothing is voiced.
+    """
+    frame = int(sr * frame_ms / 1000)
+    n_frames = audio.size // frame
+    if n_frames == 0:
+        return audio
+
+    frames = audio[: n_frames * frame].reshape(n_frames, frame)
+    energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+    threshold = max(energy_db.max() - range_db, VAD_FLOOR_DB)
+    voiced = np.flatnonzero(energy_db > threshold)
+    if voiced.size == 0:
+        return audio[:0]
+
+    pad = int(sr * pad_ms / 1000)
+    start = max(voiced[0] * frame - pad, 0)
+    end = min((voiced[-1] + 1) * frame + pad, audio.size)
+    return audio[start:end]
+
+
+def load_upload(file_storage, trim=True):
+    """Reads a Flask upload into a trimmed 16 kHz float32 array without touching disk."""
+    return load_audio_bytes(file_storage.read(), trim)
+
+
+def load_audio_bytes(data, trim=True):
+    """Same as load_upload, for an upload already read into memory."""
+    audio = decode_audio_bytes(data)
+    if trim:
+        audio = trim_silence(audio)
+    return np.ascontiguousarray(audio, dtype=np.float32)
@@ -1,23 +1,236 @@
-import sounddevice as sd
-from scipy.io.wavfile import write
+import threading
+import time
+
 import numpy as np
+from scipy.io.wavfile import write
+
+SAMPLE_RATE = 16000  # Whisper's native rate, so no resampling later
+BLOCK_MS = 30
+
+# Endpointing defaults
+SPEECH_THRESHOLD_DB = -40.0   # blocks louder than this (dBFS) count as speech
+END_SILENCE_MS = 800          # stop after this much silence following speech
+NO_SPEECH_TIMEOUT_S = 6.0     # give up if nobody starts talking
+MAX_SECONDS = 30.0            # hard cap, one Whisper window
+
+
+class RingBuffer:
+    """
+    Single-producer / single-consumer float32 ring buffer.
+
+    The audio callback writes into it without ever blocking on the
+    consumer; if the consumer falls more than `capacity` samples behind,
+    the oldest audio is overwritten and counted as an overrun.
+    """
+
+    def __init__(self, capacity):
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self.capacity = capacity
+        self._written = 0
+        self._read = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.overruns = 0
+
+    def write(self, samples):
+        dropped = samples.size > self.capacity
+        samples = samples[-self.capacity:]
+        n = samples.size
+        with self._cond:
+            start = self._written % self.capacity
+            first = min(n, self.capacity - start)
+            self._data[start:start + first] = samples[:first]
+            self._data[:n - first] = samples[first:]
+            self._written += n
+            if dropped or self._written - self._read > self.capacity:
+                self.overruns += 1
+                self._read = max(self._read, self._written - self.capacity)
+            self._cond.notify_all()
+
+    def read(self, timeout=None):
+        """Returns every unread sample, waiting up to `timeout` for some to arrive."""
+        with self._cond:
+            if self._written == self._read and not self._closed:
+                self._cond.wait(timeout)
+            n = self._written - self._read
+            start = self._read % self.capacity
+            idx = (start + np.arange(n)) % self.capacity
+            self._read = self._written
+            return self._data[idx]
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+def _microphone_stream(samplerate, blocksize, callback):
+    # Imported here so the module loads on hosts without PortAudio (servers, CI)
+    import sounddevice as sd
+    return sd.InputStream(samplerate=samplerate, blocksize=blocksize, channels=1, dtype="float32", callback=callback)
+
+
+class SyntheticStream:
+    """
+    Stand-in for sd.InputStream that plays a NumPy signal through the callback.
+
+    Used by tests and offline demos. With realtime=True it paces blocks like
+    a real microphone; otherwise it delivers them as fast as possible.
+    """
+
+    def __init__(self, signal, samplerate=SAMPLE_RATE, blocksize=None, callback=None, realtime=False):
+        self.signal = np.asarray(signal, dtype=np.float32)
+        self.samplerate = samplerate
+        self.blocksize = blocksize or int(samplerate * BLOCK_MS / 1000)
+        self.callback = callback
+        self.realtime = realtime
+        self.active = False
+        self._stop = threading.Event()
+        self._thread = None
 
-def record_audio(filename="recordings/input.wav", duration=5, fs=44100):
+    def _play(self):
+        for start in range(0, self.signal.size, self.blocksize):
+            if self._stop.is_set():
+                break
+            block = self.signal[start:start + self.blocksize]
+            self.callback(block.reshape(-1, 1), block.size, None, None)
+            if self.realtime:
+                time.sleep(block.size / self.samplerate)
+        self.active = False
+
+    def start(self):
+        self.active = True
+        self._thread = threading.Thread(target=self._play, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.active = False
+
+    def close(self):
+        self.stop()
+
+
+class StreamingRecorder:
+    """
+    Callback-driven recorder with voice endpointing.
+
+    The input stream's callback only copies blocks into a ring buffer.
+    chunks() drains the buffer, yields audio as it arrives, and stops once
+    END_SILENCE_MS of quiet follows speech (or on NO_SPEECH_TIMEOUT_S /
+    MAX_SECONDS). Consumers can therefore start transcribing while the
+    user is still talking.
+    """
+
+    def __init__(
+        self,
+        samplerate=SAMPLE_RATE,
+        block_ms=BLOCK_MS,
+        threshold_db=SPEECH_THRESHOLD_DB,
+        end_silence_ms=END_SILENCE_MS,
+        no_speech_timeout=NO_SPEECH_TIMEOUT_S,
+        max_seconds=MAX_SECONDS,
+        stream_factory=_microphone_stream,
+    ):
+        self.samplerate = samplerate
+        self.blocksize = int(samplerate * block_ms / 1000)
+        self.threshold_db = threshold_db
+        self.end_silence = end_silence_ms / 1000.0
+        self.no_speech_timeout = no_speech_timeout
+        self.max_seconds = max_seconds
+        self.stream_factory = stream_factory
+        # Room for the whole recording, so a slow consumer never loses audio
+        self.ring = RingBuffer(int(samplerate * max_seconds) + self.blocksize)
+        self.audio = np.zeros(0, dtype=np.float32)
+        self.stop_reason = None
+
+    def _callback(self, indata, frames, time_info, status):
+        self.ring.write(indata[:, 0].copy())
+
+    def _block_levels_db(self, chunk):
+        """Per-block loudness; a slow consumer may drain several blocks at once."""
+        n_blocks = max(1, -(-chunk.size // self.blocksize))
+        padded = np.zeros(n_blocks * self.blocksize, dtype=np.float32)
+        padded[:chunk.size] = chunk
+        blocks = padded.reshape(n_blocks, self.blocksize)
+        sizes = np.minimum(self.blocksize, chunk.size - np.arange(n_blocks) * self.blocksize)
+        energy = (blocks * blocks).sum(axis=1) / sizes
+        return 10.0 * np.log10(energy + 1e-10), sizes / self.samplerate
+
+    def chunks(self):
+        """Records and yields float32 chunks until an endpoint is reached."""
+        stream = self.stream_factory(samplerate=self.samplerate, blocksize=self.blocksize, callback=self._callback)
+        recorded = []
+        elapsed = 0.0
+        heard_speech = False
+        silence = 0.0
+        stream.start()
+        try:
+            while self.stop_reason is None:
+                chunk = self.ring.read(timeout=0.1)
+                if chunk.size == 0:
+                    if not stream.active:
+                        self.stop_reason = "stream_ended"
+                    continue
+
+                # Walk the chunk block by block so we stop exactly at the endpoint
+                levels, durations = self._block_levels_db(chunk)
+                for i, (level, seconds) in enumerate(zip(levels, durations)):
+                    elapsed += seconds
+                    if level > self.threshold_db:
+                        heard_speech = True
+                        silence = 0.0
+                    else:
+                        silence += seconds
+
+                    if heard_speech and silence >= self.end_silence:
+                        self.stop_reason = "end_of_speech"
+                    elif not heard_speech and elapsed >= self.no_speech_timeout:
+                        self.stop_reason = "no_speech"
+                    elif elapsed >= self.max_seconds:
+                        self.stop_reason = "max_duration"
+                    if self.stop_reason:
+                        chunk = chunk[:(i + 1) * self.blocksize]
+                        break
+
+                recorded.append(chunk)
+                yield chunk
+        finally:
+            stream.stop()
+            stream.close()
+            self.ring.close()
+            self.audio = np.concatenate(recorded) if recorded else np.zeros(0, dtype=np.float32)
+
+    def record(self):
+        """Blocks until an endpoint and returns the whole recording."""
+        for _ in self.chunks():
+            pass
+        return self.audio
+
+
+def record_audio(filename="recordings/input.wav", duration=MAX_SECONDS, fs=SAMPLE_RATE):
     """
     Records audio from the default microphone.
-    
+
+    Stops automatically when the speaker goes quiet.
+
     Args:
         filename (str): Path to save the wav file.
-        duration (int): Duration of recording in seconds.
-        fs (int): Sampling frequency (44100 is standard).
-    """
-    print(f"🎤 Recording for {duration} seconds...")
-    
-    # sd.rec records in the background, we wait until it's done
-    recording = sd.rec(int(duration * fs), samplerate=fs, channels=1, dtype='int16')
-    sd.wait()  # Wait until recording is finished
-    
+        duration (int): Maximum duration of recording in seconds.
+        fs (int): Sampling frequency (16000 is what Whisper uses).
+    """
+    print(f"🎤 Recording (up to {duration} seconds, stops when you go quiet)...")
+
+    recorder = StreamingRecorder(samplerate=fs, max_seconds=duration)
+    recording = recorder.record()
+
     # Save as WAV file
-    write(filename, fs, recording)
+    write(filename, fs, (recording * 32767).astype(np.int16))
     print(f"✅ Audio saved to {filename}")
-    return filename
\ No newline at end of file
+    return filename
@@ -0,0 +1,191 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+import torch
+import whisper
+
+from src.model_selector import selector
+from src.transcriber import DEFAULT_PROFILE, decode_options, registry, transcribe_audio
+
+# Most clips to decode in one encoder pass, and how long the first clip may wait for company
+MAX_BATCH = int(os.environ.get("WHISPER_BATCH_SIZE", "4"))
+MAX_WAIT_MS = float(os.environ.get("WHISPER_BATCH_WAIT_MS", "25"))
+
+# Anything longer than one Whisper window needs the sequential transcribe() loop
+WINDOW_SAMPLES = whisper.audio.N_SAMPLES
+
+
+class _Job:
+    def __init__(self, audio, model_size, profile):
+        self.audio = audio
+        self.model_size = model_size
+        self.profile = profile
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+def _batch_options(profile, model):
+    """
+    Maps a transcribe() profile onto single-pass DecodingOptions.
+
+    A batched decode has no temperature fallback loop, so only the first
+    temperature of the profile is used.
+    """
+    options = decode_options(profile, model)
+    temperature = options["temperature"]
+    if isinstance(temperature, (tuple, list)):
+        temperature = temperature[0]
+    return whisper.DecodingOptions(
+        language=options.get("language"),
+        temperature=temperature,
+        beam_size=options.get("beam_size") if temperature == 0 else None,
+        best_of=options.get("best_of") if temperature > 0 else None,
+        without_timestamps=options.get("without_timestamps", False),
+        fp16=options["fp16"],
+    )
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class TranscriptionScheduler:
+    """
+    Queues clips from concurrent requests and decodes them in small batches.
+
+    A single worker thread takes the first waiting clip, keeps collecting
+    for up to max_wait_ms (or until max_batch clips are queued), then runs
+    one batched encoder pass over the padded mel spectrograms and resolves
+    each caller's future with its own text.
+    """
+
+    def __init__(self, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, history=1000):
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._queue_ms = deque(maxlen=history)
+        self._decode_ms = deque(maxlen=history)
+        self._batch_sizes = {}
+        self._jobs = 0
+
+    def _ensure_worker(self):
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="whisper-batcher", daemon=True)
+                self._worker.start()
+
+    def submit(self, audio, model_size="base", profile=DEFAULT_PROFILE):
+        """Queues a 16 kHz float32 clip. Returns a Future resolving to the transcript text."""
+        job = _Job(np.ascontiguousarray(audio, dtype=np.float32), model_size, profile)
+        self._ensure_worker()
+        self._queue.put(job)
+        return job.future
+
+    def transcribe(self, audio, model_size="base", profile=DEFAULT_PROFILE, timeout=None):
+        """Blocking helper used by request handlers."""
+        return self.submit(audio, model_size, profile).result(timeout=timeout)
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def _collect(self):
+        jobs = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(jobs) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                jobs.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return jobs
+
+    def _run(self):
+        while True:
+            # Callers that gave up (cancelled futures) are dropped; the rest can no longer be cancelled
+            jobs = [job for job in self._collect() if job.future.set_running_or_notify_cancel()]
+            groups = {}
+            for job in jobs:
+                # Long clips can't share a single 30 s window with the others
+                key = (job.model_size, job.profile) if job.audio.size <= WINDOW_SAMPLES else None
+                groups.setdefault(key, []).append(job)
+
+            for key, group in groups.items():
+                if key is None:
+                    for job in group:
+                        self._run_single(job)
+                else:
+                    self._run_batch(*key, group)
+
+    def _record(self, jobs, started, finished):
+        # One decode pass served every clip in the batch, so it is one observation of their total length
+        audio_seconds = sum(job.audio.size for job in jobs) / whisper.audio.SAMPLE_RATE
+        selector.observe(jobs[0].model_size, audio_seconds, (finished - started) * 1000)
+        with self._stats_lock:
+            for job in jobs:
+                self._queue_ms.append((started - job.enqueued) * 1000)
+            self._decode_ms.append((finished - started) * 1000)
+            self._batch_sizes[len(jobs)] = self._batch_sizes.get(len(jobs), 0) + 1
+            self._jobs += len(jobs)
+
+    def _run_single(self, job):
+        started = time.perf_counter()
+        try:
+            job.future.set_result(transcribe_audio(job.audio, job.model_size, job.profile))
+        except Exception as e:
+            job.future.set_exception(e)
+        self._record([job], started, time.perf_counter())
+
+    def _run_batch(self, model_size, profile, jobs):
+        started = time.perf_counter()
+        try:
+            with registry.acquire(model_size) as model:
+                mels = torch.stack([
+                    whisper.log_mel_spectrogram(
+                        whisper.pad_or_trim(torch.from_numpy(job.audio)), model.dims.n_mels
+                    )
+                    for job in jobs
+                ]).to(model.device)
+                results = whisper.decode(model, mels, _batch_options(profile, model))
+        except Exception as e:
+            print(f"❌ Batched transcription failed: {e}")
+            for job in jobs:
+                job.future.set_exception(e)
+            return
+        finished = time.perf_counter()
+
+        for job, result in zip(jobs, results):
+            job.future.set_result(result.text.strip())
+        self._record(jobs, started, finished)
+        print(f"✅ Batched transcription of {len(jobs)} clip(s) in {(finished - started) * 1000:.0f} ms")
+
+    def stats(self):
+        with self._stats_lock:
+            queue_ms = list(self._queue_ms)
+            decode_ms = list(self._decode_ms)
+            return {
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000,
+                "queue_depth": self.depth(),
+                "jobs": self._jobs,
+                "batch_sizes": dict(self._batch_sizes),
+                "queue_ms_p50": round(_percentile(queue_ms, 50), 1),
+                "queue_ms_p95": round(_percentile(queue_ms, 95), 1),
+                "decode_ms_p50": round(_percentile(decode_ms, 50), 1),
+                "decode_ms_p95": round(_percentile(decode_ms, 95), 1),
+            }
+
+
+scheduler = TranscriptionScheduler()
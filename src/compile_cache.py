@@ -0,0 +1,220 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+
+from src.single_flight import SingleFlight
+
+# Compiled C++ binaries, shared by /api/run and /api/practice/verify
+CACHE_DIR = os.environ.get("CPP_CACHE_DIR", os.path.join(".cache", "cpp"))
+CACHE_MB = float(os.environ.get("CPP_CACHE_MB", "256"))
+
+
+class CompileError(Exception):
+    """The compiler rejected the source; stderr holds its diagnostics."""
+
+    def __init__(self, stderr):
+        super().__init__(stderr)
+        self.stderr = stderr
+
+
+_compiler_ids = {}
+_compiler_lock = threading.Lock()
+
+
+def compiler_id(compiler):
+    """`compiler --version` output, re-read whenever the compiler binary changes."""
+    path = shutil.which(compiler) or compiler
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        mtime = None
+    with _compiler_lock:
+        cached = _compiler_ids.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    try:
+        version = subprocess.run([compiler, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        version = ""
+    with _compiler_lock:
+        _compiler_ids[path] = (mtime, f"{path}\n{version}")
+    return _compiler_ids[path][1]
+
+
+class CompileCache:
+    """
+    Content-addressed store of compiled binaries.
+
+    The key hashes the source text, the path it is compiled as (it shows up
+    in diagnostics and __FILE__), the compiler's version and the full
+    command line, so unchanged code is never compiled twice. Compiler
+    diagnostics are cached too, other compiler failures (killed, missing
+    files) are not. Entries are evicted least-recently-used once the store
+    grows past max_bytes; concurrent compiles of the same key share one
+    compiler run. Callers that pass cwd get a hard link to the binary
+    there, which eviction cannot pull out from under a run.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MB * 1024 * 1024, history=1000):
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self._index = None  # file name -> size, least recently used first
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._stats = {"hits": 0, "misses": 0, "errors_cached": 0, "evictions": 0}
+        self._compile_ms = deque(maxlen=history)
+
+    def key(self, source, source_path, command):
+        h = hashlib.sha256()
+        for part in (source, source_path, compiler_id(command[0]), "\0".join(command)):
+            h.update(part.encode() if isinstance(part, str) else part)
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def _load_index(self):
+        if self._index is None:
+            os.makedirs(self.directory, exist_ok=True)
+            entries = []
+            for name in os.listdir(self.directory):
+                if name.endswith((".exe", ".err")):
+                    st = os.stat(os.path.join(self.directory, name))
+                    entries.append((st.st_mtime, name, st.st_size))
+            self._index = OrderedDict((name, size) for _, name, size in sorted(entries))
+        return self._index
+
+    def _checkout(self, name, source_path, cwd):
+        """With self._lock held: the cached binary, linked into cwd when one is given."""
+        path = os.path.join(self.directory, name)
+        if cwd is None:
+            return path
+        target = os.path.join(cwd, os.path.splitext(os.path.basename(source_path))[0])
+        tmp = f"{target}.{threading.get_ident()}.tmp"
+        try:
+            os.link(path, tmp)
+        except OSError:  # another filesystem
+            shutil.copy2(path, tmp)
+        os.replace(tmp, target)
+        return target
+
+    def _claim(self, key, source_path, cwd):
+        """The binary a compile just stored, or None if it has already been evicted."""
+        with self._lock:
+            if key + ".exe" not in self._load_index():
+                return None
+            return self._checkout(key + ".exe", source_path, cwd)
+
+    def _lookup(self, key, source_path=None, cwd=None):
+        """Cached binary path, or raises the cached CompileError; None on a miss."""
+        with self._lock:
+            index = self._load_index()
+            for name in (key + ".exe", key + ".err"):
+                if name not in index:
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    os.utime(path)
+                except OSError:  # removed behind our back
+                    del index[name]
+                    continue
+                index.move_to_end(name)
+                self._stats["hits"] += 1
+                if name.endswith(".err"):
+                    with open(path, "r") as f:
+                        raise CompileError(f.read())
+                return self._checkout(name, source_path, cwd)
+        return None
+
+    def _add(self, name, size):
+        with self._lock:
+            index = self._load_index()
+            index[name] = size
+            index.move_to_end(name)
+            total = sum(index.values())
+            while total > self.max_bytes and len(index) > 1:
+                old, old_size = index.popitem(last=False)
+                try:
+                    os.remove(os.path.join(self.directory, old))
+                except OSError:
+                    pass
+                total -= old_size
+                self._stats["evictions"] += 1
+
+    def compile(self, source_path, command=("g++",), timeout=15, cwd=None):
+        """
+        Compiles source_path with command (compiler and flags; -o is added)
+        unless an identical compile is cached. Returns the binary's path.
+        A relative source_path is resolved against cwd, which is also the
+        compiler's working directory, so the same file name in different
+        directories shares one entry; with a cwd the returned binary is a
+        private link inside it. Raises CompileError on compiler errors and
+        TimeoutExpired like subprocess.run.
+        """
+        command = list(command)
+        with open(os.path.join(cwd or "", source_path), "rb") as f:
+            source = f.read()
+        key = self.key(source, source_path, command)
+        while True:
+            path = self._lookup(key, source_path, cwd)
+            if path is not None:
+                return path
+            self._flight.do(key, self._compile, key, source_path, command, timeout, cwd)
+            path = self._claim(key, source_path, cwd)
+            if path is not None:
+                return path
+            # evicted by a parallel compile before we got to it: build it again
+
+    def _compile(self, key, source_path, command, timeout, cwd):
+        path = self._lookup(key)  # a compile that just finished for another caller
+        if path is not None:
+            return path
+        with self._lock:
+            self._stats["misses"] += 1
+            self._load_index()
+        fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        os.close(fd)
+        start = time.perf_counter()
+        try:
+            result = subprocess.run(command + ["-o", tmp, source_path], capture_output=True, text=True,
+                                    timeout=timeout, cwd=cwd)
+            with self._lock:
+                self._compile_ms.append((time.perf_counter() - start) * 1000)
+            if result.returncode == 0:
+                name = key + ".exe"
+            elif result.returncode == 1 and "error:" in result.stderr:
+                # Diagnostics about the source; anything else (killed, missing files) may not happen again
+                with open(tmp, "w") as f:
+                    f.write(result.stderr)
+                name = key + ".err"
+            else:
+                raise CompileError(result.stderr or f"Compiler exited with status {result.returncode}")
+            final = os.path.join(self.directory, name)
+            os.replace(tmp, final)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self._add(name, os.path.getsize(final))
+        if result.returncode != 0:
+            with self._lock:
+                self._stats["errors_cached"] += 1
+            raise CompileError(result.stderr)
+        return final
+
+    def stats(self):
+        with self._lock:
+            index = self._load_index()
+            ordered = sorted(self._compile_ms)
+            return dict(
+                self._stats,
+                entries=len(index),
+                bytes=sum(index.values()),
+                max_bytes=int(self.max_bytes),
+                compile_ms={"p50": round(ordered[len(ordered) // 2], 1)} if ordered else {},
+            )
+
+
+compile_cache = CompileCache()
@@ -0,0 +1,278 @@
+import ast
+import os
+import re
+
+from src.patching import PatchError
+
+# Files shorter than this are always sent whole; slicing only pays off on large files
+MIN_LINES = int(os.environ.get("LLM_CONTEXT_MIN_LINES", "120"))
+# Give up on slicing when the selected regions cover more than this share of the file
+MAX_SHARE = float(os.environ.get("LLM_CONTEXT_MAX_SHARE", "0.6"))
+
+_BRACE_HEADERS = [
+    re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*(\w+)\s*\("),
+    re.compile(r"^\s*(?:export\s+)?(?:const|let|var)\s+(\w+)\s*=\s*(?:async\s+)?(?:function\b|\([^)]*\)\s*=>|\w+\s*=>)"),
+    re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:class|struct)\s+(\w+)"),
+    # C++ function definition: return type, name, parameter list, no trailing ';'
+    re.compile(r"^\s*(?:template\s*<[^>]*>\s*)?[\w:<>,\*&\s]+?[\s\*&](\w+)\s*\([^;]*\)\s*(?:const\s*)?(?:noexcept\s*)?\{?\s*$"),
+]
+_PY_HEADER = re.compile(r"^(?:async\s+def|def|class)\s+(\w+)")
+_KEYWORDS = {"if", "for", "while", "switch", "catch", "return", "else", "do"}
+# Instructions that change how a definition is called, so its callers must change too
+_INTERFACE_WORDS = {"rename", "renamed", "signature", "parameter", "parameters", "param", "params",
+                    "argument", "arguments", "arg", "args"}
+
+
+class Region:
+    """A named definition spanning lines start..end (1-based, inclusive)."""
+
+    def __init__(self, name, start, end, parent=None):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.parent = parent
+
+    def __len__(self):
+        return self.end - self.start + 1
+
+    def __repr__(self):
+        return f"Region({self.name!r}, {self.start}, {self.end})"
+
+
+def _python_regions(code):
+    """Top-level functions and classes, plus methods, from the AST. Raises SyntaxError."""
+    regions = []
+
+    def visit(body, parent):
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                start = min([d.lineno for d in node.decorator_list] + [node.lineno])
+                region = Region(node.name, start, node.end_lineno, parent)
+                regions.append(region)
+                if isinstance(node, ast.ClassDef) and parent is None:
+                    visit(node.body, region)
+
+    visit(ast.parse(code).body, None)
+    return regions
+
+
+def _indent_regions(lines):
+    """Tolerant fallback for Python that does not parse: column-0 defs end at the next column-0 line."""
+    regions = []
+    for i, line in enumerate(lines):
+        match = _PY_HEADER.match(line)
+        if not match:
+            continue
+        end = i
+        for j in range(i + 1, len(lines)):
+            if lines[j].strip() and not lines[j][0].isspace() and not lines[j].lstrip().startswith("#"):
+                break
+            if lines[j].strip():
+                end = j
+        regions.append(Region(match.group(1), i + 1, end + 1))
+    return regions
+
+
+def _block_end(lines, start):
+    """Line index closing the first {...} block at or after start, skipping strings and comments."""
+    depth = 0
+    opened = False
+    in_block_comment = False
+    for i in range(start, len(lines)):
+        line = lines[i]
+        quote = None
+        j = 0
+        while j < len(line):
+            ch = line[j]
+            if in_block_comment:
+                if line.startswith("*/", j):
+                    in_block_comment = False
+                    j += 1
+            elif quote:
+                if ch == "\\":
+                    j += 1
+                elif ch == quote:
+                    quote = None
+            elif line.startswith("//", j):
+                break
+            elif line.startswith("/*", j):
+                in_block_comment = True
+                j += 1
+            elif ch in "\"'`":
+                quote = ch
+            elif ch == "{":
+                depth += 1
+                opened = True
+            elif ch == "}":
+                depth -= 1
+                if opened and depth == 0:
+                    return i
+            j += 1
+        if not opened and i > start and line.strip().endswith(";"):
+            return None  # a declaration, not a definition
+    return None
+
+
+def _brace_regions(lines):
+    """Regex + brace matching fallback for JavaScript and C++."""
+    regions = []
+    i = 0
+    while i < len(lines):
+        name = None
+        for pattern in _BRACE_HEADERS:
+            match = pattern.match(lines[i])
+            if match and match.group(1) not in _KEYWORDS:
+                name = match.group(1)
+                break
+        end = _block_end(lines, i) if name else None
+        if end is None:
+            i += 1
+            continue
+        # A C++ "template <...>" line belongs to the definition below it
+        start = i - 1 if i > 0 and lines[i - 1].lstrip().startswith("template") else i
+        regions.append(Region(name, start + 1, end + 1))
+        i = end + 1
+    return regions
+
+
+def find_regions(code):
+    """Named definitions in code: AST for Python, tolerant line-based scanning otherwise."""
+    try:
+        return _python_regions(code)
+    except SyntaxError:
+        lines = code.splitlines()
+        if "{" in code:
+            return _brace_regions(lines)
+        return _indent_regions(lines)
+
+
+def _words(text):
+    """Lower-case word parts of text, splitting snake_case, camelCase and digits."""
+    text = re.sub(r"([a-z])([A-Z])", r"\1 \2", text)
+    return re.findall(r"[a-z]+|[0-9]+", text.lower())
+
+
+def _mentions(name, words):
+    """Whether an instruction names an identifier, spoken ("binary search") or typed (binarySearch)."""
+    parts = _words(name)
+    if not parts or (len(parts) == 1 and len(parts[0]) < 3):
+        return False
+    if "".join(parts) in words:
+        return True
+    n = len(parts)
+    return any(words[i:i + n] == parts for i in range(len(words) - n + 1))
+
+
+def _with_callers(hits, regions, lines):
+    """
+    Adds every region that references a selected definition, or returns None
+    when a reference lies outside any definition (module-level code).
+    """
+    selected = list(hits)
+    for hit in hits:
+        pattern = re.compile(rf"\b{re.escape(hit.name)}\b")
+        for number, line in enumerate(lines, 1):
+            if not pattern.search(line) or any(r.start <= number <= r.end for r in selected):
+                continue
+            owners = [r for r in regions if r.start <= number <= r.end]
+            if not owners:
+                return None
+            owner = min(owners, key=len)
+            # A method's class may already be selected, or the method may be inside a newly added class
+            selected = [r for r in selected if r.parent is not owner] + [owner]
+    return selected
+
+
+class ContextPlan:
+    """The regions an instruction is about, and how to show the rest of the file compactly."""
+
+    def __init__(self, code, regions, all_regions):
+        self.code = code
+        self.lines = code.splitlines()
+        self.regions = sorted(regions, key=lambda r: r.start)
+        self.all_regions = all_regions
+
+    def outline(self):
+        """The file with other definitions collapsed to their header and selected ones replaced by markers."""
+        selected = {r.start: (n, r) for n, r in enumerate(self.regions, 1)}
+        collapsed = {
+            r.start: r for r in self.all_regions
+            if r.parent is None and not any(s.start <= r.start <= s.end for s in self.regions)
+        }
+        out = []
+        i = 1
+        while i <= len(self.lines):
+            if i in selected:
+                n, region = selected[i]
+                out.append(f"<<< REGION {n}: {region.name} >>>")
+                i = region.end + 1
+            elif i in collapsed:
+                region = collapsed[i]
+                # Decorators and the line naming the definition stay, the body becomes "..."
+                header = next((j for j in range(i, region.end + 1) if region.name in self.lines[j - 1]), i)
+                out.extend(self.lines[i - 1:header])
+                out.append("    ...")
+                # A class with a selected method shows where that method sits
+                for s in self.regions:
+                    if region.start < s.start <= region.end:
+                        out.append(f"    <<< REGION {selected[s.start][0]}: {s.name} >>>")
+                i = region.end + 1
+            else:
+                if self.lines[i - 1].strip() or (out and out[-1].strip()):
+                    out.append(self.lines[i - 1])
+                i += 1
+        return "\n".join(out)
+
+    def region_text(self, region):
+        return "\n".join(self.lines[region.start - 1:region.end])
+
+    def render_regions(self):
+        return "\n".join(
+            f"### REGION {n}: {r.name}\n{self.region_text(r)}\n### END" for n, r in enumerate(self.regions, 1)
+        )
+
+    def parse_reply(self, reply):
+        """Maps region number to its rewritten text. Raises PatchError unless every region came back."""
+        blocks = dict(
+            (int(n), text) for n, text in
+            re.findall(r"^### REGION (\d+)[^\n]*\n(.*?)^### END\s*$", reply, re.S | re.M)
+        )
+        if set(blocks) != set(range(1, len(self.regions) + 1)):
+            raise PatchError(f"Expected {len(self.regions)} region block(s), got {sorted(blocks)}")
+        return blocks
+
+    def splice(self, replacements):
+        """Puts the edited regions back in place; replacements maps region number (1-based) to new text."""
+        lines = list(self.lines)
+        for n, region in sorted(enumerate(self.regions, 1), key=lambda p: p[1].start, reverse=True):
+            if n in replacements:
+                lines[region.start - 1:region.end] = replacements[n].strip("\n").splitlines()
+        return "\n".join(lines) + ("\n" if self.code.endswith("\n") else "")
+
+
+def plan_context(prompt, code, min_lines=None):
+    """
+    Returns a ContextPlan when prompt names specific definitions in a large
+    file, or None when the whole file should be sent. Renames and signature
+    changes also select every definition that refers to the named ones.
+    """
+    min_lines = MIN_LINES if min_lines is None else min_lines
+    n_lines = len(code.splitlines())
+    if n_lines < min_lines:
+        return None
+
+    regions = find_regions(code)
+    words = _words(prompt)
+    hits = [r for r in regions if _mentions(r.name, words)]
+    # A selected class already contains its methods
+    hits = [r for r in hits if r.parent is None or r.parent not in hits]
+    if not hits:
+        return None
+    if _INTERFACE_WORDS & set(words):
+        hits = _with_callers(hits, regions, code.splitlines())
+        if hits is None:
+            return None
+    if sum(len(r) for r in hits) > MAX_SHARE * n_lines:
+        return None
+
+    return ContextPlan(code, hits, regions)
@@ -0,0 +1,145 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+from src.compile_cache import CACHE_DIR, compiler_id
+
+COMPILER = "g++"
+# Optimization profiles; fast is for short programs where compile time dominates
+COMPILE_PROFILES = {
+    "fast": ["-O0", "-pipe"],
+    "optimized": ["-O2", "-pipe"],
+}
+RUN_PROFILE = os.environ.get("CPP_RUN_PROFILE", "fast")
+VERIFY_PROFILE = os.environ.get("CPP_VERIFY_PROFILE", "fast")
+# Build a precompiled header for the practice harness prelude (on the first C++ verify)
+PCH = os.environ.get("CPP_PCH", "1").lower() in ("1", "true")
+HARNESS_STD = "-std=c++17"
+
+HEADER_NAME = "voxcoder_prelude.h"
+PRELUDE = """#include <iostream>
+#include <vector>
+#include <string>
+#include <algorithm>
+#include <unordered_map>
+#include <sstream>
+#include <type_traits>
+using namespace std;
+
+// Prints a Solution result as JSON. A template, so only the branch for T is compiled.
+template <typename T>
+void voxcoder_print_result(const T& r) {
+  if constexpr (is_same_v<T, vector<int>>) {
+    cout << "[";
+    for (size_t i = 0; i < r.size(); i++) { if (i) cout << ","; cout << r[i]; }
+    cout << "]";
+  } else if constexpr (is_same_v<T, bool>) {
+    cout << (r ? "true" : "false");
+  } else if constexpr (is_same_v<T, string>) {
+    cout << "\\"" << r << "\\"";
+  } else if constexpr (is_arithmetic_v<T>) {
+    cout << r;
+  } else {
+    cout << "[]";
+  }
+}
+"""
+
+
+def profile_flags(profile):
+    if profile not in COMPILE_PROFILES:
+        raise ValueError(f"Unknown compile profile '{profile}'. Choose from: {', '.join(COMPILE_PROFILES)}")
+    return COMPILE_PROFILES[profile]
+
+
+class Prelude:
+    """
+    The practice harness prelude as a header with one precompiled copy per
+    compile profile (a .gch only matches the flags it was built with).
+
+    Harnesses #include the header first; g++ picks up the .gch sitting next
+    to it once it has been built and parses the header normally until then,
+    so compiles never wait for it.
+    """
+
+    def __init__(self, directory=os.path.join(os.path.dirname(CACHE_DIR), "pch")):
+        self.directory = os.path.abspath(directory)
+        self._lock = threading.Lock()
+        self._status = {}  # profile -> {"state": ..., "build_ms": ...}
+        self._warm_thread = None
+
+    def harness_flags(self, profile):
+        return [HARNESS_STD] + profile_flags(profile)
+
+    def include_dir(self, profile):
+        """Directory holding the header (and, once built, its .gch) for profile."""
+        flags = self.harness_flags(profile)
+        tag = hashlib.sha256("\0".join([PRELUDE, compiler_id(COMPILER)] + flags).encode()).hexdigest()[:16]
+        path = os.path.join(self.directory, f"{profile}-{tag}")
+        header = os.path.join(path, HEADER_NAME)
+        if not os.path.exists(header):
+            os.makedirs(path, exist_ok=True)
+            tmp = f"{header}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w") as f:
+                f.write(PRELUDE)
+            os.replace(tmp, header)
+        return path
+
+    def compile_command(self, profile):
+        """Compiler command for a harness, ahead of -o and the source file."""
+        return [COMPILER] + self.harness_flags(profile) + ["-I", self.include_dir(profile)]
+
+    def build(self, profile):
+        """Builds the precompiled header for profile unless it exists. Returns True when it is usable."""
+        path = self.include_dir(profile)
+        gch = os.path.join(path, HEADER_NAME + ".gch")
+        if os.path.exists(gch):
+            with self._lock:
+                self._status.setdefault(profile, {"state": "ready"})
+            return True
+        with self._lock:
+            self._status[profile] = {"state": "building"}
+        tmp = f"{gch}.{os.getpid()}.{threading.get_ident()}.tmp"
+        start = time.perf_counter()
+        try:
+            result = subprocess.run(
+                [COMPILER] + self.harness_flags(profile) + ["-x", "c++-header", os.path.join(path, HEADER_NAME),
+                                                            "-o", tmp],
+                capture_output=True, text=True, timeout=120,
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            result = subprocess.CompletedProcess([], 1, "", str(e))
+        build_ms = round((time.perf_counter() - start) * 1000, 1)
+        if result.returncode == 0:
+            os.replace(tmp, gch)
+            print(f"📦 Precompiled C++ harness prelude ({profile}) in {build_ms:.0f} ms")
+        else:
+            print(f"⚠️ Could not precompile the C++ prelude ({profile}): {result.stderr.strip()[-200:]}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        with self._lock:
+            self._status[profile] = {"state": "ready" if result.returncode == 0 else "failed", "build_ms": build_ms}
+        return result.returncode == 0
+
+    def warm_up(self):
+        """Builds every profile's precompiled header once, on a background thread."""
+        if not PCH or shutil.which(COMPILER) is None:
+            return None
+        with self._lock:
+            if self._warm_thread is None:
+                self._warm_thread = threading.Thread(
+                    target=lambda: [self.build(profile) for profile in COMPILE_PROFILES], name="cpp-pch", daemon=True
+                )
+                self._warm_thread.start()
+            return self._warm_thread
+
+    def stats(self):
+        with self._lock:
+            return {"enabled": PCH, "run_profile": RUN_PROFILE, "verify_profile": VERIFY_PROFILE,
+                    "pch": {p: dict(s) for p, s in self._status.items()}}
+
+
+prelude = Prelude()
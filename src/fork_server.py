@@ -0,0 +1,467 @@
+"""
+Warm Python execution: a zygote process that has already paid for
+interpreter startup and common imports forks one child per script run.
+
+The web server passes the child's stdin/stdout/stderr pipes over a Unix
+socket, so capturing output, feeding input and enforcing the timeout work
+exactly like subprocess.run on a cold `python script.py`.
+"""
+import atexit
+import io
+import json
+import locale
+import os
+import selectors
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+# Use the zygote for /api/run Python scripts (POSIX only; Windows always cold-starts)
+FORK_SERVER = os.environ.get("EXEC_FORK_SERVER", "1").lower() in ("1", "true") and hasattr(os, "fork")
+# Modules imported once in the zygote so scripts find them already loaded
+PRELOAD = os.environ.get(
+    "EXEC_PRELOAD",
+    "collections,itertools,functools,heapq,bisect,math,re,json,string,random,typing,"
+    "dataclasses,datetime,decimal,fractions,statistics,copy,operator,traceback",
+)
+START_TIMEOUT = 5.0
+
+
+class ForkServerError(RuntimeError):
+    """The zygote could not be reached or lost track of a run."""
+
+
+class ZygoteUnavailable(ForkServerError):
+    """The run was never started, so it is safe to cold-start the script instead."""
+
+
+# ─── Zygote (runs in its own process) ───────────────────────────────────────
+def _run_script(path):
+    """Runs path as __main__ the way `python path` would. Returns the exit code."""
+    import runpy
+    import traceback
+
+    if not os.path.isfile(path):
+        print(f"python: can't open file '{path}': [Errno 2] No such file or directory", file=sys.stderr)
+        return 2
+    try:
+        runpy.run_path(path, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    except BaseException as e:
+        # Hide the runpy frames so the traceback reads like a cold start's
+        tb = e.__traceback__
+        while tb is not None and tb.tb_frame.f_code.co_filename != path:
+            tb = tb.tb_next
+        traceback.print_exception(type(e), e, tb or e.__traceback__)
+        return 1
+    return 0
+
+
+def _child(request, fds, selector):
+    """Forked child: becomes the script's process. Never returns."""
+    code = 1
+    try:
+        os.setsid()  # own process group, so a timeout kills anything it spawned too
+        os.close(signal.set_wakeup_fd(-1))
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        for key in list(selector.get_map().values()):
+            if isinstance(key.fileobj, int):
+                os.close(key.fileobj)
+            else:
+                key.fileobj.close()
+        selector.close()
+        for fd, target in zip(fds, (0, 1, 2)):
+            os.dup2(fd, target)
+            os.close(fd)
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+        path = os.path.abspath(os.path.join(request["cwd"], request["path"]))
+        os.chdir(request["cwd"])
+        sys.argv = [path]
+        sys.path[0] = os.path.dirname(path)
+        sys.stdin = open(0, "r", closefd=False)
+        # unbuffered like `python -u`, for runs whose output is streamed as it is written
+        if request.get("unbuffered"):
+            sys.stdout = io.TextIOWrapper(open(1, "wb", buffering=0, closefd=False), write_through=True)
+        else:
+            sys.stdout = open(1, "w", closefd=False)
+        sys.stderr = open(2, "w", buffering=1, closefd=False, errors="backslashreplace")
+
+        import random
+        random.seed()  # otherwise every child would share the zygote's sequence
+        atexit._clear()  # handlers registered in the zygote are not the script's
+        code = _run_script(path)
+        # What the interpreter does before exiting: wait for non-daemon threads, then run atexit handlers
+        threading._shutdown()
+        atexit._run_exitfuncs()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except Exception:
+            pass
+        os._exit(code & 0xFF)
+
+
+def _send(conn, message):
+    try:
+        conn.sendall(json.dumps(message).encode() + b"\n")
+    except OSError:
+        pass
+
+
+def zygote_main(socket_path, preload):
+    """Imports preload, then forks a child per request on socket_path until the parent exits."""
+    for name in filter(None, (m.strip() for m in preload.split(","))):
+        try:
+            __import__(name)
+        except ImportError:
+            pass
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C is for the web server, which stops us itself
+    # SIGCHLD writes to this pipe, so an exiting child wakes the loop at once
+    wakeup_r, wakeup_w = os.pipe()
+    os.set_blocking(wakeup_r, False)
+    os.set_blocking(wakeup_w, False)
+    signal.set_wakeup_fd(wakeup_w)
+    signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+
+    parent = os.getppid()
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(64)
+    selector = selectors.DefaultSelector()
+    selector.register(listener, selectors.EVENT_READ, "accept")
+    selector.register(wakeup_r, selectors.EVENT_READ, "sigchld")
+    children = {}  # pid -> connection
+
+    while os.getppid() == parent:
+        for key, _ in selector.select(timeout=1.0):
+            conn = key.fileobj
+            if key.data == "sigchld":
+                try:
+                    os.read(wakeup_r, 4096)
+                except BlockingIOError:
+                    pass
+            elif key.data == "accept":
+                conn, _ = listener.accept()
+                selector.register(conn, selectors.EVENT_READ, "request")
+            elif key.data == "request":
+                try:
+                    data, fds, _, _ = socket.recv_fds(conn, 65536, 3)
+                    request = json.loads(data)
+                    if len(fds) != 3:
+                        raise ValueError("expected stdin, stdout and stderr")
+                except (OSError, ValueError):
+                    selector.unregister(conn)
+                    conn.close()
+                    continue
+                pid = os.fork()
+                if pid == 0:
+                    _child(request, fds, selector)
+                for fd in fds:
+                    os.close(fd)
+                children[pid] = conn
+                selector.modify(conn, selectors.EVENT_READ, pid)
+                _send(conn, {"pid": pid})
+            else:
+                # The parent asked to kill the run, or hung up (which means the same)
+                try:
+                    os.killpg(key.data, signal.SIGKILL)
+                except OSError:
+                    pass
+                if not conn.recv(64):
+                    selector.unregister(conn)
+
+        while children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            conn = children.pop(pid, None)
+            if conn is not None:
+                _send(conn, {"returncode": os.waitstatus_to_exitcode(status)})
+                try:
+                    selector.unregister(conn)
+                except KeyError:
+                    pass  # already unregistered when the parent hung up
+                conn.close()
+
+    for pid in children:
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+# ─── Client (runs in the web server) ────────────────────────────────────────
+def _decode(data):
+    """Same decoding as subprocess.run(text=True): locale encoding, universal newlines."""
+    return io.TextIOWrapper(io.BytesIO(data), encoding=locale.getpreferredencoding(False)).read()
+
+
+def pump(fds, input_bytes, timeout):
+    """
+    Writes input_bytes to a child's stdin pipe and yields ("stdout" | "stderr",
+    data) as its output pipes are read, until both reach EOF. Yields a final
+    ("timeout", b"") when the deadline passes first. Closes fds.
+    """
+    stdin_w, stdout_r, stderr_r = fds
+    deadline = time.monotonic() + timeout if timeout else None
+    names = {stdout_r: "stdout", stderr_r: "stderr"}
+    with selectors.DefaultSelector() as selector:
+        try:
+            for fd in (stdout_r, stderr_r):
+                selector.register(fd, selectors.EVENT_READ)
+            if input_bytes:
+                os.set_blocking(stdin_w, False)
+                selector.register(stdin_w, selectors.EVENT_WRITE)
+            else:
+                os.close(stdin_w)
+            view = memoryview(input_bytes)
+            while selector.get_map():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    yield "timeout", b""
+                    break
+                for key, _ in selector.select(remaining):
+                    fd = key.fileobj
+                    if fd == stdin_w:
+                        try:
+                            view = view[os.write(fd, view[:65536]):]
+                        except BrokenPipeError:
+                            view = view[:0]
+                        if not view:
+                            selector.unregister(fd)
+                            os.close(fd)
+                    else:
+                        data = os.read(fd, 65536)
+                        if data:
+                            yield names[fd], data
+                        else:
+                            selector.unregister(fd)
+                            os.close(fd)
+        finally:
+            for key in list(selector.get_map().values()):
+                selector.unregister(key.fileobj)
+                os.close(key.fileobj)
+
+
+class ForkServer:
+    """
+    Starts the zygote on first use (and again if it dies) and runs scripts
+    through it. run() mirrors subprocess.run(..., capture_output=True,
+    text=True): it returns a CompletedProcess and raises TimeoutExpired
+    after killing the child.
+    """
+
+    def __init__(self, python="python", preload=PRELOAD, history=1000):
+        self.python = python
+        self.preload = preload
+        self._process = None
+        self._socket_path = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"runs": 0, "timeouts": 0, "zygote_starts": 0}
+        self._run_ms = deque(maxlen=history)
+        atexit.register(self.stop)
+
+    def _ensure_zygote(self):
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                return self._socket_path
+            self._socket_path = os.path.join(tempfile.mkdtemp(prefix="voxcoder-zygote-"), "zygote.sock")
+            self._process = subprocess.Popen(
+                [self.python, os.path.abspath(__file__), "--zygote", self._socket_path, "--preload", self.preload],
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+            )
+            deadline = time.monotonic() + START_TIMEOUT
+            while not os.path.exists(self._socket_path):
+                if self._process.poll() is not None or time.monotonic() > deadline:
+                    raise ZygoteUnavailable("Python zygote failed to start")
+                time.sleep(0.01)
+            with self._stats_lock:
+                self._stats["zygote_starts"] += 1
+            print(f"🧬 Python zygote ready (pid {self._process.pid})")
+            return self._socket_path
+
+    def _connect(self):
+        for attempt in range(2):
+            path = self._ensure_zygote()
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                conn.connect(path)
+                return conn
+            except OSError:
+                conn.close()
+                with self._lock:
+                    if self._process is not None:
+                        self._process.kill()
+        raise ZygoteUnavailable("Python zygote is not accepting runs")
+
+    def _start(self, path, cwd, unbuffered=False):
+        """Hands a run to the zygote; returns the connection, its reply stream and our pipe ends."""
+        conn = self._connect()
+        stdin_r, stdin_w = os.pipe()
+        stdout_r, stdout_w = os.pipe()
+        stderr_r, stderr_w = os.pipe()
+        child_fds, ours = [stdin_r, stdout_w, stderr_w], [stdin_w, stdout_r, stderr_r]
+        try:
+            request = {"path": path, "cwd": cwd or os.getcwd(), "unbuffered": unbuffered}
+            socket.send_fds(conn, [json.dumps(request).encode()], child_fds)
+        except OSError as e:
+            conn.close()
+            for fd in child_fds + ours:
+                os.close(fd)
+            raise ZygoteUnavailable(f"Could not hand the run to the zygote: {e}")
+        for fd in child_fds:
+            os.close(fd)
+
+        replies = conn.makefile("r")
+        if json.loads(replies.readline() or "{}").get("pid") is None:
+            replies.close()
+            conn.close()
+            for fd in ours:
+                os.close(fd)
+            raise ZygoteUnavailable("Zygote did not start the run")
+        return conn, replies, ours
+
+    def run(self, path, input="", timeout=None, cwd=None):
+        start = time.perf_counter()
+        deadline = time.monotonic() + timeout if timeout else None
+        cmd = [self.python, path]
+        conn, replies, ours = self._start(path, cwd)
+        try:
+            stdout, stderr, timed_out = self._communicate(ours, (input or "").encode(), timeout)
+            status = None if timed_out else self._read_status(conn, replies, deadline)
+            if status is None:  # still running at the deadline, with or without its output open
+                timed_out = True
+                conn.sendall(b"kill")
+        finally:
+            replies.close()
+            conn.close()
+
+        if timed_out:
+            with self._stats_lock:
+                self._stats["timeouts"] += 1
+            raise subprocess.TimeoutExpired(cmd, timeout, _decode(stdout), _decode(stderr))
+        if "returncode" not in status:
+            raise ForkServerError("Zygote exited during the run")
+        with self._stats_lock:
+            self._stats["runs"] += 1
+            self._run_ms.append((time.perf_counter() - start) * 1000)
+        return subprocess.CompletedProcess(cmd, status["returncode"], _decode(stdout), _decode(stderr))
+
+    def stream(self, path, input="", timeout=None, cwd=None):
+        """
+        Like run(), but yields ("stdout" | "stderr", bytes) as the script
+        writes them, then ("exit", returncode), or ("timeout", None) once
+        the child has been killed. Closing the generator early kills it too.
+        The script's stdout is unbuffered, as with `python -u`.
+        """
+        start = time.perf_counter()
+        deadline = time.monotonic() + timeout if timeout else None
+        conn, replies, ours = self._start(path, cwd, unbuffered=True)
+        output = pump(ours, (input or "").encode(), timeout)
+        finished = False
+        try:
+            for kind, data in output:
+                if kind == "timeout":
+                    break
+                yield kind, data
+            else:
+                status = self._read_status(conn, replies, deadline)
+                if status is not None:
+                    if "returncode" not in status:
+                        raise ForkServerError("Zygote exited during the run")
+                    finished = True
+                    with self._stats_lock:
+                        self._stats["runs"] += 1
+                        self._run_ms.append((time.perf_counter() - start) * 1000)
+                    yield "exit", status["returncode"]
+                    return
+            conn.sendall(b"kill")
+            finished = True
+            with self._stats_lock:
+                self._stats["timeouts"] += 1
+            yield "timeout", None
+        finally:
+            output.close()
+            if not finished:  # abandoned by the caller
+                try:
+                    conn.sendall(b"kill")
+                except OSError:
+                    pass
+            replies.close()
+            conn.close()
+
+    @staticmethod
+    def _read_status(conn, replies, deadline):
+        """
+        The zygote's exit status reply, or None if the deadline passes first:
+        a child can close its output and keep running.
+        """
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            conn.settimeout(remaining)
+        try:
+            return json.loads(replies.readline() or "{}")
+        except socket.timeout:
+            return None
+        finally:
+            conn.settimeout(None)
+
+    @staticmethod
+    def _communicate(fds, input_bytes, timeout):
+        """Writes input and reads both outputs until EOF or the deadline. Closes fds."""
+        chunks = {"stdout": [], "stderr": [], "timeout": []}
+        for kind, data in pump(fds, input_bytes, timeout):
+            chunks[kind].append(data)
+        return b"".join(chunks["stdout"]), b"".join(chunks["stderr"]), bool(chunks["timeout"])
+
+    def stop(self):
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                self._process.kill()
+                self._process.wait()
+            self._process = None
+
+    def stats(self):
+        with self._stats_lock:
+            ordered = sorted(self._run_ms)
+            return dict(
+                self._stats,
+                enabled=FORK_SERVER,
+                zygote_alive=self._process is not None and self._process.poll() is None,
+                run_ms={"p50": round(ordered[len(ordered) // 2], 1)} if ordered else {},
+            )
+
+
+python_forkserver = ForkServer()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--zygote", required=True, help="Unix socket path to listen on")
+    parser.add_argument("--preload", default=PRELOAD)
+    args = parser.parse_args()
+    del parser, argparse
+    zygote_main(args.zygote, args.preload)
@@ -0,0 +1,166 @@
+import json
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_HEX_DIGITS = set("0123456789abcdefABCDEF")
+
+
+class JSONFieldStreamer:
+    """
+    Incremental parser for a streamed JSON object of string fields.
+
+    Feed it text deltas as the model produces them; feed() returns
+    (field, text) pairs for the decoded string content that became
+    available, so e.g. "diagnosis" can be shown before "fixed_code" has
+    even started. Anything before the first "{" (such as a ```json fence)
+    is skipped, and non-string values are consumed but not emitted.
+    """
+
+    def __init__(self):
+        self.fields = {}
+        self._state = "start"
+        self._key = []
+        self._field = None
+        self._escape = None    # None, "" after a backslash, or partial \\uXXXX digits
+        self._high = None      # high surrogate of a \\uXXXX\\uXXXX pair, until the low one arrives
+        self._depth = 0        # nesting inside a non-string value
+        self._in_nested_string = False
+        self._nested_escape = False
+        self.done = False
+
+    def feed(self, text):
+        out = []
+        for ch in text:
+            emitted = self._step(ch)
+            if emitted:
+                if out and out[-1][0] == self._field:
+                    out[-1] = (self._field, out[-1][1] + emitted)
+                else:
+                    out.append((self._field, emitted))
+        return out
+
+    def _step(self, ch):
+        state = self._state
+        if state == "start":
+            if ch == "{":
+                self._state = "key_or_end"
+        elif state == "key_or_end":
+            if ch == '"':
+                self._key = []
+                self._state = "key"
+            elif ch == "}":
+                self._state = "end"
+                self.done = True
+        elif state == "key":
+            if ch == '"':
+                self._state = "colon"
+            else:
+                self._key.append(ch)
+        elif state == "colon":
+            if ch == ":":
+                self._state = "value"
+        elif state == "value":
+            if ch == '"':
+                self._field = "".join(self._key)
+                self.fields[self._field] = ""
+                self._state = "string"
+            elif not ch.isspace():
+                self._depth = 1 if ch in "[{" else 0
+                self._state = "other"
+                if self._depth == 0 and ch in ",}":
+                    return self._after_value(ch)
+        elif state == "string":
+            return self._string_char(ch)
+        elif state == "other":
+            return self._other_char(ch)
+        elif state == "after":
+            return self._after_value(ch)
+        return None
+
+    def _string_char(self, ch):
+        if self._escape is None:
+            if ch == "\\":
+                self._escape = ""
+                return None
+            lone = self._lone_surrogate()
+            if ch == '"':
+                self._state = "after"
+                return lone or None
+            return lone + self._emit(ch)
+        if self._escape == "":
+            if ch == "u":
+                self._escape = "u"
+                return None
+            self._escape = None
+            return self._lone_surrogate() + self._emit(_ESCAPES.get(ch, ch))
+        if ch not in _HEX_DIGITS:
+            # Not a \\uXXXX escape after all: keep the text as the model wrote it
+            raw, self._escape = "\\" + self._escape, None
+            return self._lone_surrogate() + self._emit(raw) + (self._string_char(ch) or "")
+        self._escape += ch
+        if len(self._escape) < 5:  # "u" + 4 hex digits
+            return None
+        code = int(self._escape[1:], 16)
+        self._escape = None
+        if 0xDC00 <= code <= 0xDFFF and self._high is not None:
+            high, self._high = self._high, None
+            return self._emit(chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00)))
+        lone = self._lone_surrogate()
+        if 0xD800 <= code <= 0xDBFF:  # wait for the low half of the pair
+            self._high = code
+            return lone or None
+        if 0xDC00 <= code <= 0xDFFF:
+            code = 0xFFFD
+        return lone + self._emit(chr(code))
+
+    def _lone_surrogate(self):
+        """U+FFFD for a high surrogate no low one followed; alone it cannot be encoded."""
+        if self._high is None:
+            return ""
+        self._high = None
+        return self._emit("\ufffd")
+
+    def _emit(self, text):
+        self.fields[self._field] += text
+        return text
+
+    def _other_char(self, ch):
+        if self._in_nested_string:
+            if self._nested_escape:
+                self._nested_escape = False
+            elif ch == "\\":
+                self._nested_escape = True
+            elif ch == '"':
+                self._in_nested_string = False
+            return None
+        if ch == '"':
+            self._in_nested_string = True
+        elif ch in "[{":
+            self._depth += 1
+        elif ch in "]}":
+            if self._depth == 0:
+                return self._after_value(ch)
+            self._depth -= 1
+        elif ch == "," and self._depth == 0:
+            return self._after_value(ch)
+        return None
+
+    def _after_value(self, ch):
+        if ch == ",":
+            self._state = "key_or_end"
+        elif ch == "}":
+            self._state = "end"
+            self.done = True
+        else:
+            self._state = "after"
+        return None
+
+
+def parse_streamed_object(raw, streamer=None):
+    """Parses the complete text; falls back to whatever fields the streamer recovered."""
+    from src.llm_client import strip_markdown_fences
+    try:
+        return json.loads(strip_markdown_fences(raw), strict=False)
+    except ValueError:
+        if streamer is not None and streamer.fields:
+            return dict(streamer.fields)
+        raise
@@ -0,0 +1,46 @@
+import os
+
+# Which chat completion service every LLM call goes to: "groq" or "stub"
+LLM_BACKEND = os.environ.get("LLM_BACKEND", "groq")
+# Where the local stub (python -m src.llm_stub) listens
+LLM_STUB_URL = os.environ.get("LLM_STUB_URL", "http://127.0.0.1:8765/v1/chat/completions")
+
+
+class ChatBackend:
+    """
+    An OpenAI-compatible chat completions endpoint.
+
+    llm_client posts the same payload to every backend; a backend only
+    supplies the URL, the model name (which is also part of every LLM cache
+    key) and the API key, either fixed or read from the key_env variable.
+    """
+
+    def __init__(self, name, url, model, key="", key_env=None):
+        self.name = name
+        self.url = url
+        self.model = model
+        self.key = key
+        self.key_env = key_env
+
+    def api_key(self):
+        return os.environ.get(self.key_env, "") if self.key_env else self.key
+
+
+def groq_backend():
+    return ChatBackend(
+        "groq", "https://api.groq.com/openai/v1/chat/completions", "llama-3.1-8b-instant", key_env="GROQ_API_KEY"
+    )
+
+
+def stub_backend(url=LLM_STUB_URL):
+    """The local stub server, for load tests and benchmarks without network access."""
+    return ChatBackend("stub", url, "stub", key="stub")
+
+
+BACKENDS = {"groq": groq_backend, "stub": stub_backend}
+
+
+def get_backend(name=LLM_BACKEND):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM_BACKEND '{name}'. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# In-memory entries kept (LRU) in front of a SQLite file that survives restarts.
+# Set LLM_CACHE_DB to an empty string to keep the cache in memory only.
+CACHE_SIZE = int(os.environ.get("LLM_CACHE_SIZE", "512"))
+CACHE_DB = os.environ.get("LLM_CACHE_DB", ".cache/llm_responses.sqlite3")
+CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+
+
+def normalize_prompt(prompt):
+    """
+    Spacing and trailing punctuation vary between takes of the same spoken
+    instruction. Case is kept: "rename foo to Foo" and "rename foo to FOO"
+    ask for different code.
+    """
+    return " ".join(prompt.split()).rstrip(".!?")
+
+
+def normalize_code(code):
+    """Line endings and trailing whitespace never change what the model should do."""
+    return "\n".join(line.rstrip() for line in code.strip().splitlines())
+
+
+def response_key(kind, prompt, code="", model="", temperature=0.0, **context):
+    """
+    Hashes one LLM request. kind names the prompt template (so different
+    endpoints never share entries); context holds any other inputs that
+    reach the prompt, e.g. terminal output or the problem title.
+    """
+    h = hashlib.sha256()
+    h.update(json.dumps({
+        "kind": kind,
+        "prompt": normalize_prompt(prompt),
+        "code": hashlib.sha256(normalize_code(code).encode()).hexdigest(),
+        "model": model,
+        "temperature": temperature,
+        "context": context,
+    }, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+class LLMCache:
+    """
+    Two-tier cache of LLM replies keyed by response_key().
+
+    A bounded LRU dict answers repeats within this process; a SQLite table
+    keeps replies across restarts and between server processes. Entries
+    older than ttl seconds are treated as misses in both tiers.
+    """
+
+    def __init__(self, max_entries=CACHE_SIZE, db_path=CACHE_DB, ttl=CACHE_TTL):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.ttl = ttl
+        self._db = None
+        self._memory = OrderedDict()  # key -> (created, value)
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "bypassed": 0}
+
+    def _connection(self):
+        """Opens the SQLite tier on first use; caller holds _lock."""
+        if self._db is None and self.db_path:
+            try:
+                if os.path.dirname(self.db_path):
+                    os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+                db = sqlite3.connect(self.db_path, check_same_thread=False)
+                db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, created REAL)")
+                db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+                db.commit()
+                self._db = db
+            except sqlite3.Error as e:
+                print(f"⚠️ LLM cache database unavailable, using memory only: {e}")
+                self.db_path = ""
+        return self._db
+
+    def _remember(self, key, created, value):
+        """Caller holds _lock."""
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key, bypass=False):
+        """Returns the cached reply or None. bypass=True forces a miss (the fresh reply is still stored)."""
+        now = time.time()
+        with self._lock:
+            if bypass:
+                self._stats["bypassed"] += 1
+                return None
+
+            entry = self._memory.get(key)
+            if entry and now - entry[0] <= self.ttl:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return entry[1]
+
+            row = None
+            db = self._connection()
+            if db is not None:
+                try:
+                    row = db.execute("SELECT created, value FROM responses WHERE key = ?", (key,)).fetchone()
+                except sqlite3.Error as e:
+                    print(f"⚠️ LLM cache read failed: {e}")
+            if row and now - row[0] <= self.ttl:
+                self._stats["disk_hits"] += 1
+                self._remember(key, row[0], row[1])
+                return row[1]
+
+            self._stats["misses"] += 1
+            if entry or row:
+                self._stats["expired"] += 1
+            return None
+
+    def put(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            db = self._connection()
+            if db is not None:
+                try:
+                    db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (key, value, now))
+                    db.commit()
+                except sqlite3.Error as e:
+                    print(f"⚠️ LLM cache write failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._memory), disk=bool(self.db_path), ttl_s=self.ttl)
+
+
+llm_cache = LLMCache()
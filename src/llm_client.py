@@ -0,0 +1,208 @@
+import json
+import os
+import threading
+import time
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from src.llm_backends import get_backend
+from src.llm_scheduler import MAX_RETRIES, QuotaTimeout, backoff_delay, estimate_tokens, llm_scheduler
+
+load_dotenv()
+
+# Chosen once at startup by LLM_BACKEND (see llm_backends)
+backend = get_backend()
+DEFAULT_MODEL = backend.model
+
+# Keep-alive connections held open to the LLM API, shared by all request threads
+POOL_SIZE = int(os.environ.get("LLM_POOL_SIZE", "10"))
+CONNECT_TIMEOUT = float(os.environ.get("LLM_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.environ.get("LLM_READ_TIMEOUT", "30"))
+
+
+class LLMError(RuntimeError):
+    """The completion request failed or returned something unusable."""
+
+
+_session = None
+_session_lock = threading.Lock()
+_stats = {"requests": 0, "errors": 0, "completion_tokens": 0}
+_stats_lock = threading.Lock()
+
+
+def get_session():
+    """Process-wide requests.Session whose adapter keeps up to POOL_SIZE connections alive."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, pool_block=False)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def api_key():
+    return backend.api_key()
+
+
+def _count(field, n=1):
+    with _stats_lock:
+        _stats[field] += n
+
+
+def _retry_after(resp):
+    try:
+        return float(resp.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+def _post(payload, priority, timeout, stream=False):
+    """
+    Posts payload once llm_scheduler grants quota and returns the 200 response.
+
+    429s, 5xx replies and connection failures are retried up to MAX_RETRIES
+    times with jittered exponential backoff; a 429 also pauses every queued
+    request for its Retry-After. Raises LLMError on failure.
+    """
+    key = api_key()
+    if not key:
+        raise LLMError("GROQ_API_KEY not set")
+
+    estimate = estimate_tokens(payload["messages"], payload.get("max_tokens"))
+    ticket = llm_scheduler.ticket()
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            llm_scheduler.acquire(priority, estimate, ticket)
+        except QuotaTimeout as e:
+            _count("errors")
+            raise LLMError(str(e))
+
+        _count("requests")
+        rate_limited = False
+        try:
+            resp = get_session().post(
+                backend.url,
+                headers={"Authorization": f"Bearer {key}", "Content-Type": "application/json"},
+                json=payload,
+                timeout=(CONNECT_TIMEOUT, timeout or READ_TIMEOUT),
+                stream=stream,
+            )
+        except requests.ConnectionError as e:
+            error = LLMError(f"LLM request failed: {e}")
+        except requests.RequestException as e:  # read timeouts are not retried
+            _count("errors")
+            raise LLMError(f"LLM request failed: {e}")
+        else:
+            if resp.status_code == 200:
+                return resp
+            error = LLMError(f"LLM API returned {resp.status_code}: {resp.text[:200]}")
+            resp.close()
+            rate_limited = resp.status_code == 429
+            if resp.status_code < 500 and not rate_limited:
+                _count("errors")
+                raise error
+
+        if attempt == MAX_RETRIES:
+            _count("errors")
+            raise error
+        delay = backoff_delay(attempt, _retry_after(resp) if rate_limited else None)
+        print(f"🔁 {error}; retrying in {delay:.1f}s")
+        llm_scheduler.count_retry()
+        if rate_limited:
+            llm_scheduler.pause(delay)  # the quota is shared, so everyone backs off
+        else:
+            time.sleep(delay)
+
+
+def chat_completion(messages, model=DEFAULT_MODEL, temperature=0.1, max_tokens=None, timeout=None,
+                    priority="background"):
+    """
+    Sends a chat completion over the pooled session and returns the reply text.
+
+    timeout is the read timeout in seconds (READ_TIMEOUT by default); the
+    connect timeout is always CONNECT_TIMEOUT. priority ("voice", "debug" or
+    "background") orders the request in llm_scheduler's queue. Raises
+    LLMError on failure.
+    """
+    payload = {"model": model, "messages": messages, "temperature": temperature}
+    if max_tokens:
+        payload["max_tokens"] = max_tokens
+
+    resp = _post(payload, priority, timeout)
+    try:
+        data = resp.json()
+        content = data["choices"][0]["message"]["content"]
+    except (ValueError, KeyError, IndexError):
+        _count("errors")
+        raise LLMError("Malformed LLM response")
+    usage = data.get("usage") or {}
+    _count("completion_tokens", usage.get("completion_tokens", 0))
+    llm_scheduler.settle(estimate_tokens(messages, max_tokens), usage.get("total_tokens", 0))
+    return content
+
+
+def stream_chat_completion(messages, model=DEFAULT_MODEL, temperature=0.1, max_tokens=None, timeout=None,
+                           priority="background"):
+    """
+    Like chat_completion, but yields the reply as text deltas while the
+    server streams it (OpenAI-style server-sent events). The read timeout
+    applies between chunks rather than to the whole reply. Only the initial
+    request is retried; a stream that breaks midway raises LLMError.
+    """
+    payload = {"model": model, "messages": messages, "temperature": temperature, "stream": True}
+    if max_tokens:
+        payload["max_tokens"] = max_tokens
+
+    resp = _post(payload, priority, timeout, stream=True)
+    usage = {}
+    streamed = 0
+    try:
+        with resp:
+            for line in resp.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    return
+                try:
+                    event = json.loads(data)
+                    # Groq reports usage in the last chunk's x_groq, OpenAI in a final "usage" chunk
+                    usage = event.get("usage") or (event.get("x_groq") or {}).get("usage") or usage
+                    choices = event["choices"]
+                    delta = choices[0].get("delta", {}).get("content") if choices else None
+                except (ValueError, KeyError, IndexError, AttributeError):
+                    _count("errors")
+                    raise LLMError("Malformed LLM stream event")
+                if delta:
+                    streamed += len(delta)
+                    yield delta
+    except requests.RequestException as e:
+        _count("errors")
+        raise LLMError(f"LLM stream interrupted: {e}")
+    finally:
+        # Also runs when the caller stops early; without reported usage, count what was streamed
+        completion = usage.get("completion_tokens", streamed // 4)
+        _count("completion_tokens", completion)
+        estimate = estimate_tokens(messages, max_tokens)
+        llm_scheduler.settle(estimate, usage.get("total_tokens") or estimate - (max_tokens or 512) + completion)
+
+
+def strip_markdown_fences(content):
+    """Removes a surrounding ``` / ```json fence the model sometimes adds despite instructions."""
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.split("\n", 1)[1] if "\n" in content else content[3:]
+        if content.endswith("```"):
+            content = content[:-3]
+        content = content.strip()
+    return content
+
+
+def stats():
+    with _stats_lock:
+        return dict(_stats, pool_size=POOL_SIZE, backend=backend.name, model=DEFAULT_MODEL)
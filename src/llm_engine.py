@@ -1,22 +1,35 @@
 import os
-from groq import Groq
-from dotenv import load_dotenv
-# ------------------------------------------------------------------
-# 🔑 SECURITY NOTE: In a real app, use os.environ.get("GROQ_API_KEY")
-# For this student project, you can paste your key below safely.
-# ------------------------------------------------------------------
-load_dotenv()
-API_KEY = os.getenv("GROQ_API_KEY") 
+import threading
 
-def generate_code(prompt, current_code=""):
-    """
-    Generates or Edits code based on the user's instruction.
-    """
-    if not API_KEY:
-        return "# Error: Missing API Key"
+from src.context_planner import plan_context
+from src.llm_cache import llm_cache, response_key
+from src.llm_client import DEFAULT_MODEL, LLMError, api_key, chat_completion, stream_chat_completion
+from src.patching import PatchError, apply_patch
+from src.single_flight import llm_flight
 
-    print(f"🧠 Sending to Llama 3.1...")
+# "patch": edits to larger files come back as a unified diff applied locally,
+# so output length tracks the size of the change rather than the file.
+# Instructions naming specific functions/classes in a large file send only
+# those regions plus an outline (src/context_planner.py) in this mode too.
+# "full": always send and regenerate the whole file.
+EDIT_MODE = os.environ.get("LLM_EDIT_MODE", "patch")
+PATCH_MIN_LINES = int(os.environ.get("LLM_PATCH_MIN_LINES", "30"))
+
+_edit_stats = {"sliced": 0, "slice_fallbacks": 0, "patched": 0, "patch_fallbacks": 0, "full": 0}
+_stats_lock = threading.Lock()
 
+def _count(field):
+    with _stats_lock:
+        _edit_stats[field] += 1
+
+def edit_stats():
+    with _stats_lock:
+        return dict(_edit_stats, mode=EDIT_MODE, patch_min_lines=PATCH_MIN_LINES)
+
+def code_messages(prompt, current_code=""):
+    """
+    Builds the chat messages for creating or editing code.
+    """
     # logic: If there is code, we are EDITING. If not, we are CREATING.
     if current_code and current_code.strip() != "":
         system_instruction = (
@@ -35,24 +48,161 @@ def generate_code(prompt, current_code=""):
         )
         user_content = prompt
 
+    return [
+        {"role": "system", "content": system_instruction},
+        {"role": "user", "content": user_content}
+    ]
+
+def patch_messages(prompt, current_code):
+    """
+    Builds the chat messages asking for a unified diff against current_code.
+    """
+    system_instruction = (
+        "You are an expert Python code editor. "
+        "You will be given 'Current Code' and a 'User Instruction'. "
+        "Apply the instruction by returning ONLY a unified diff against the Current Code: "
+        "hunks starting with '@@ -start,count +start,count @@', "
+        "' ' for unchanged context lines, '-' for removed lines, '+' for added lines. "
+        "Include 2 lines of context around each change and copy context lines exactly. "
+        "Do not repeat unchanged parts of the file. No explanations, no markdown."
+    )
+    user_content = f"Current Code:\n{current_code}\n\nUser Instruction:\n{prompt}"
+    return [
+        {"role": "system", "content": system_instruction},
+        {"role": "user", "content": user_content}
+    ]
+
+def sliced_messages(prompt, plan):
+    """
+    Builds the chat messages for editing only the regions in a ContextPlan.
+    """
+    system_instruction = (
+        "You are an expert code editor. "
+        "You will be given an 'Outline' of a file, where '...' stands for code that is not shown "
+        "and '<<< REGION n >>>' marks where each region sits, the full text of those 'Regions', "
+        "and a 'User Instruction'. Apply the instruction by rewriting the regions. "
+        "For every region output '### REGION n' on its own line, the complete updated region, "
+        "then '### END' on its own line. Keep regions you do not need to change as they are. "
+        "New helper functions may be added inside a region block. "
+        "Output nothing else. No markdown."
+    )
+    user_content = f"Outline:\n{plan.outline()}\n\nRegions:\n{plan.render_regions()}\n\nUser Instruction:\n{prompt}"
+    return [
+        {"role": "system", "content": system_instruction},
+        {"role": "user", "content": user_content}
+    ]
+
+def _compiles(code):
     try:
-        client = Groq(api_key=API_KEY)
-        completion = client.chat.completions.create(
-            model="llama-3.1-8b-instant",
-            messages=[
-                {"role": "system", "content": system_instruction},
-                {"role": "user", "content": user_content}
-            ],
-            temperature=0.1,
-        )
-        code = completion.choices[0].message.content
-        # Post-process to remove markdown
-        if code.startswith("```python"):
-            code = code.replace("```python", "").replace("```", "")
-        elif code.startswith("```"):
-            code = code.replace("```", "")
-        # Remove any leading/trailing whitespace
-        return code.strip()
+        compile(code, "<generated>", "exec")
+        return True
+    except (SyntaxError, ValueError):
+        return False
+
+def _patch_code(prompt, current_code, priority="voice"):
+    """
+    Asks for a diff and applies it locally. Returns None when the reply is not
+    a diff that applies cleanly (or breaks code that used to compile).
+    """
+    try:
+        patch = chat_completion(patch_messages(prompt, current_code), temperature=0.1, priority=priority)
+        new_code = apply_patch(current_code, patch)
+    except (LLMError, PatchError) as e:
+        print(f"↩️ Patch edit failed ({e}), regenerating the full file")
+        _count("patch_fallbacks")
+        return None
+    if _compiles(current_code) and not _compiles(new_code):
+        print("↩️ Patched code no longer compiles, regenerating the full file")
+        _count("patch_fallbacks")
+        return None
+    _count("patched")
+    return new_code.strip()
+
+def _sliced_code(prompt, current_code, plan, priority="voice"):
+    """
+    Sends only the planned regions and splices the rewritten ones back.
+    Returns None when the reply cannot be used.
+    """
+    try:
+        reply = chat_completion(sliced_messages(prompt, plan), temperature=0.1, priority=priority)
+        new_code = plan.splice(plan.parse_reply(reply))
+    except (LLMError, PatchError) as e:
+        print(f"↩️ Sliced edit failed ({e}), sending the whole file")
+        _count("slice_fallbacks")
+        return None
+    if _compiles(current_code) and not _compiles(new_code):
+        print("↩️ Sliced edit no longer compiles, sending the whole file")
+        _count("slice_fallbacks")
+        return None
+    _count("sliced")
+    return new_code.strip()
+
+def clean_code(code):
+    """
+    Removes markdown fences the model adds despite instructions.
+    """
+    if code.startswith("```python"):
+        code = code.replace("```python", "").replace("```", "")
+    elif code.startswith("```"):
+        code = code.replace("```", "")
+    # Remove any leading/trailing whitespace
+    return code.strip()
+
+def code_cache_key(prompt, current_code=""):
+    return response_key("generate_code", prompt, current_code, DEFAULT_MODEL, 0.1)
+
+def generate_code(prompt, current_code="", edit_mode=None, bypass_cache=False, priority="voice"):
+    """
+    Generates or Edits code based on the user's instruction.
+    In "patch" mode, instructions that name definitions in a large file edit
+    just those regions; other edits to files of PATCH_MIN_LINES or more go
+    through a diff. Either falls back to full regeneration if it fails.
+    Repeats of an instruction on the same code come from llm_cache unless
+    bypass_cache is set. priority is the llm_scheduler queue the requests join.
+    """
+    if not api_key():
+        return "# Error: Missing API Key"
+
+    key = code_cache_key(prompt, current_code)
+    cached = llm_cache.get(key, bypass=bypass_cache)
+    if cached is not None:
+        print("⚡ LLM cache hit")
+        return cached
+
+    # Identical requests already in flight share one completion
+    return llm_flight.do(key, _generate, prompt, current_code, edit_mode or EDIT_MODE, key, priority)
+
+def _generate(prompt, current_code, edit_mode, key, priority):
+    print(f"🧠 Sending to Llama 3.1...")
+
+    plan = plan_context(prompt, current_code) if edit_mode == "patch" and current_code else None
+    if plan is not None:
+        print(f"✂️ Editing {', '.join(r.name for r in plan.regions)} only")
+        code = _sliced_code(prompt, current_code, plan, priority)
+        if code is not None:
+            llm_cache.put(key, code)
+            return code
+
+    if edit_mode == "patch" and current_code and len(current_code.splitlines()) >= PATCH_MIN_LINES:
+        code = _patch_code(prompt, current_code, priority)
+        if code is not None:
+            llm_cache.put(key, code)
+            return code
+
+    try:
+        code = clean_code(chat_completion(code_messages(prompt, current_code), temperature=0.1, priority=priority))
+        _count("full")
+        llm_cache.put(key, code)
+        return code
     except Exception as e:
         print(f"❌ Error: {e}")
-        return "# Error generating code."
\ No newline at end of file
+        return "# Error generating code."
+
+def stream_code(prompt, current_code=""):
+    """
+    Same as generate_code, but yields the raw code text as it is generated.
+    Callers run clean_code() on the joined text once the stream ends.
+    Raises LLMError on failure.
+    """
+    print(f"🧠 Streaming from Llama 3.1...")
+    yield from stream_chat_completion(code_messages(prompt, current_code), temperature=0.1, priority="voice")
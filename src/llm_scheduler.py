@@ -0,0 +1,177 @@
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from collections import deque
+
+# Lower value = served first when requests queue for quota
+PRIORITIES = {"voice": 0, "debug": 1, "background": 2}
+
+# Quota of the Groq plan; 0 disables that limit
+RATE_RPM = float(os.environ.get("LLM_RATE_RPM", "30"))
+RATE_TPM = float(os.environ.get("LLM_RATE_TPM", "6000"))
+# Longest a request waits for quota before giving up (seconds), per priority
+MAX_WAIT = {
+    "voice": float(os.environ.get("LLM_MAX_WAIT_VOICE", "20")),
+    "debug": float(os.environ.get("LLM_MAX_WAIT_DEBUG", "30")),
+    "background": float(os.environ.get("LLM_MAX_WAIT_BACKGROUND", "120")),
+}
+MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "3"))
+BACKOFF_BASE = float(os.environ.get("LLM_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.environ.get("LLM_BACKOFF_MAX", "8"))
+
+
+class QuotaTimeout(TimeoutError):
+    """A request waited longer than its MAX_WAIT for rate-limit quota."""
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Exponential backoff with jitter (half fixed, half random); never shorter than a server's Retry-After."""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+    delay = delay / 2 + random.uniform(0, delay / 2)
+    return max(delay, retry_after or 0)
+
+
+def estimate_tokens(messages, max_tokens=None):
+    """Rough prompt + completion size (4 characters per token) for the tokens-per-minute bucket."""
+    prompt = sum(len(m.get("content", "")) for m in messages) // 4
+    return prompt + (max_tokens or 512)
+
+
+class TokenBucket:
+    """Refills at rate_per_minute, holding at most one minute's worth."""
+
+    def __init__(self, rate_per_minute):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, n, now):
+        """Seconds until n tokens are available (requests bigger than the bucket wait for a full one)."""
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        n = min(n, self.capacity)
+        return max(0.0, (n - self.tokens) / self.rate)
+
+    def take(self, n):
+        if self.rate:
+            self.tokens -= min(n, self.capacity)
+
+    def refund(self, n):
+        """Corrects an estimate once the real usage is known (n may be negative)."""
+        if self.rate:
+            self.tokens = min(self.capacity, self.tokens + n)
+
+
+class LLMScheduler:
+    """
+    Hands out LLM API quota in priority order.
+
+    Callers block in acquire() until they are the highest-priority waiter
+    (FIFO within a class) and both the requests-per-minute and the
+    tokens-per-minute buckets can pay for them. A 429 from the API pauses
+    everyone via pause(), since the quota is shared.
+    """
+
+    def __init__(self, rpm=RATE_RPM, tpm=RATE_TPM, max_wait=MAX_WAIT, history=1000):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_wait = dict(max_wait)
+        self._cond = threading.Condition()
+        self._waiting = []  # heap of [rank, seq]
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        self._wait_ms = {p: deque(maxlen=history) for p in PRIORITIES}
+        self._stats = {"granted": 0, "throttled": 0, "quota_timeouts": 0, "retries": 0, "rate_limited": 0}
+
+    def ticket(self):
+        """A place in line; retries pass the same ticket to acquire() so they keep their FIFO position."""
+        return next(self._seq)
+
+    def acquire(self, priority="background", tokens=0, ticket=None):
+        """Blocks until this request may be sent. Raises QuotaTimeout after max_wait[priority]."""
+        entry = [PRIORITIES[priority], self.ticket() if ticket is None else ticket]
+        started = time.monotonic()
+        deadline = started + self.max_wait[priority]
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = None
+                    if self._waiting[0] is entry:
+                        delay = max(
+                            self._paused_until - now,
+                            self.requests.wait_time(1, now),
+                            self.tokens.wait_time(tokens, now),
+                        )
+                        if delay <= 0:
+                            self.requests.take(1)
+                            self.tokens.take(tokens)
+                            break
+                    if now >= deadline:
+                        self._stats["quota_timeouts"] += 1
+                        raise QuotaTimeout(f"No LLM quota for {priority} request within {self.max_wait[priority]:g} s")
+                    self._cond.wait(min(delay, deadline - now) if delay is not None else deadline - now)
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+            waited = (time.monotonic() - started) * 1000
+            self._wait_ms[priority].append(waited)
+            self._stats["granted"] += 1
+            if waited > 1:
+                self._stats["throttled"] += 1
+        return waited
+
+    def settle(self, estimated, actual):
+        """Replaces a token estimate with the usage the API reported."""
+        if actual:
+            with self._cond:
+                self.tokens.refund(estimated - actual)
+                self._cond.notify_all()
+
+    def pause(self, seconds):
+        """Holds every request back for seconds (after a 429)."""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._stats["rate_limited"] += 1
+
+    def count_retry(self):
+        with self._cond:
+            self._stats["retries"] += 1
+
+    def stats(self):
+        with self._cond:
+            depth = {p: 0 for p in PRIORITIES}
+            by_rank = {rank: p for p, rank in PRIORITIES.items()}
+            for rank, _ in self._waiting:
+                depth[by_rank[rank]] += 1
+            wait_ms = {}
+            for p, samples in self._wait_ms.items():
+                ordered = sorted(samples)
+                if ordered:
+                    wait_ms[p] = {
+                        "p50": round(ordered[len(ordered) // 2], 1),
+                        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+                    }
+            return dict(
+                self._stats,
+                queue_depth=depth,
+                wait_ms=wait_ms,
+                rpm=self.requests.capacity,
+                tpm=self.tokens.capacity,
+                tokens_available=round(self.tokens.tokens),
+            )
+
+
+llm_scheduler = LLMScheduler()
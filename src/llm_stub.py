@@ -0,0 +1,259 @@
+"""
+Local stand-in for the Groq chat completions API, for load tests and
+benchmarks on machines without network access or an API key.
+
+Replies are canned per prompt type (code creation, full-file edit, diff,
+region edit, debug JSON, test cases) and derived from the request, so the
+same request always gets the same reply and every server path succeeds.
+Latency, generation speed and injected errors are configurable.
+
+Usage:
+    python -m src.llm_stub --port 8765 --latency-ms 200 --tokens-per-s 500
+    LLM_BACKEND=stub python server.py
+"""
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+
+STUB_LATENCY_MS = float(os.environ.get("LLM_STUB_LATENCY_MS", "200"))
+STUB_TOKENS_PER_S = float(os.environ.get("LLM_STUB_TOKENS_PER_S", "500"))
+STUB_ERROR_RATE = float(os.environ.get("LLM_STUB_ERROR_RATE", "0"))
+STUB_ERROR_STATUS = os.environ.get("LLM_STUB_ERROR_STATUS", "503")
+STUB_REPLIES = os.environ.get("LLM_STUB_REPLIES", "")
+STUB_SEED = int(os.environ.get("LLM_STUB_SEED", "0"))
+
+CHARS_PER_TOKEN = 4
+
+
+def _instruction(user):
+    for marker in ("User Instruction:\n", "Voice command: "):
+        if marker in user:
+            return user.split(marker, 1)[1].split("\n", 1)[0].strip()
+    return user.strip().split("\n", 1)[0]
+
+
+def _code(user):
+    match = re.search(r"(?:Current Code|Code):\n(?:```\n)?(.*?)(?:\n```)?\n\n(?:User Instruction|Terminal output|Error/Output|Test Results)", user, re.S)
+    if match:
+        return match.group(1)
+    match = re.search(r"Code:\n```\n(.*?)\n```", user, re.S)
+    return match.group(1) if match else ""
+
+
+def _create_reply(system, user):
+    return f"# {_instruction(user)}\ndef solution():\n    pass\n"
+
+
+def _edit_reply(system, user):
+    return f"# {_instruction(user)}\n{_code(user)}"
+
+
+def _diff_reply(system, user):
+    return f"@@ -0,0 +1,1 @@\n+# {_instruction(user)}\n"
+
+
+def _regions_reply(system, user):
+    blocks = re.findall(r"^### REGION (\d+)[^\n]*\n(.*?)^### END$", user, re.S | re.M)
+    comment = f"# {_instruction(user)}\n"
+    return "\n".join(f"### REGION {n}\n{comment}{text}### END" for n, text in blocks)
+
+
+def _debug_reply(system, user):
+    return json.dumps({
+        "diagnosis": "The stub backend found nothing wrong.",
+        "suggestion": "Nothing to change; this reply comes from the LLM stub.",
+        "fixed_code": _code(user),
+        "hint": "Run against LLM_BACKEND=groq for real analysis.",
+    })
+
+
+def _test_cases_reply(system, user):
+    match = re.search(r"Function: def \w+\s*\(([^)]*)\)", user)
+    params = [p.split(":")[0].split("=")[0].strip() for p in (match.group(1) if match else "").split(",")]
+    params = [p for p in params if p and p != "self"]
+    return json.dumps([{"input": {p: i for p in params}, "expected": i} for i in range(4)])
+
+
+# (pattern searched in the system + user prompt, reply function), first match wins
+BUILTIN_REPLIES = [
+    (r"unified diff", _diff_reply),
+    (r"### REGION", _regions_reply),
+    (r"test cases as JSON", _test_cases_reply),
+    (r'"diagnosis"', _debug_reply),
+    (r"Return the FULL updated code", _edit_reply),
+    (r"Output ONLY valid Python code", _create_reply),
+]
+
+
+def load_replies(path):
+    """
+    Custom replies from a JSON file: [{"match": regex, "reply": template}],
+    templates being string.Template text with $instruction and $code.
+    """
+    with open(path, "r") as f:
+        rules = json.load(f)
+    return [
+        (rule["match"], lambda system, user, t=Template(rule["reply"]): t.safe_substitute(
+            instruction=_instruction(user), code=_code(user)))
+        for rule in rules
+    ]
+
+
+class StubConfig:
+    def __init__(self, latency_ms=STUB_LATENCY_MS, tokens_per_s=STUB_TOKENS_PER_S, error_rate=STUB_ERROR_RATE,
+                 error_status=STUB_ERROR_STATUS, replies=STUB_REPLIES, seed=STUB_SEED):
+        self.latency_ms = latency_ms
+        self.tokens_per_s = tokens_per_s
+        self.error_rate = error_rate
+        self.error_status = [int(s) for s in str(error_status).split(",") if s.strip()]
+        self.rules = (load_replies(replies) if replies else []) + BUILTIN_REPLIES
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "streamed": 0, "errors_injected": 0}
+
+    def reply(self, messages):
+        system = "\n".join(m.get("content", "") for m in messages if m.get("role") == "system")
+        user = "\n".join(m.get("content", "") for m in messages if m.get("role") != "system")
+        for pattern, build in self.rules:
+            if re.search(pattern, system + "\n" + user):
+                return build(system, user)
+        return "OK"
+
+    def count(self, field):
+        with self._lock:
+            self.stats[field] += 1
+
+    def injected_error(self):
+        """Status code to fail this request with, or None."""
+        with self._lock:
+            self.stats["requests"] += 1
+            if self.error_status and self._random.random() < self.error_rate:
+                self.stats["errors_injected"] += 1
+                return self._random.choice(self.error_status)
+        return None
+
+    def token_delay(self):
+        return 1.0 / self.tokens_per_s if self.tokens_per_s > 0 else 0.0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_POST(self):
+        config = self.server.config
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            messages = body["messages"]
+        except (ValueError, KeyError):
+            self._send(400, json.dumps({"error": {"message": "Invalid request body"}}))
+            return
+
+        time.sleep(config.latency_ms / 1000)
+        status = config.injected_error()
+        if status is not None:
+            headers = {"Retry-After": "1"} if status == 429 else None
+            self._send(status, json.dumps({"error": {"message": f"Injected {status} from the LLM stub"}}),
+                       headers=headers)
+            return
+
+        content = config.reply(messages)
+        pieces = [content[i:i + CHARS_PER_TOKEN] for i in range(0, len(content), CHARS_PER_TOKEN)]
+        prompt_tokens = sum(len(m.get("content", "")) for m in messages) // CHARS_PER_TOKEN
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(pieces),
+                 "total_tokens": prompt_tokens + len(pieces)}
+        model = body.get("model", "stub")
+
+        if not body.get("stream"):
+            time.sleep(len(pieces) * config.token_delay())
+            self._send(200, json.dumps({
+                "object": "chat.completion",
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop"}],
+                "usage": usage,
+            }))
+            return
+
+        config.count("streamed")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for piece in pieces:
+                event = {"object": "chat.completion.chunk", "model": model,
+                         "choices": [{"index": 0, "delta": {"content": piece}}]}
+                self._chunk(f"data: {json.dumps(event)}\n\n".encode())
+                time.sleep(config.token_delay())
+            # Like Groq, the last chunk carries the usage
+            event = {"object": "chat.completion.chunk", "model": model,
+                     "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "x_groq": {"usage": usage}}
+            self._chunk(f"data: {json.dumps(event)}\n\n".encode())
+            self._chunk(b"data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client hung up mid-stream
+
+
+class _StubServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        pass  # clients dropping keep-alive connections are expected under load
+
+
+def start_stub(host="127.0.0.1", port=0, **config):
+    """Starts the stub on a background thread. Returns (server, chat completions URL)."""
+    server = _StubServer((host, port), _Handler)
+    server.config = StubConfig(**config)
+    threading.Thread(target=server.serve_forever, name="llm-stub", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1/chat/completions"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=STUB_LATENCY_MS, help="delay before the first token")
+    parser.add_argument("--tokens-per-s", type=float, default=STUB_TOKENS_PER_S, help="generation speed, 0 = instant")
+    parser.add_argument("--error-rate", type=float, default=STUB_ERROR_RATE, help="share of requests that fail")
+    parser.add_argument("--error-status", default=STUB_ERROR_STATUS, help="comma-separated statuses to fail with")
+    parser.add_argument("--replies", default=STUB_REPLIES, help="JSON file of extra {match, reply} rules")
+    parser.add_argument("--seed", type=int, default=STUB_SEED)
+    args = parser.parse_args()
+
+    server, url = start_stub(
+        args.host, args.port, latency_ms=args.latency_ms, tokens_per_s=args.tokens_per_s,
+        error_rate=args.error_rate, error_status=args.error_status, replies=args.replies, seed=args.seed,
+    )
+    print(f"🧪 LLM stub listening on {url} (LLM_BACKEND=stub LLM_STUB_URL={url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
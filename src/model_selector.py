@@ -0,0 +1,77 @@
+import os
+import threading
+
+# Candidate sizes, smallest (fastest) first
+MODEL_SIZES = ("tiny", "base", "small")
+DEFAULT_MODEL_SIZE = os.environ.get("WHISPER_MODEL", "base")
+
+# Starting guesses for decode milliseconds per second of audio on a CPU host.
+# Replaced by measurements as soon as each size has decoded something.
+PRIOR_MS_PER_SECOND = {"tiny": 40.0, "base": 90.0, "small": 300.0}
+# Fixed per-call cost (mel + encoder over the padded 30 s window)
+PRIOR_OVERHEAD_MS = {"tiny": 150.0, "base": 350.0, "small": 1200.0}
+
+# Weight of the newest measurement in the moving average
+SMOOTHING = 0.2
+
+
+class ModelSelector:
+    """
+    Picks the largest Whisper size whose predicted latency fits a budget.
+
+    Predicted latency = (clips queued ahead + 1) * (overhead + rate * seconds),
+    where rate is an exponentially weighted average of measured decode
+    speed for that size.
+    """
+
+    def __init__(self, sizes=MODEL_SIZES, smoothing=SMOOTHING):
+        self.sizes = tuple(sizes)
+        self.smoothing = smoothing
+        self._rate = {s: PRIOR_MS_PER_SECOND.get(s, 500.0) for s in self.sizes}
+        self._overhead = {s: PRIOR_OVERHEAD_MS.get(s, 1500.0) for s in self.sizes}
+        self._samples = {s: 0 for s in self.sizes}
+        self._chosen = {s: 0 for s in self.sizes}
+        self._over_budget = 0
+        self._lock = threading.Lock()
+
+    def observe(self, model_size, audio_seconds, decode_ms):
+        """Feeds back one measured decode."""
+        if model_size not in self._rate or audio_seconds <= 0:
+            return
+        with self._lock:
+            per_second = max(decode_ms - self._overhead[model_size], 0.0) / audio_seconds
+            a = self.smoothing
+            self._rate[model_size] = (1 - a) * self._rate[model_size] + a * per_second
+            self._samples[model_size] += 1
+
+    def predict_ms(self, model_size, audio_seconds, queue_depth=0):
+        with self._lock:
+            single = self._overhead[model_size] + self._rate[model_size] * audio_seconds
+        return (queue_depth + 1) * single
+
+    def choose(self, audio_seconds, budget_ms, queue_depth=0):
+        """Returns (model_size, predicted_ms). Falls back to the smallest size if nothing fits."""
+        for size in reversed(self.sizes):
+            predicted = self.predict_ms(size, audio_seconds, queue_depth)
+            if predicted <= budget_ms:
+                break
+        else:
+            size = self.sizes[0]
+            predicted = self.predict_ms(size, audio_seconds, queue_depth)
+            with self._lock:
+                self._over_budget += 1
+        with self._lock:
+            self._chosen[size] += 1
+        return size, predicted
+
+    def stats(self):
+        with self._lock:
+            return {
+                "ms_per_audio_second": {s: round(r, 1) for s, r in self._rate.items()},
+                "measurements": dict(self._samples),
+                "chosen": dict(self._chosen),
+                "over_budget": self._over_budget,
+            }
+
+
+selector = ModelSelector()
@@ -0,0 +1,72 @@
+import re
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+\d+(?:,\d+)? @@")
+
+
+class PatchError(ValueError):
+    """The model's edit (a diff, or rewritten regions) cannot be applied to the current code."""
+
+
+def parse_unified_diff(text):
+    """
+    Parses a unified diff into hunks of (index, old_lines, new_lines), index
+    being the 0-based position the header points at.
+
+    File headers, ``` fences and "\\ No newline" markers are ignored. Line
+    counts in the hunk headers are ignored as well (models often get them
+    wrong); hunks are located by their content when applied.
+    """
+    hunks = []
+    current = None
+    for line in text.splitlines():
+        header = _HUNK_HEADER.match(line)
+        if header:
+            # "-5,0" is an insertion after line 5; otherwise the hunk starts at line 5
+            start = int(header.group(1))
+            current = (start if header.group(2) == "0" else start - 1, [], [])
+            hunks.append(current)
+        elif current is None or line.startswith(("```", "\\")):
+            continue  # file headers before the first hunk, fences, "\ No newline"
+        elif line.startswith("-"):
+            current[1].append(line[1:])
+        elif line.startswith("+"):
+            current[2].append(line[1:])
+        else:
+            # Context line; models often drop the leading space on blank lines
+            line = line[1:] if line.startswith(" ") else line
+            current[1].append(line)
+            current[2].append(line)
+    if not hunks:
+        raise PatchError("No hunks found in patch")
+    return hunks
+
+
+def _find(lines, old, hint, start):
+    """Index at or after start where old matches (ignoring trailing whitespace), nearest to hint."""
+    want = [l.rstrip() for l in old]
+    matches = [
+        i for i in range(start, len(lines) - len(old) + 1)
+        if [l.rstrip() for l in lines[i:i + len(old)]] == want
+    ]
+    if not matches:
+        return None
+    return min(matches, key=lambda i: abs(i - hint))
+
+
+def apply_patch(code, patch_text):
+    """Applies a unified diff to code and returns the new code. Raises PatchError."""
+    lines = code.splitlines()
+    offset = 0  # lines added minus removed so far, to adjust later header positions
+    pos = 0
+    for index, old, new in parse_unified_diff(patch_text):
+        hint = max(index + offset, pos)
+        if old:
+            at = _find(lines, old, hint, pos)
+            if at is None:
+                raise PatchError(f"Hunk at line {index + 1} does not match the current code")
+        else:
+            at = min(hint, len(lines))
+        lines[at:at + len(old)] = new
+        offset += len(new) - len(old)
+        pos = at + len(new)
+    return "\n".join(lines) + ("\n" if code.endswith("\n") else "")
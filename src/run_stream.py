@@ -0,0 +1,97 @@
+import codecs
+import os
+import shutil
+import signal
+import subprocess
+import time
+
+from src.fork_server import pump
+
+# Output forwarded per streamed run; the rest is counted but dropped
+MAX_OUTPUT_BYTES = int(os.environ.get("EXEC_STREAM_MAX_BYTES", str(64 * 1024)))
+# C stdio fully buffers output to a pipe; stdbuf (GNU coreutils) makes compiled programs flush per line
+STDBUF = shutil.which("stdbuf")
+
+
+def _kill(proc):
+    """Kills proc's whole process group (it runs in its own session), so its children die too."""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    proc.wait()
+
+
+def stream_command(cmd, input="", timeout=None, cwd=None):
+    """
+    Runs cmd and yields ("stdout" | "stderr", bytes) as it writes, then
+    ("exit", returncode), or ("timeout", None) once it has been killed - the
+    same events as ForkServer.stream(). Closing the generator early kills
+    the process, along with anything it started.
+    """
+    if STDBUF:
+        cmd = [STDBUF, "-oL", "-eL"] + list(cmd)
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=cwd,
+                            start_new_session=True)
+    fds = [os.dup(f.fileno()) for f in (proc.stdin, proc.stdout, proc.stderr)]
+    for f in (proc.stdin, proc.stdout, proc.stderr):
+        f.close()
+    deadline = time.monotonic() + timeout if timeout else None
+    output = pump(fds, (input or "").encode(), timeout)
+    try:
+        for kind, data in output:
+            if kind == "timeout":
+                break
+            yield kind, data
+        else:
+            try:  # output closed; the process may still be running
+                returncode = proc.wait(None if deadline is None else max(0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                pass
+            else:
+                yield "exit", returncode
+                return
+        _kill(proc)
+        yield "timeout", None
+    finally:
+        output.close()
+        if proc.poll() is None:  # abandoned by the caller
+            _kill(proc)
+
+
+class OutputLimiter:
+    """
+    Decodes a run's output chunks and forwards at most max_bytes of them;
+    the first chunk over the limit is cut and followed by a truncation
+    marker, later ones are only counted.
+    """
+
+    def __init__(self, max_bytes=MAX_OUTPUT_BYTES):
+        self.max_bytes = max_bytes
+        self.sent = 0
+        self.bytes = {"stdout": 0, "stderr": 0}
+        self.truncated = False
+        self._decoders = {name: codecs.getincrementaldecoder("utf-8")("replace") for name in self.bytes}
+
+    def feed(self, stream, data):
+        """Returns the (stream, text) chunks to forward for data read from stream."""
+        self.bytes[stream] += len(data)
+        if self.truncated:
+            return []
+        room = self.max_bytes - self.sent
+        if len(data) <= room:
+            self.sent += len(data)
+            text = self._decoders[stream].decode(data)
+            return [(stream, text)] if text else []
+        self.sent = self.max_bytes
+        self.truncated = True
+        text = self._decoders[stream].decode(data[:room], final=True)
+        marker = f"\n… output truncated after {self.max_bytes} bytes …\n"
+        return ([(stream, text)] if text else []) + [(stream, marker)]
+
+    def flush(self):
+        """Text still buffered in the decoders (an incomplete character at the end of output)."""
+        if self.truncated:
+            return []
+        return [(name, text) for name, d in self._decoders.items() if (text := d.decode(b"", final=True))]
+
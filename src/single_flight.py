@@ -0,0 +1,51 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait on its Future and get the same result (or exception).
+    Nothing is remembered once the call finishes - that is the caches' job.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {"executed": 0, "coalesced": 0}
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self._stats["executed"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._calls))
+
+
+# Identical LLM requests (same cache key) in flight at the same moment
+llm_flight = SingleFlight()
@@ -0,0 +1,150 @@
+import concurrent.futures
+import os
+import threading
+import time
+from collections import deque
+
+from src.llm_engine import code_cache_key, generate_code
+
+# Start generating once the partial transcript has not changed for this long (streaming sessions)
+SPECULATE = os.environ.get("VOICE_SPECULATE", "0").lower() in ("1", "true")
+STABLE_SECONDS = float(os.environ.get("VOICE_SPECULATE_STABLE_SECONDS", "1.0"))
+SPECULATION_THREADS = int(os.environ.get("VOICE_SPECULATE_THREADS", "4"))
+
+
+class Speculation:
+    """
+    Speculative code generation for one streaming voice session.
+
+    observe() is fed the partial transcript after every chunk; once it has
+    held still for stable_seconds, generate_code starts on it in the
+    background. resolve() takes the final transcript: if it asks for the
+    same thing (same cache key, so spacing and trailing punctuation do not
+    matter, case does) the speculative result is used, otherwise the guess is
+    cancelled and the final transcript is sent instead. Nothing is written
+    anywhere until resolve() returns.
+
+    Guesses queue for LLM quota as "background" requests, so they never
+    delay a command somebody is waiting on.
+    """
+
+    def __init__(self, dispatcher, current_code, bypass_cache=False):
+        self.dispatcher = dispatcher
+        self.current_code = current_code
+        self.bypass_cache = bypass_cache
+        self.partial = ""
+        self.changed_at = time.monotonic()
+        self.key = None
+        self.future = None
+        self.started_at = None
+        self._lock = threading.Lock()
+
+    def observe(self, partial):
+        with self._lock:
+            self._observe(partial, time.monotonic())
+
+    def _observe(self, partial, now):
+        if partial != self.partial:
+            self.partial, self.changed_at = partial, now
+            return
+        if not partial or now - self.changed_at < self.dispatcher.stable_seconds:
+            return
+        key = code_cache_key(partial, self.current_code)
+        if key == self.key:
+            return
+        if self.future is not None:
+            self.dispatcher.discard(self.future, "replaced")
+        print(f"🔮 Speculating on: {partial}")
+        self.key, self.started_at = key, now
+        self.future = self.dispatcher.submit(partial, self.current_code, self.bypass_cache)
+
+    def resolve(self, text, current_code, bypass_cache=False, timeout=None):
+        """
+        Code for the final transcript, from the speculative request when it
+        guessed right. A matching guess is waited on for at most timeout
+        seconds; raises TimeoutError then rather than starting over.
+        """
+        with self._lock:
+            future, self.future = self.future, None
+        if future is not None and self.key == code_cache_key(text, current_code):
+            resolved_at = time.monotonic()
+            try:
+                code, finished_at = future.result(timeout)
+            except concurrent.futures.TimeoutError:
+                # A new request would start from scratch with the time already spent
+                self.dispatcher.discard(future, "misses")
+                raise TimeoutError(f"Speculative generation did not finish within {timeout:g} s") from None
+            except Exception as e:  # failed: fall through to a normal request
+                print(f"⚠️ Speculative generation failed ({e}), generating again")
+                self.dispatcher.discard(future, "misses")
+            else:
+                # The part of the generation that ran before the transcript was final
+                self.dispatcher.record_hit((min(finished_at, resolved_at) - self.started_at) * 1000)
+                return code
+        elif future is not None:
+            self.dispatcher.discard(future, "misses")
+        else:
+            self.dispatcher.count("unspeculated")
+        return self.dispatcher.generate(text, current_code=current_code, bypass_cache=bypass_cache)
+
+    def cancel(self):
+        with self._lock:
+            future, self.future = self.future, None
+        if future is not None:
+            self.dispatcher.discard(future, "abandoned")
+
+
+class SpeculativeDispatcher:
+    """Runs speculative generate_code calls on a small thread pool and keeps hit/miss counters."""
+
+    def __init__(self, generate=generate_code, stable_seconds=STABLE_SECONDS, threads=SPECULATION_THREADS,
+                 history=1000):
+        self.generate = generate
+        self.stable_seconds = stable_seconds
+        self.executor = concurrent.futures.ThreadPoolExecutor(threads, thread_name_prefix="speculate")
+        self._lock = threading.Lock()
+        self._stats = {"started": 0, "hits": 0, "misses": 0, "replaced": 0, "abandoned": 0,
+                       "cancelled_before_send": 0, "unspeculated": 0}
+        self._saved_ms = deque(maxlen=history)
+
+    def track(self, current_code, bypass_cache=False):
+        return Speculation(self, current_code, bypass_cache)
+
+    def submit(self, prompt, current_code, bypass_cache):
+        """Future of (code, monotonic time it finished)."""
+        self.count("started")
+        return self.executor.submit(self._run, prompt, current_code, bypass_cache)
+
+    def _run(self, prompt, current_code, bypass_cache):
+        code = self.generate(prompt, current_code=current_code, bypass_cache=bypass_cache, priority="background")
+        return code, time.monotonic()
+
+    def discard(self, future, reason):
+        """Drops a speculative request; one already sent finishes in the background and only warms the cache."""
+        self.count(reason)
+        if future.cancel():
+            self.count("cancelled_before_send")
+
+    def count(self, field):
+        with self._lock:
+            self._stats[field] += 1
+
+    def record_hit(self, saved_ms):
+        with self._lock:
+            self._stats["hits"] += 1
+            self._saved_ms.append(saved_ms)
+
+    def stats(self):
+        with self._lock:
+            resolved = self._stats["hits"] + self._stats["misses"]
+            saved = sorted(self._saved_ms)
+            return dict(
+                self._stats,
+                enabled=SPECULATE,
+                stable_seconds=self.stable_seconds,
+                hit_rate=round(self._stats["hits"] / resolved, 3) if resolved else None,
+                saved_ms={"p50": round(saved[len(saved) // 2], 1), "total": round(sum(saved), 1)} if saved else {},
+            )
+
+
+speculator = SpeculativeDispatcher()
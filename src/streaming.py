@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from src.transcriber import DEFAULT_PROFILE, decode_options, registry
+
+SAMPLE_RATE = 16000
+
+# Whisper only ever looks at 30 s of audio; keep the live window below that
+MAX_WINDOW_SECONDS = float(os.environ.get("STREAM_MAX_WINDOW_SECONDS", "24"))
+# Re-decode once this much new audio has arrived since the last pass
+DECODE_STEP_SECONDS = float(os.environ.get("STREAM_DECODE_STEP_SECONDS", "1.0"))
+# Sessions that receive nothing for this long are dropped
+SESSION_TTL_SECONDS = 300
+
+
+def pcm_from_bytes(data, fmt="pcm16"):
+    """Converts a raw 16 kHz mono chunk (int16 or float32 little-endian) into float32 samples."""
+    if fmt == "f32":
+        usable = len(data) - (len(data) % 4)
+        return np.frombuffer(data[:usable], dtype="<f4").astype(np.float32)
+    usable = len(data) - (len(data) % 2)
+    return np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+
+
+class StreamingSession:
+    """
+    Incremental transcription over a sliding window.
+
+    Audio is appended as it is recorded and the uncommitted tail is
+    re-decoded every DECODE_STEP_SECONDS. A segment is committed once two
+    consecutive passes agree on it; committed audio is dropped from the
+    window so each pass stays short.
+    """
+
+    def __init__(self, model_size="base", profile=DEFAULT_PROFILE):
+        self.id = uuid.uuid4().hex
+        self.model_size = model_size
+        self.profile = profile
+        self.lock = threading.Lock()
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.committed = []
+        self.tentative = []
+        self.samples_since_decode = 0
+        self.decodes = 0
+        self.last_active = time.time()
+        self.speculation = None  # set by the server when speculative generation is on
+
+    def _decode(self):
+        """Runs Whisper over the current window and returns [(text, end_seconds), ...]."""
+        if self.buffer.size == 0:
+            return []
+        prompt = " ".join(self.committed[-3:]) or None
+        with registry.acquire(self.model_size) as model:
+            # Segment end times drive the window trimming, so timestamps stay on
+            options = dict(decode_options(self.profile, model), without_timestamps=False)
+            options["condition_on_previous_text"] = False
+            result = model.transcribe(self.buffer, initial_prompt=prompt, **options)
+        self.decodes += 1
+        self.samples_since_decode = 0
+        return [(seg["text"].strip(), seg["end"]) for seg in result.get("segments", []) if seg["text"].strip()]
+
+    def _commit(self, segments, count):
+        """Moves the first `count` segments into committed text and trims their audio."""
+        if count <= 0:
+            return
+        self.committed.extend(text for text, _ in segments[:count])
+        cut = int(segments[count - 1][1] * SAMPLE_RATE)
+        self.buffer = self.buffer[cut:]
+
+    def _stabilize(self, segments):
+        # Local agreement: segments that match the previous pass (except the
+        # still-open last one) will not change any more.
+        previous = self.tentative
+        stable = 0
+        for i in range(min(len(previous), len(segments) - 1)):
+            if previous[i][0] != segments[i][0]:
+                break
+            stable = i + 1
+
+        # Never let the window grow past what Whisper can see in one pass
+        window = self.buffer.size / SAMPLE_RATE
+        while stable < len(segments) - 1 and segments[stable][1] < window - MAX_WINDOW_SECONDS:
+            stable += 1
+        # A window filled by one long segment is never confirmed by a later
+        # one; commit the first segment rather than keep growing
+        if stable == 0 and segments and window > MAX_WINDOW_SECONDS:
+            stable = 1
+
+        self._commit(segments, stable)
+        if not segments and window > MAX_WINDOW_SECONDS:  # no speech: keep only the newest audio
+            self.buffer = self.buffer[-int(MAX_WINDOW_SECONDS * SAMPLE_RATE):]
+        self.tentative = [(text, end - segments[stable - 1][1] if stable else end) for text, end in segments[stable:]]
+
+    def add_audio(self, samples):
+        """Appends samples and re-decodes if enough new audio has arrived. Returns the current partial."""
+        with self.lock:
+            self.last_active = time.time()
+            self.buffer = np.concatenate([self.buffer, samples.astype(np.float32)])
+            self.samples_since_decode += samples.size
+            if self.samples_since_decode >= DECODE_STEP_SECONDS * SAMPLE_RATE:
+                self._stabilize(self._decode())
+            return self.snapshot()
+
+    def finish(self):
+        """Decodes whatever is left and commits it. Returns the final transcript."""
+        with self.lock:
+            if self.samples_since_decode or not self.tentative:
+                segments = self._decode()
+            else:
+                segments = self.tentative
+            self._commit(segments, len(segments))
+            self.tentative = []
+            return " ".join(self.committed).strip()
+
+    def snapshot(self):
+        committed = " ".join(self.committed).strip()
+        tentative = " ".join(text for text, _ in self.tentative).strip()
+        return {
+            "session_id": self.id,
+            "committed": committed,
+            "tentative": tentative,
+            "partial": f"{committed} {tentative}".strip(),
+            "buffered_seconds": round(self.buffer.size / SAMPLE_RATE, 2),
+            "decodes": self.decodes,
+        }
+
+
+class SessionStore:
+    """Thread-safe registry of live streaming sessions with idle expiry."""
+
+    def __init__(self, ttl=SESSION_TTL_SECONDS):
+        self.ttl = ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def create(self, model_size="base", profile=DEFAULT_PROFILE):
+        session = StreamingSession(model_size, profile)
+        with self._lock:
+            self._expire()
+            self._sessions[session.id] = session
+        return session
+
+    def get(self, session_id):
+        with self._lock:
+            self._expire()
+            return self._sessions.get(session_id)
+
+    def pop(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for sid in [sid for sid, s in self._sessions.items() if s.last_active < cutoff]:
+            session = self._sessions.pop(sid)
+            if session.speculation is not None:  # nobody will resolve it now
+                session.speculation.cancel()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+
+sessions = SessionStore()
+
+
+def transcribe_chunks(chunks, model_size="base", profile=DEFAULT_PROFILE, on_partial=None):
+    """
+    Transcribes audio while it is still being recorded.
+
+    `chunks` is any iterable of 16 kHz float32 arrays, e.g.
+    StreamingRecorder.chunks(). on_partial(text) is called whenever the
+    partial transcript changes. Returns the final transcript.
+    """
+    session = StreamingSession(model_size, profile)
+    last = ""
+    for chunk in chunks:
+        partial = session.add_audio(chunk)["partial"]
+        if on_partial and partial and partial != last:
+            on_partial(partial)
+            last = partial
+    return session.finish()
@@ -1,21 +1,223 @@
 import whisper
+import torch
+import copy
 import warnings
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 
 # Suppress annoying warnings for cleaner output
 warnings.filterwarnings("ignore")
 
-def transcribe_audio(audio_path, model_size="base"):
+# Upper bound for the combined weight memory of resident models (0 = unlimited)
+MODEL_CACHE_MB = int(os.environ.get("WHISPER_MODEL_CACHE_MB", "2048"))
+
+# "int8" swaps every Linear layer for a dynamically quantized one (CPU only)
+QUANTIZE = os.environ.get("WHISPER_QUANTIZE", "").lower()
+
+# Named decode settings, cheapest first. Voice commands are short English
+# sentences, so the cheaper profiles pin the language (no detection pass),
+# skip conditioning on earlier windows and cut down the temperature
+# fallback loop. fp16 is only ever used on GPU.
+DECODE_PROFILES = {
+    "fast": {
+        "language": "en",
+        "temperature": 0.0,
+        "condition_on_previous_text": False,
+        "without_timestamps": True,
+    },
+    "balanced": {
+        "language": "en",
+        "temperature": (0.0, 0.4),
+        "condition_on_previous_text": False,
+    },
+    "accurate": {
+        "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        "beam_size": 5,
+        "best_of": 5,
+        "condition_on_previous_text": True,
+    },
+}
+DEFAULT_PROFILE = os.environ.get("WHISPER_PROFILE", "balanced")
+
+
+def decode_options(profile, model):
+    """Keyword arguments for model.transcribe() under the named profile."""
+    if profile not in DECODE_PROFILES:
+        raise ValueError(f"Unknown decode profile '{profile}' (choose from {', '.join(DECODE_PROFILES)})")
+    return dict(DECODE_PROFILES[profile], fp16=model.device.type != "cpu")
+
+
+class _ResidentModel:
+    """A loaded model plus the bookkeeping the registry needs to share and evict it."""
+
+    def __init__(self, model):
+        self.model = model
+        # Whisper installs per-call kv-cache hooks on the module, so two decodes
+        # on the same model instance must never overlap.
+        self.lock = threading.Lock()
+        self.nbytes = _model_nbytes(model)
+        self.in_use = 0
+        self.last_used = time.time()
+
+
+def _model_nbytes(model):
+    """Approximate resident size of a torch module, including packed int8 weights."""
+    total = 0
+    pending = list(model.state_dict().values())
+    while pending:
+        value = pending.pop()
+        if isinstance(value, (tuple, list)):
+            pending.extend(value)
+        elif isinstance(value, torch.Tensor):
+            total += value.numel() * value.element_size()
+    return total
+
+
+def quantize_int8(model):
+    """
+    Returns a copy of the model whose Linear layers run dynamically int8-quantized.
+
+    Weights are stored as int8 and activations are quantized on the fly, so
+    the attention and MLP matmuls use the int8 CPU kernels. Convolutions,
+    embeddings and layer norms stay fp32.
+    """
+    model = copy.deepcopy(model)
+    # whisper.model.Linear only adds a dtype cast to forward(); the quantizer
+    # matches on exact type, so present them as plain nn.Linear first.
+    for module in model.modules():
+        if isinstance(module, whisper.model.Linear):
+            module.__class__ = torch.nn.Linear
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def load_model(model_size, quantize=QUANTIZE):
+    """Loads a Whisper model, optionally as the int8 CPU variant."""
+    if quantize != "int8":
+        return whisper.load_model(model_size)
+    model = quantize_int8(whisper.load_model(model_size, device="cpu"))
+    print(f"🗜️ Built int8 dynamically quantized Whisper '{model_size}' ({_model_nbytes(model) / 2**20:.0f} MB)")
+    return model
+
+
+class ModelRegistry:
     """
-    Takes an audio path and returns the transcribed text string.
+    Process-wide cache of loaded Whisper models.
+
+    Each model size is loaded once and shared by all request threads. Idle
+    sizes are evicted in LRU order whenever the resident total exceeds
+    max_memory_mb.
+    """
+
+    def __init__(self, max_memory_mb=MODEL_CACHE_MB, loader=None):
+        self.max_bytes = max_memory_mb * 1024 * 1024
+        self._loader = loader or load_model
+        self._models = OrderedDict()  # model_size -> _ResidentModel, LRU first
+        self._load_locks = {}
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def _count(self, model_size, field):
+        counts = self._counters.setdefault(model_size, {"loads": 0, "hits": 0, "evictions": 0})
+        counts[field] += 1
+
+    def _get_or_load(self, model_size):
+        with self._lock:
+            entry = self._models.get(model_size)
+            if entry is not None:
+                self._count(model_size, "hits")
+                entry.in_use += 1
+                self._models.move_to_end(model_size)
+                return entry
+            load_lock = self._load_locks.setdefault(model_size, threading.Lock())
+
+        # Only one thread loads a given size; the others wait and then hit.
+        with load_lock:
+            with self._lock:
+                entry = self._models.get(model_size)
+                if entry is not None:
+                    self._count(model_size, "hits")
+                    entry.in_use += 1
+                    self._models.move_to_end(model_size)
+                    return entry
+
+            print(f"🧠 Loading Whisper model ('{model_size}')... (this might take a moment first time)")
+            model = self._loader(model_size)
+
+            with self._lock:
+                entry = _ResidentModel(model)
+                entry.in_use += 1
+                self._models[model_size] = entry
+                self._count(model_size, "loads")
+                self._evict_idle()
+                return entry
+
+    def _evict_idle(self):
+        """Drop least-recently-used idle models until we fit the memory cap. Caller holds _lock."""
+        if self.max_bytes <= 0:
+            return
+        total = sum(e.nbytes for e in self._models.values())
+        for size in list(self._models):
+            if total <= self.max_bytes:
+                break
+            entry = self._models[size]
+            if entry.in_use:
+                continue
+            del self._models[size]
+            total -= entry.nbytes
+            self._count(size, "evictions")
+            print(f"♻️ Evicted idle Whisper model ('{size}') to stay under {self.max_bytes // (1024 * 1024)} MB")
+
+    @contextmanager
+    def acquire(self, model_size="base"):
+        """Yields the resident model for model_size with exclusive use for the block."""
+        entry = self._get_or_load(model_size)
+        try:
+            with entry.lock:
+                yield entry.model
+        finally:
+            with self._lock:
+                entry.in_use -= 1
+                entry.last_used = time.time()
+                self._evict_idle()
+
+    def evict(self, model_size):
+        """Drops model_size if it is resident and idle. Returns True if it was removed."""
+        with self._lock:
+            entry = self._models.get(model_size)
+            if entry is None or entry.in_use:
+                return False
+            del self._models[model_size]
+            self._count(model_size, "evictions")
+            return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_memory_mb": self.max_bytes // (1024 * 1024),
+                "quantize": QUANTIZE or "fp32",
+                "resident_mb": round(sum(e.nbytes for e in self._models.values()) / (1024 * 1024), 1),
+                "resident": list(self._models),
+                "models": {size: dict(c) for size, c in self._counters.items()},
+            }
+
+
+# Shared by every caller in the process (Flask request threads, CLI scripts)
+registry = ModelRegistry()
+
+
+def transcribe_audio(audio_path, model_size="base", profile=DEFAULT_PROFILE):
     """
-    print(f"🧠 Loading Whisper model ('{model_size}')... (this might take a moment first time)")
-    
-    # Load the model (downloads automatically on first run)
-    model = whisper.load_model(model_size)
-    
-    print("📝 Transcribing...")
-    result = model.transcribe(audio_path)
-    
+    Takes an audio path (or a 16 kHz mono float32 array) and returns the transcribed text string.
+    profile selects one of DECODE_PROFILES ("fast", "balanced", "accurate").
+    """
+    with registry.acquire(model_size) as model:
+        options = decode_options(profile, model)
+        print(f"📝 Transcribing ({profile})...")
+        result = model.transcribe(audio_path, **options)
+
     text = result["text"].strip()
     print(f"✅ Transcription complete: \"{text}\"")
-    return text
\ No newline at end of file
+    return text
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+# In-memory entries kept (LRU); the disk tier is only used if a directory is configured
+CACHE_SIZE = int(os.environ.get("TRANSCRIPT_CACHE_SIZE", "256"))
+CACHE_DIR = os.environ.get("TRANSCRIPT_CACHE_DIR", "")
+
+
+def cache_key(audio, model_size, options=None):
+    """Hashes the decoded PCM together with everything that can change the transcript."""
+    h = hashlib.sha256()
+    h.update(audio.tobytes())
+    h.update(model_size.encode())
+    h.update(json.dumps(options or {}, sort_keys=True).encode())
+    return h.hexdigest()
+
+
+class TranscriptCache:
+    """
+    Two-tier transcript cache keyed by content hash.
+
+    A bounded LRU dict answers repeats within this process; an optional
+    directory of small JSON files survives restarts and is shared between
+    server processes.
+    """
+
+    def __init__(self, max_entries=CACHE_SIZE, cache_dir=CACHE_DIR):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _remember(self, key, text):
+        """Caller holds _lock."""
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return self._memory[key]
+
+        if self.cache_dir:
+            try:
+                with open(self._path(key), "r") as f:
+                    text = json.load(f)["text"]
+            except (OSError, ValueError, KeyError):
+                text = None
+            if text is not None:
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+                    self._remember(key, text)
+                return text
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, key, text):
+        with self._lock:
+            self._remember(key, text)
+        if self.cache_dir:
+            # Write-then-rename so a concurrent reader never sees half a file
+            tmp = f"{self._path(key)}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp, "w") as f:
+                    json.dump({"text": text}, f)
+                os.replace(tmp, self._path(key))
+            except OSError as e:
+                print(f"⚠️ Transcript cache write failed: {e}")
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._memory), disk=bool(self.cache_dir))
+
+
+transcript_cache = TranscriptCache()
@@ -0,0 +1,168 @@
+import asyncio
+import concurrent.futures
+import functools
+import os
+import threading
+import time
+from collections import deque
+
+# Per-stage time limits (seconds) for voice commands
+STAGE_TIMEOUTS = {
+    "decode": float(os.environ.get("VOICE_DECODE_TIMEOUT", "10")),
+    "transcribe": float(os.environ.get("VOICE_TRANSCRIBE_TIMEOUT", "60")),
+    "read_code": float(os.environ.get("VOICE_IO_TIMEOUT", "5")),
+    "llm": float(os.environ.get("VOICE_LLM_TIMEOUT", "45")),
+    "write_code": float(os.environ.get("VOICE_IO_TIMEOUT", "5")),
+}
+# Threads for blocking stages (audio decoding, file I/O)
+EXECUTOR_THREADS = int(os.environ.get("VOICE_PIPELINE_THREADS", "8"))
+# Threads for LLM requests, kept apart so slow or timed-out calls cannot starve the other stages
+LLM_THREADS = int(os.environ.get("VOICE_LLM_THREADS", "8"))
+
+
+class StageTimeout(TimeoutError):
+    """A pipeline stage ran past its entry in STAGE_TIMEOUTS."""
+
+    def __init__(self, stage):
+        super().__init__(f"Voice pipeline stage '{stage}' timed out after {STAGE_TIMEOUTS[stage]:g} s")
+        self.stage = stage
+
+
+class Superseded(Exception):
+    """A newer voice command for the same session cancelled this one."""
+
+
+class ClientDisconnected(Exception):
+    """The client went away, so the command was cancelled."""
+
+
+class _RaisedInStage(Exception):
+    """Carries a TimeoutError the stage itself raised past wait_for, which would mistake it for its own."""
+
+    def __init__(self, error):
+        super().__init__(error)
+        self.error = error
+
+
+async def _guarded(awaitable):
+    try:
+        return await awaitable
+    except TimeoutError as e:
+        raise _RaisedInStage(e)
+
+
+class VoicePipeline:
+    """
+    Runs voice commands as coroutines on one background asyncio loop.
+
+    Stages that block (decoding, file I/O) run in a bounded thread pool and
+    LLM calls in a second one: a timed-out request keeps its thread until
+    the HTTP call returns, and must not hold up decoding for other commands.
+    Transcription awaits the batching scheduler's Future directly, so no
+    thread waits on it. Every stage has its own timeout.
+    Starting a command for a session cancels that session's previous one
+    before it can write anything, and callers can cancel on disconnect.
+    """
+
+    def __init__(self, threads=EXECUTOR_THREADS, llm_threads=LLM_THREADS, history=1000):
+        self.executor = concurrent.futures.ThreadPoolExecutor(threads, thread_name_prefix="voice-stage")
+        self.llm_executor = concurrent.futures.ThreadPoolExecutor(llm_threads, thread_name_prefix="voice-llm")
+        self._loop = None
+        self._start_lock = threading.Lock()
+        self._active = {}  # session_id -> Task; only touched on the loop thread
+        self._stats_lock = threading.Lock()
+        self._stats = {"started": 0, "completed": 0, "failed": 0, "superseded": 0, "disconnected": 0}
+        self._timeouts = {stage: 0 for stage in STAGE_TIMEOUTS}
+        self._stage_ms = {stage: deque(maxlen=history) for stage in STAGE_TIMEOUTS}
+
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="voice-pipeline", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def _count(self, field):
+        with self._stats_lock:
+            self._stats[field] += 1
+
+    def blocking(self, fn, *args, **kwargs):
+        """Awaitable running fn in the stage thread pool."""
+        return asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    def llm(self, fn, *args, **kwargs):
+        """Awaitable running an LLM call fn in the LLM thread pool."""
+        return asyncio.get_running_loop().run_in_executor(self.llm_executor, functools.partial(fn, *args, **kwargs))
+
+    async def stage(self, name, awaitable):
+        """
+        Awaits one stage under its timeout and records how long it took.
+        Raises StageTimeout when the limit passes; a TimeoutError from the
+        stage itself (a worker or quota wait) is re-raised unchanged.
+        """
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(_guarded(awaitable), STAGE_TIMEOUTS[name])
+        except _RaisedInStage as e:
+            raise e.error
+        except asyncio.TimeoutError:
+            with self._stats_lock:
+                self._timeouts[name] += 1
+            raise StageTimeout(name) from None
+        finally:
+            with self._stats_lock:
+                self._stage_ms[name].append((time.perf_counter() - started) * 1000)
+
+    async def _tracked(self, coro, session_id):
+        task = asyncio.current_task()
+        if session_id:
+            previous = self._active.get(session_id)
+            if previous is not None and not previous.done():
+                previous.cancel()
+            self._active[session_id] = task
+        try:
+            return await coro
+        finally:
+            if session_id and self._active.get(session_id) is task:
+                del self._active[session_id]
+
+    def run(self, coro, session_id=None, disconnected=None, poll=0.25):
+        """
+        Runs coro on the pipeline loop and waits for its result.
+
+        Raises Superseded if a newer command for session_id replaced it and
+        ClientDisconnected if disconnected() turned true while waiting.
+        """
+        self._count("started")
+        future = asyncio.run_coroutine_threadsafe(self._tracked(coro, session_id), self._ensure_loop())
+        while not concurrent.futures.wait([future], timeout=poll).done:
+            if disconnected is not None and disconnected():
+                future.cancel()
+                self._count("disconnected")
+                raise ClientDisconnected()
+        try:
+            result = future.result()
+        except concurrent.futures.CancelledError:
+            self._count("superseded")
+            raise Superseded()
+        except Exception:
+            self._count("failed")
+            raise
+        self._count("completed")
+        return result
+
+    def stats(self):
+        with self._stats_lock:
+            stage_ms = {}
+            for stage, samples in self._stage_ms.items():
+                ordered = sorted(samples)
+                if ordered:
+                    stage_ms[stage] = {
+                        "p50": round(ordered[len(ordered) // 2], 1),
+                        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+                    }
+            return dict(self._stats, stage_timeouts=dict(self._timeouts), stage_ms=stage_ms)
+
+
+pipeline = VoicePipeline()
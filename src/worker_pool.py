@@ -0,0 +1,225 @@
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from src.model_selector import selector
+from src.transcriber import DEFAULT_PROFILE
+
+# Number of transcription processes (0 = decode inside the web process)
+WORKERS = int(os.environ.get("WHISPER_WORKERS", "0"))
+# A job that takes longer than this gets its worker killed and restarted
+JOB_TIMEOUT = float(os.environ.get("WHISPER_WORKER_TIMEOUT", "60"))
+
+SAMPLE_RATE = 16000
+# Initial shared audio buffer per worker (30 s of float32); grown on demand
+INITIAL_BUFFER_SAMPLES = 30 * SAMPLE_RATE
+
+
+class WorkerCrashed(RuntimeError):
+    """The worker process died while handling a job."""
+
+
+def _worker_main(conn, threads, transcribe=None):
+    """Child process loop: keeps models resident and transcribes clips read from shared memory."""
+    import torch
+    if transcribe is None:
+        from src.transcriber import transcribe_audio as transcribe
+
+    torch.set_num_threads(threads)
+    shm = None
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if msg is None:
+            break
+
+        shm_name, n_samples, model_size, profile = msg
+        try:
+            if shm is None or shm.name != shm_name:
+                if shm is not None:
+                    shm.close()
+                shm = shared_memory.SharedMemory(name=shm_name)
+            audio = np.ndarray((n_samples,), dtype=np.float32, buffer=shm.buf).copy()
+            conn.send(("ok", transcribe(audio, model_size, profile)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+    if shm is not None:
+        shm.close()
+
+
+class _Worker:
+    """Parent-side handle: the process, its pipe and its reusable audio buffer."""
+
+    def __init__(self, ctx, index, threads, transcribe=None):
+        self.ctx = ctx
+        self.index = index
+        self.threads = threads
+        self.transcribe = transcribe
+        self.shm = shared_memory.SharedMemory(create=True, size=INITIAL_BUFFER_SAMPLES * 4)
+        self.process = None
+        self.conn = None
+        self.start()
+
+    def start(self):
+        parent_conn, child_conn = self.ctx.Pipe()
+        self.process = self.ctx.Process(
+            target=_worker_main, args=(child_conn, self.threads, self.transcribe),
+            name=f"whisper-worker-{self.index}", daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def restart(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+        self.start()
+
+    def load(self, audio):
+        """Copies audio into the shared buffer, replacing it with a larger one if needed."""
+        if audio.nbytes > self.shm.size:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = shared_memory.SharedMemory(create=True, size=audio.nbytes)
+        np.ndarray(audio.shape, dtype=np.float32, buffer=self.shm.buf)[:] = audio
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+        self.shm.close()
+        self.shm.unlink()
+
+
+class WorkerPool:
+    """
+    Pool of transcription processes, each with its own resident models.
+
+    Request threads borrow an idle worker, hand it the clip through that
+    worker's shared-memory buffer and wait for the text. Decoding never
+    holds the web process's GIL. Workers that time out are killed; workers
+    that crash are replaced before they are returned to the pool.
+
+    transcribe_fn replaces src.transcriber.transcribe_audio in the workers;
+    it must be a picklable module-level function.
+    """
+
+    def __init__(self, size=WORKERS, timeout=JOB_TIMEOUT, transcribe_fn=None):
+        self.size = size
+        self.timeout = timeout
+        self.transcribe_fn = transcribe_fn
+        self._idle = queue.Queue()
+        self._workers = []
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._waiting = 0
+        self._stats = {"jobs": 0, "errors": 0, "timeouts": 0, "crashes": 0, "restarts": 0, "queue_timeouts": 0}
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._workers or self.size <= 0:
+                return
+            ctx = mp.get_context("spawn")  # torch does not survive fork with live threads
+            threads = max(1, (os.cpu_count() or 1) // self.size)
+            for i in range(self.size):
+                worker = _Worker(ctx, i, threads, self.transcribe_fn)
+                self._workers.append(worker)
+                self._idle.put(worker)
+            print(f"🧵 Started {self.size} Whisper worker process(es)")
+
+    def _count(self, field):
+        with self._stats_lock:
+            self._stats[field] += 1
+
+    def depth(self):
+        """Requests waiting for a free worker."""
+        with self._stats_lock:
+            return self._waiting
+
+    def transcribe(self, audio, model_size="base", profile=DEFAULT_PROFILE, timeout=None):
+        """Transcribes a 16 kHz float32 clip in a worker process. Raises TimeoutError or WorkerCrashed."""
+        self._ensure_started()
+        timeout = timeout or self.timeout
+        audio = np.ascontiguousarray(audio, dtype=np.float32)
+
+        with self._stats_lock:
+            self._waiting += 1
+        try:
+            # Every worker may be wedged on a job; give up rather than wait forever
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            self._count("queue_timeouts")
+            raise TimeoutError(f"No Whisper worker became free within {timeout:g}s")
+        finally:
+            with self._stats_lock:
+                self._waiting -= 1
+
+        if not worker.process.is_alive():
+            # Died while idle; replace it instead of failing this request
+            self._count("crashes")
+            self._count("restarts")
+            worker.restart()
+
+        started = time.perf_counter()
+        reply = None
+        try:
+            worker.load(audio)
+            worker.conn.send((worker.shm.name, audio.size, model_size, profile))
+            if worker.conn.poll(timeout):
+                reply = worker.conn.recv()
+            else:
+                self._count("timeouts")
+                self._count("restarts")
+                worker.restart()
+        except (EOFError, OSError):
+            self._count("crashes")
+            self._count("restarts")
+            worker.restart()
+            raise WorkerCrashed(f"Whisper worker {worker.index} exited unexpectedly")
+        finally:
+            self._idle.put(worker)
+
+        if reply is None:
+            raise TimeoutError(f"Transcription timed out after {timeout:g}s")
+        status, payload = reply
+
+        self._count("jobs")
+        if status != "ok":
+            self._count("errors")
+            raise RuntimeError(payload)
+        selector.observe(model_size, audio.size / SAMPLE_RATE, (time.perf_counter() - started) * 1000)
+        return payload
+
+    def close(self):
+        with self._start_lock:
+            for worker in self._workers:
+                worker.close()
+            self._workers = []
+            self._idle = queue.Queue()
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(
+                self._stats,
+                size=self.size,
+                alive=sum(1 for w in self._workers if w.process.is_alive()),
+                waiting=self._waiting,
+            )
+
+
+pool = WorkerPool()
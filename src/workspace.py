@@ -0,0 +1,157 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Code executions (/api/run, /api/practice/verify) allowed at the same time
+MAX_PARALLEL = int(os.environ.get("EXEC_MAX_PARALLEL", str(os.cpu_count() or 1)))
+# Parent directory of the per-request workspaces
+WORKSPACE_DIR = os.environ.get("EXEC_WORKSPACE_DIR", tempfile.gettempdir())
+PREFIX = "voxcoder-ws-"
+# Workspaces this old are removed even if their pid is alive again (reused by another process)
+STALE_SECONDS = float(os.environ.get("EXEC_WORKSPACE_STALE_SECONDS", "3600"))
+# Longest a request waits for a free slot before it is turned away
+SLOT_TIMEOUT = float(os.environ.get("EXEC_SLOT_TIMEOUT", "30"))
+
+
+class SlotTimeout(TimeoutError):
+    """Every workspace slot stayed busy for longer than the pool's slot_timeout."""
+
+
+def process_alive(pid):
+    """Whether a process with this pid exists. os.kill(pid, 0) would terminate it on Windows."""
+    if os.name == "nt":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return kernel32.GetLastError() == 5  # access denied: exists, another user's
+        try:
+            code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+            return code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # alive, another user's
+        return True
+    return True
+
+
+class Workspace:
+    """A private directory that one request writes its source files to and runs them in."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, name, content):
+        """Writes name (relative to the workspace) and returns its absolute path."""
+        path = os.path.join(self.path, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def copy_in(self, source, name=None):
+        """Copies a file into the workspace, under its own name unless name is given."""
+        path = os.path.join(self.path, name or os.path.basename(source))
+        shutil.copyfile(source, path)
+        return path
+
+
+class WorkspacePool:
+    """
+    Hands out a fresh temporary directory per execution and removes it
+    afterwards, so concurrent requests never see each other's files.
+
+    At most max_parallel workspaces exist at once; further requests wait for
+    a slot, for at most slot_timeout seconds. Directories are named after the owning process, so ones left
+    behind by a crashed server are swept on the next start; ones older than
+    stale_seconds are swept too, in case the pid has since been reused.
+    """
+
+    def __init__(self, max_parallel=MAX_PARALLEL, directory=WORKSPACE_DIR, stale_seconds=STALE_SECONDS,
+                 slot_timeout=SLOT_TIMEOUT, history=1000):
+        self.max_parallel = max(1, max_parallel)
+        self.slot_timeout = slot_timeout
+        self.stale_seconds = stale_seconds
+        self.directory = os.path.abspath(directory)
+        self._slots = threading.BoundedSemaphore(self.max_parallel)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._stats = {"created": 0, "waited": 0, "peak_active": 0, "swept": 0, "slot_timeouts": 0}
+        self._wait_ms = deque(maxlen=history)
+        self._swept = False
+
+    def _sweep(self):
+        """Removes workspaces whose owning process no longer exists or that are older than STALE_SECONDS."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if not name.startswith(PREFIX):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                pid = int(name[len(PREFIX):].split("-", 1)[0])
+                age = time.time() - os.path.getmtime(path)
+            except (ValueError, OSError):
+                continue
+            if pid == os.getpid() or (process_alive(pid) and age < self.stale_seconds):
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            self._stats["swept"] += 1
+
+    @contextmanager
+    def workspace(self):
+        """Waits for a free slot, then yields a Workspace that is deleted on exit. Raises SlotTimeout."""
+        start = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["waited"] += 1
+            if not self._slots.acquire(timeout=self.slot_timeout):
+                with self._lock:
+                    self._stats["slot_timeouts"] += 1
+                raise SlotTimeout(f"No execution slot became free within {self.slot_timeout:g}s")
+        path = None
+        try:
+            with self._lock:
+                self._active += 1
+                self._stats["created"] += 1
+                self._stats["peak_active"] = max(self._stats["peak_active"], self._active)
+                self._wait_ms.append((time.perf_counter() - start) * 1000)
+                if not self._swept:
+                    self._swept = True
+                    os.makedirs(self.directory, exist_ok=True)
+                    self._sweep()
+            path = tempfile.mkdtemp(prefix=f"{PREFIX}{os.getpid()}-", dir=self.directory)
+            yield Workspace(path)
+        finally:
+            if path is not None:
+                shutil.rmtree(path, ignore_errors=True)
+            with self._lock:
+                self._active -= 1
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            ordered = sorted(self._wait_ms)
+            return dict(
+                self._stats,
+                active=self._active,
+                max_parallel=self.max_parallel,
+                wait_ms={
+                    "p50": round(ordered[len(ordered) // 2], 1),
+                    "p95": round(ordered[int(len(ordered) * 0.95)], 1),
+                } if ordered else {},
+            )
+
+
+workspaces = WorkspacePool()
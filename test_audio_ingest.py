@@ -0,0 +1,70 @@
+import io
+import wave
+
+import numpy as np
+
+from src.audio_ingest import SAMPLE_RATE, decode_audio_bytes, trim_silence
+
+# Checks the in-memory ingest path with synthetic clips (no microphone, no ffmpeg needed)
+
+
+def _wav_bytes(samples, sr, channels=1):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(sr)
+        wf.writeframes((samples * 32767).astype("<i2").tobytes())
+    return buf.getvalue()
+
+
+def _clip(sr, lead=1.0, speech=0.5, tail=1.5):
+    t = np.arange(int(speech * sr)) / sr
+    tone = 0.5 * np.sin(2 * np.pi * 440 * t)
+    return np.concatenate([np.zeros(int(lead * sr)), tone, np.zeros(int(tail * sr))]).astype(np.float32)
+
+
+def test_wav_is_resampled_to_16k_mono():
+    clip = _clip(44100)
+    stereo = np.repeat(clip, 2)
+    audio = decode_audio_bytes(_wav_bytes(stereo, 44100, channels=2))
+
+    assert audio.dtype == np.float32
+    assert abs(audio.size - clip.size * SAMPLE_RATE / 44100) < 2
+
+
+def test_24_bit_wav_is_decoded_in_process():
+    clip = _clip(16000)
+    ints = np.round(clip * 8388607).astype("<i4")
+    frames = np.stack([ints & 0xFF, (ints >> 8) & 0xFF, (ints >> 16) & 0xFF], axis=1).astype(np.uint8).tobytes()
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(3)
+        wf.setframerate(16000)
+        wf.writeframes(frames)
+
+    audio = decode_audio_bytes(buf.getvalue())
+    assert audio.size == clip.size
+    assert np.abs(audio - clip).max() < 1e-6
+
+
+def test_trim_silence_keeps_speech_with_padding():
+    audio = _clip(SAMPLE_RATE)
+    trimmed = trim_silence(audio)
+
+    # 0.5 s of tone plus at most 200 ms of padding on each side
+    assert 0.5 <= trimmed.size / SAMPLE_RATE <= 0.95
+    assert np.abs(trimmed).max() > 0.4
+
+
+def test_trim_silence_returns_empty_for_silence():
+    assert trim_silence(np.zeros(SAMPLE_RATE, dtype=np.float32)).size == 0
+
+
+if __name__ == "__main__":
+    test_wav_is_resampled_to_16k_mono()
+    test_24_bit_wav_is_decoded_in_process()
+    test_trim_silence_keeps_speech_with_padding()
+    test_trim_silence_returns_empty_for_silence()
+    print("✅ Audio ingest checks passed.")
@@ -0,0 +1,76 @@
+from functools import partial
+
+import numpy as np
+
+from src.audio_recorder import SAMPLE_RATE, RingBuffer, StreamingRecorder, SyntheticStream
+
+# Drives the streaming recorder with synthetic signals instead of a microphone
+
+
+def _speech(seconds):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def _silence(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def _recorder(signal, realtime=False, **kwargs):
+    return StreamingRecorder(stream_factory=partial(SyntheticStream, signal, realtime=realtime), **kwargs)
+
+
+def test_ring_buffer_wraps_and_counts_overruns():
+    ring = RingBuffer(8)
+    ring.write(np.arange(6, dtype=np.float32))
+    assert list(ring.read(timeout=0)) == [0, 1, 2, 3, 4, 5]
+
+    ring.write(np.arange(6, 16, dtype=np.float32))
+    assert ring.overruns == 1
+    assert list(ring.read(timeout=0)) == list(range(8, 16))
+
+
+def test_stops_after_trailing_silence():
+    signal = np.concatenate([_silence(0.3), _speech(1.0), _silence(3.0)])
+    recorder = _recorder(signal, end_silence_ms=500)
+    audio = recorder.record()
+
+    assert recorder.stop_reason == "end_of_speech"
+    # 0.3 s lead + 1 s speech + 0.5 s of silence, not the full 4.3 s
+    assert abs(audio.size / SAMPLE_RATE - 1.8) < 0.05
+
+
+def test_gives_up_without_speech():
+    recorder = _recorder(_silence(5.0), no_speech_timeout=1.0)
+    audio = recorder.record()
+
+    assert recorder.stop_reason == "no_speech"
+    assert abs(audio.size / SAMPLE_RATE - 1.0) < 0.05
+
+
+def test_max_duration_caps_long_speech():
+    recorder = _recorder(_speech(2.0), realtime=True, max_seconds=0.5)
+    audio = recorder.record()
+
+    assert recorder.stop_reason == "max_duration"
+    assert audio.size <= 0.5 * SAMPLE_RATE + recorder.blocksize
+
+
+def test_chunks_arrive_while_recording():
+    signal = np.concatenate([_speech(0.6), _silence(1.0)])
+    recorder = _recorder(signal, realtime=True, end_silence_ms=300)
+
+    chunks = list(recorder.chunks())
+
+    # A live consumer sees many small chunks, not one blob at the end
+    assert len(chunks) > 5
+    assert sum(c.size for c in chunks) == recorder.audio.size
+
+
+if __name__ == "__main__":
+    test_ring_buffer_wraps_and_counts_overruns()
+    test_stops_after_trailing_silence()
+    test_gives_up_without_speech()
+    test_max_duration_caps_long_speech()
+    test_chunks_arrive_while_recording()
+    print("✅ Streaming recorder checks passed.")
@@ -0,0 +1,97 @@
+import threading
+import time
+import types
+from contextlib import contextmanager
+
+import numpy as np
+import pytest
+import torch
+import whisper
+
+import src.batch_scheduler as batch_scheduler
+from src.batch_scheduler import TranscriptionScheduler
+from src.model_selector import ModelSelector
+
+# Concurrent clips share one padded encoder pass, and every caller gets its own text back
+
+SAMPLE_RATE = whisper.audio.SAMPLE_RATE
+
+
+@pytest.fixture
+def decoder(monkeypatch):
+    """Fake model + whisper.decode that record each batch's mel shape and answer with the batch index."""
+    model = types.SimpleNamespace(dims=types.SimpleNamespace(n_mels=80), device=torch.device("cpu"))
+    calls = []
+    state = types.SimpleNamespace(calls=calls, delay=0.0)
+    gate = threading.Event()
+    gate.set()
+
+    @contextmanager
+    def acquire(model_size):
+        yield model
+
+    def decode(model, mels, options):
+        gate.wait()
+        time.sleep(state.delay)
+        calls.append(tuple(mels.shape))
+        return [types.SimpleNamespace(text=f" clip {i} ") for i in range(mels.shape[0])]
+
+    monkeypatch.setattr(batch_scheduler, "registry", types.SimpleNamespace(acquire=acquire))
+    monkeypatch.setattr(batch_scheduler, "selector", types.SimpleNamespace(observe=lambda *a: None))
+    monkeypatch.setattr(whisper, "decode", decode)
+    state.gate = gate
+    return state
+
+
+def _clip(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def test_clips_of_different_lengths_share_one_padded_batch(decoder):
+    scheduler = TranscriptionScheduler(max_batch=3, max_wait_ms=500)
+    futures = [scheduler.submit(_clip(seconds)) for seconds in (1, 2.5, 7)]
+
+    assert [f.result(timeout=10) for f in futures] == ["clip 0", "clip 1", "clip 2"]
+    assert decoder.calls == [(3, 80, whisper.audio.N_FRAMES)]  # all padded to one 30 s window
+    assert scheduler.stats()["batch_sizes"] == {3: 1}
+
+
+def test_long_clips_use_the_sequential_path(decoder, monkeypatch):
+    monkeypatch.setattr(batch_scheduler, "transcribe_audio", lambda audio, model_size, profile: "long clip")
+    scheduler = TranscriptionScheduler(max_batch=2, max_wait_ms=200)
+    short, long = scheduler.submit(_clip(1)), scheduler.submit(_clip(45))
+
+    assert (short.result(timeout=10), long.result(timeout=10)) == ("clip 0", "long clip")
+    assert decoder.calls == [(1, 80, whisper.audio.N_FRAMES)]
+
+
+def test_cancelled_clips_are_skipped(decoder):
+    scheduler = TranscriptionScheduler(max_batch=1, max_wait_ms=0)
+    decoder.gate.clear()  # hold the worker on the first clip
+    first = scheduler.submit(_clip(1))
+    cancelled, kept = scheduler.submit(_clip(1)), scheduler.submit(_clip(1))
+    assert cancelled.cancel()
+    decoder.gate.set()
+
+    assert (first.result(timeout=10), kept.result(timeout=10)) == ("clip 0", "clip 0")
+    assert len(decoder.calls) == 2 and scheduler.stats()["jobs"] == 2
+
+
+def test_a_batch_is_one_observation_of_its_total_audio(decoder, monkeypatch):
+    selector = ModelSelector(smoothing=1.0)  # the rate becomes the latest measurement
+    monkeypatch.setattr(batch_scheduler, "selector", selector)
+    decoder.delay = 0.65
+    scheduler = TranscriptionScheduler(max_batch=3, max_wait_ms=500)
+    futures = [scheduler.submit(_clip(seconds)) for seconds in (1, 2, 3)]
+    for f in futures:
+        f.result(timeout=10)
+
+    # (~650 ms - 350 ms overhead) / 6 s of audio = ~50 ms per second, not 100+ from counting each clip
+    stats = selector.stats()
+    assert stats["measurements"]["base"] == 1
+    assert 40 < stats["ms_per_audio_second"]["base"] < 75
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
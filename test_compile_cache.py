@@ -0,0 +1,87 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from src.compile_cache import CompileCache, CompileError
+
+# Unchanged C++ sources must never reach the compiler twice
+
+pytestmark = pytest.mark.skipif(shutil.which("g++") is None, reason="needs g++")
+
+PROGRAM = '#include <iostream>\nint main() { int n; std::cin >> n; std::cout << n * 2 << "\\n"; }\n'
+
+
+def test_unchanged_source_is_compiled_once(tmp_path):
+    cache = CompileCache(tmp_path / "store")
+    source = tmp_path / "main.cpp"
+    source.write_text(PROGRAM)
+
+    first = cache.compile(str(source))
+    assert cache.compile(str(source)) == first
+    assert subprocess.run([first], input="21", capture_output=True, text=True).stdout == "42\n"
+
+    cache.compile(str(source), ["g++", "-O2"])  # other flags, other binary
+    source.write_text(PROGRAM.replace("n * 2", "n * 3"))
+    cache.compile(str(source))
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 3, 3)
+
+
+def test_compile_errors_are_cached(tmp_path):
+    cache = CompileCache(tmp_path / "store")
+    source = tmp_path / "broken.cpp"
+    source.write_text("int main() { return missing; }\n")
+
+    for _ in range(2):
+        with pytest.raises(CompileError) as e:
+            cache.compile(str(source))
+        assert "missing" in e.value.stderr
+    assert cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_binaries_are_evicted(tmp_path):
+    cache = CompileCache(tmp_path / "store", max_bytes=1)  # room for a single binary
+    paths = []
+    for n in (2, 3):
+        source = tmp_path / f"times{n}.cpp"
+        source.write_text(PROGRAM.replace("n * 2", f"n * {n}"))
+        paths.append(cache.compile(str(source)))
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["entries"] == 1
+    assert [os.path.exists(p) for p in paths] == [False, True]
+
+
+def test_a_checked_out_binary_survives_eviction(tmp_path):
+    cache = CompileCache(tmp_path / "store", max_bytes=1)
+    binaries = []
+    for n in (2, 3):
+        workspace = tmp_path / f"ws{n}"
+        workspace.mkdir()
+        (workspace / "main.cpp").write_text(PROGRAM.replace("n * 2", f"n * {n}"))
+        binaries.append(cache.compile("main.cpp", cwd=str(workspace)))
+
+    assert cache.stats()["evictions"] == 1
+    assert binaries[0] == str(tmp_path / "ws2" / "main")
+    assert subprocess.run([binaries[0]], input="21", capture_output=True, text=True).stdout == "42\n"
+
+
+def test_compiler_failures_without_diagnostics_are_not_cached(tmp_path):
+    cache = CompileCache(tmp_path / "store")
+    source = tmp_path / "main.cpp"
+    source.write_text(PROGRAM)
+    killed = ["sh", "-c", "echo 'g++: fatal: Killed signal terminated program cc1plus' >&2; exit 4", "g++"]
+
+    for _ in range(2):
+        with pytest.raises(CompileError):
+            cache.compile(str(source), killed)
+    stats = cache.stats()
+    assert (stats["misses"], stats["errors_cached"], stats["entries"]) == (2, 0, 0)
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
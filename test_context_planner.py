@@ -0,0 +1,135 @@
+import re
+
+from src import llm_engine
+from src.context_planner import find_regions, plan_context
+
+# Edits on large files should send only the definitions the instruction names
+
+
+def _python_project(n_functions=60):
+    parts = ["import math\n\nLIMIT = 10\n\n"]
+    for i in range(n_functions):
+        parts.append(
+            f"def helper_{i}(x):\n    \"\"\"Scales x by step {i}.\"\"\"\n    y = x + {i}\n"
+            f"    if y > LIMIT:\n        y = math.sqrt(y)\n    return y * 2\n\n\n"
+        )
+    parts.append(
+        "class Searcher:\n"
+        "    def __init__(self, items):\n        self.items = items\n\n"
+        "    @staticmethod\n"
+        "    def binary_search(items, target):\n"
+        "        lo, hi = 0, len(items)\n"
+        "        while lo < hi:\n"
+        "            mid = (lo + hi) // 2\n"
+        "            if items[mid] < target:\n                lo = mid\n"
+        "            else:\n                hi = mid\n"
+        "        return lo\n"
+    )
+    return "".join(parts)
+
+
+JS_CODE = """const LIMIT = 10;
+
+function parseInput(text) {
+  // a '}' in a comment must not end the block
+  return text.split(",").map(s => s.trim() + "}");
+}
+
+const renderRow = (row) => {
+  if (row) {
+    return `<tr>${row}</tr>`;
+  }
+  return "";
+};
+
+class Table {
+  constructor(rows) { this.rows = rows; }
+}
+"""
+
+
+def test_python_regions_come_from_the_ast():
+    regions = {r.name: (r.start, r.end) for r in find_regions(_python_project(2))}
+    assert regions["helper_0"] == (5, 10)
+    assert regions["binary_search"][0] == regions["Searcher"][0] + 4  # decorator line included
+
+
+def test_brace_fallback_for_javascript():
+    regions = {r.name: (r.start, r.end) for r in find_regions(JS_CODE)}
+    assert regions == {"parseInput": (3, 6), "renderRow": (8, 13), "Table": (15, 17)}
+
+
+def test_plan_selects_named_region_and_splices_it_back():
+    code = _python_project()
+    plan = plan_context("fix the infinite loop in binary search", code)
+
+    assert [r.name for r in plan.regions] == ["binary_search"]
+    outline = plan.outline()
+    assert "def helper_42(x):" in outline and "y = x + 42" not in outline
+    assert "<<< REGION 1: binary_search >>>" in outline
+
+    fixed = plan.region_text(plan.regions[0]).replace("lo = mid\n", "lo = mid + 1\n")
+    assert plan.splice({1: fixed}) == code.replace("lo = mid\n", "lo = mid + 1\n")
+
+
+def test_no_plan_without_a_named_definition():
+    assert plan_context("add logging everywhere", _python_project()) is None
+    # "helper 4" must not select helper_42
+    assert [r.name for r in plan_context("rename helper 4", _python_project()).regions] == ["helper_4"]
+
+
+def _region_model(edit):
+    """A fake chat that applies edit to every region block it is sent; returns it and the prompts it saw."""
+    prompts = []
+
+    def chat(messages, **kwargs):
+        prompt = messages[1]["content"]
+        prompts.append(prompt)
+        blocks = re.findall(r"^### REGION (\d+)[^\n]*\n(.*?)^### END$", prompt, re.S | re.M)
+        return "\n".join(f"### REGION {n}\n{edit(text)}### END" for n, text in blocks)
+
+    return chat, prompts
+
+
+def test_generate_code_sends_only_the_slice(fake_llm):
+    code = _python_project()
+    chat, prompts = _region_model(lambda text: text.replace("lo = mid\n", "lo = mid + 1\n"))
+    fake_llm(chat)
+    result = llm_engine.generate_code("binary search never terminates, fix it", code)
+
+    assert result == code.replace("lo = mid\n", "lo = mid + 1\n").strip()
+    print(f"\n📊 prompt {len(prompts[0])} chars for a {len(code)}-char file")
+    assert len(prompts[0]) < len(code) / 2
+
+
+def _project_with_callers():
+    return _python_project() + (
+        "\n\ndef total(xs):\n    return sum(helper_4(x) for x in xs)\n"
+        "\n\nclass Report:\n    def row(self, x):\n        return [x, helper_4(x)]\n"
+    )
+
+
+def test_renames_also_select_the_callers():
+    code = _project_with_callers()
+    plan = plan_context("rename helper 4 to scale four", code)
+    assert [r.name for r in plan.regions] == ["helper_4", "total", "row"]
+    # Module-level calls are outside every definition, so the whole file is sent
+    assert plan_context("rename helper 4 to scale four", code + "\nprint(helper_4(1))\n") is None
+    # Edits that keep the signature do not touch the callers
+    assert [r.name for r in plan_context("make helper 4 faster", code).regions] == ["helper_4"]
+
+
+def test_rename_updates_every_caller(fake_llm):
+    code = _project_with_callers()
+    chat, _ = _region_model(lambda text: text.replace("helper_4(", "scale_four("))
+    fake_llm(chat)
+    result = llm_engine.generate_code("rename helper 4 to scale_four", code)
+
+    assert "helper_4(" not in result
+    assert result == code.replace("helper_4(", "scale_four(").strip()
+
+
+if __name__ == "__main__":
+    import sys
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
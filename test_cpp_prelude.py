@@ -0,0 +1,54 @@
+import shutil
+import subprocess
+
+import pytest
+
+from src.cpp_prelude import COMPILE_PROFILES, HEADER_NAME, Prelude
+
+# C++ harnesses compile against the precompiled prelude and print every result type as JSON
+
+pytestmark = pytest.mark.skipif(shutil.which("g++") is None, reason="needs g++")
+
+RESULTS = {
+    "vector<int>": ("vector<int>{1, 2}", "[1,2]"),
+    "int": ("42", "42"),
+    "bool": ("true", "true"),
+    "string": ('string("hi")', '"hi"'),
+}
+
+
+@pytest.fixture(scope="module")
+def prelude(tmp_path_factory):
+    prelude = Prelude(tmp_path_factory.mktemp("pch"))
+    assert prelude.build("fast")
+    return prelude
+
+
+def test_harness_uses_the_precompiled_header(prelude, tmp_path):
+    source = tmp_path / "harness.cpp"
+    source.write_text(f'#include "{HEADER_NAME}"\nint main() {{ voxcoder_print_result(1); }}\n')
+    result = subprocess.run(prelude.compile_command("fast") + ["-H", "-o", str(tmp_path / "harness"), str(source)],
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert f"! {prelude.include_dir('fast')}/{HEADER_NAME}.gch" in result.stderr  # -H marks a used PCH with "!"
+
+
+@pytest.mark.parametrize("kind", sorted(RESULTS))
+def test_results_print_as_json(prelude, tmp_path, kind):
+    value, expected = RESULTS[kind]
+    source = tmp_path / "harness.cpp"
+    source.write_text(f'#include "{HEADER_NAME}"\nint main() {{ {kind} result = {value}; '
+                      f'voxcoder_print_result(result); }}\n')
+    subprocess.run(prelude.compile_command("fast") + ["-o", str(tmp_path / "harness"), str(source)], check=True)
+    assert subprocess.run([str(tmp_path / "harness")], capture_output=True, text=True).stdout == expected
+
+
+def test_unknown_profile_is_rejected(prelude):
+    with pytest.raises(ValueError):
+        prelude.compile_command("turbo")
+    assert set(COMPILE_PROFILES) == {"fast", "optimized"}
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,101 @@
+import subprocess
+import threading
+import time
+
+import pytest
+
+from src.fork_server import FORK_SERVER, ForkServer, ForkServerError, ZygoteUnavailable
+
+# Scripts forked from the warm zygote must behave exactly like a cold `python script.py`
+
+pytestmark = pytest.mark.skipif(not FORK_SERVER, reason="needs os.fork")
+
+SCRIPTS = {
+    "stdin": "import sys\nn = int(input())\nprint(n * sum(map(int, sys.stdin.read().split())))\n",
+    "traceback": "def f():\n    raise ValueError('bad input')\n\nprint('before')\nf()\n",
+    "exit_code": "import sys\nprint('partial', end='')\nsys.exit(3)\n",
+    "main_guard": "if __name__ == '__main__':\n    print(__name__, __file__.endswith('main_guard.py'))\n",
+    # cold output: "main done\nthread done\natexit ran\n"
+    "thread_atexit": (
+        "import atexit, threading, time\n"
+        "atexit.register(lambda: print('atexit ran'))\n"
+        "def work():\n    time.sleep(0.2)\n    print('thread done')\n"
+        "threading.Thread(target=work).start()\nprint('main done')\n"
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def forkserver():
+    server = ForkServer()
+    yield server
+    server.stop()
+
+
+@pytest.mark.parametrize("name", sorted(SCRIPTS) + ["missing"])
+def test_same_result_as_a_cold_start(forkserver, tmp_path, name):
+    path = tmp_path / f"{name}.py"
+    if name in SCRIPTS:
+        path.write_text(SCRIPTS[name])
+    stdin = "2\n1 2 3\n"
+
+    cold = subprocess.run(["python", str(path)], input=stdin, capture_output=True, text=True, timeout=10)
+    warm = forkserver.run(str(path), input=stdin, timeout=10)
+
+    assert (warm.returncode, warm.stdout, warm.stderr) == (cold.returncode, cold.stdout, cold.stderr)
+
+
+def test_timeout_kills_the_run(forkserver, tmp_path):
+    path = tmp_path / "spin.py"
+    path.write_text("import time\nprint('started', flush=True)\nwhile True:\n    time.sleep(0.1)\n")
+    start = time.perf_counter()
+    with pytest.raises(subprocess.TimeoutExpired) as e:
+        forkserver.run(str(path), timeout=0.5)
+    assert time.perf_counter() - start < 2
+    assert e.value.output == "started\n"
+
+
+def test_timeout_applies_after_the_output_is_closed(forkserver, tmp_path):
+    path = tmp_path / "closed.py"
+    path.write_text("import os, time\nprint('bye', flush=True)\nos.close(1)\nos.close(2)\ntime.sleep(30)\n")
+    start = time.perf_counter()
+    with pytest.raises(subprocess.TimeoutExpired) as e:
+        forkserver.run(str(path), timeout=1)
+    assert time.perf_counter() - start < 2
+    assert e.value.output == "bye\n"
+
+    start = time.perf_counter()
+    events = list(forkserver.stream(str(path), timeout=1))
+    assert time.perf_counter() - start < 2
+    assert b"".join(data for kind, data in events if kind == "stdout") == b"bye\n"
+    assert events[-1] == ("timeout", None)
+
+
+def test_stream_yields_output_as_it_is_written(forkserver, tmp_path):
+    path = tmp_path / "slow.py"
+    path.write_text("import time\nprint('first')\ntime.sleep(0.5)\nprint('second')\n")
+    start = time.perf_counter()
+    events = [(kind, data, time.perf_counter() - start) for kind, data in forkserver.stream(str(path), timeout=5)]
+    assert events[0][0] == "stdout" and events[0][2] < 0.4  # stdout is unbuffered
+    assert b"".join(data for kind, data, _ in events if kind == "stdout") == b"first\nsecond\n"
+    assert events[-1][:2] == ("exit", 0)
+
+
+def test_run_lost_after_the_fork_is_not_reported_as_unstarted(tmp_path):
+    server = ForkServer()
+    path = tmp_path / "slow.py"
+    path.write_text("import time\ntime.sleep(1)\n")
+    server._ensure_zygote()
+    threading.Timer(0.3, server._process.kill).start()
+    try:
+        # the script did run, so a caller must not start it again cold
+        with pytest.raises(ForkServerError) as e:
+            server.run(str(path), timeout=5)
+        assert not isinstance(e.value, ZygoteUnavailable)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,70 @@
+import json
+
+from src.json_stream import JSONFieldStreamer, parse_streamed_object
+
+# The streaming debug endpoints decode JSON fields while the model is still writing them
+
+REPLY = {
+    "diagnosis": 'Off by one in "range"\nline two é',
+    "attempts": [1, {"note": "}"}],
+    "suggestion": "Use <= instead of <",
+    "fixed_code": "def f(n):\n    return list(range(n + 1))\n",
+}
+
+
+def _feed(raw, step):
+    streamer = JSONFieldStreamer()
+    seen = {}
+    for i in range(0, len(raw), step):
+        for field, text in streamer.feed(raw[i:i + step]):
+            seen[field] = seen.get(field, "") + text
+    return streamer, seen
+
+
+def test_fields_decoded_at_any_chunk_size():
+    raw = "```json\n" + json.dumps(REPLY) + "\n```"
+    strings = {k: v for k, v in REPLY.items() if isinstance(v, str)}
+    for step in (1, 2, 3, 7, len(raw)):
+        streamer, seen = _feed(raw, step)
+        assert seen == strings
+        assert streamer.done
+
+
+def test_first_field_available_before_the_rest():
+    raw = json.dumps(REPLY)
+    streamer, seen = _feed(raw[:raw.index('"suggestion"')], 4)
+    assert seen == {"diagnosis": REPLY["diagnosis"]}
+    assert not streamer.done
+
+
+def test_parse_falls_back_to_streamed_fields():
+    raw = json.dumps(REPLY)[:-40]  # reply cut off mid fixed_code
+    streamer, _ = _feed(raw, 5)
+    result = parse_streamed_object(raw, streamer)
+    assert result["suggestion"] == REPLY["suggestion"]
+    assert REPLY["fixed_code"].startswith(result["fixed_code"])
+
+
+def test_surrogate_pairs_become_one_character():
+    raw = json.dumps({"diagnosis": "works 😀", "suggestion": "lone \ud83d end"})  # json.dumps escapes as \ud83d\ude00
+    for step in (1, 3, len(raw)):
+        _, seen = _feed(raw, step)
+        assert seen == {"diagnosis": "works 😀", "suggestion": "lone \ufffd end"}
+        assert seen["diagnosis"].encode("utf-8")
+
+
+def test_malformed_unicode_escape_is_kept_as_written():
+    raw = '{"diagnosis": "bad \\uZZ12 and \\u12", "suggestion": "ok"}'
+    for step in (1, 4, len(raw)):
+        streamer, seen = _feed(raw, step)
+        assert seen == {"diagnosis": "bad \\uZZ12 and \\u12", "suggestion": "ok"}
+        assert streamer.done
+
+
+if __name__ == "__main__":
+    test_fields_decoded_at_any_chunk_size()
+    test_first_field_available_before_the_rest()
+    test_parse_falls_back_to_streamed_fields()
+    test_surrogate_pairs_become_one_character()
+    test_malformed_unicode_escape_is_kept_as_written()
+    print("✅ JSON field streaming checks passed.")
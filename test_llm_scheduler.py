@@ -0,0 +1,147 @@
+import json
+import threading
+import time
+
+from src import llm_client
+from src.llm_scheduler import LLMScheduler, QuotaTimeout
+
+# Requests queued for LLM quota go out by priority and at the configured rate
+
+
+def test_voice_jumps_the_queue():
+    scheduler = LLMScheduler(rpm=300, tpm=0)  # one request every 0.2 s
+    scheduler.requests.tokens = 1
+    scheduler.acquire("background")  # bucket now empty
+    order = []
+
+    def call(priority):
+        scheduler.acquire(priority)
+        order.append(priority)
+
+    threads = []
+    for priority in ["background", "debug", "voice"]:
+        threads.append(threading.Thread(target=call, args=(priority,)))
+        threads[-1].start()
+        time.sleep(0.01)
+    stats = scheduler.stats()
+    assert stats["queue_depth"] == {"voice": 1, "debug": 1, "background": 1}
+    for t in threads:
+        t.join()
+
+    assert order == ["voice", "debug", "background"]
+    assert scheduler.stats()["throttled"] == 3
+
+
+def test_retry_keeps_its_place_in_line():
+    scheduler = LLMScheduler(rpm=300, tpm=0)
+    scheduler.requests.tokens = 1
+    ticket = scheduler.ticket()  # the first attempt went out before the other request was queued
+    scheduler.acquire("background", ticket=ticket)
+    order = []
+
+    def call(name, ticket=None):
+        scheduler.acquire("background", ticket=ticket)
+        order.append(name)
+
+    newer = threading.Thread(target=call, args=("newer",))
+    newer.start()
+    time.sleep(0.01)
+    retry = threading.Thread(target=call, args=("retry", ticket))
+    retry.start()
+    for t in (newer, retry):
+        t.join()
+
+    assert order == ["retry", "newer"]
+
+
+def test_token_budget_and_max_wait():
+    scheduler = LLMScheduler(rpm=0, tpm=600, max_wait={"voice": 0.2, "debug": 0.2, "background": 0.2})
+    scheduler.acquire("voice", tokens=600)
+    try:
+        scheduler.acquire("voice", tokens=300)  # refills 10 tokens/s, needs 30 s
+    except QuotaTimeout:
+        pass
+    else:
+        raise AssertionError("expected QuotaTimeout")
+    scheduler.settle(600, 100)  # the reply used far fewer tokens than estimated
+    assert scheduler.acquire("voice", tokens=300) < 50
+
+
+class _Response:
+    def __init__(self, status, body=None, headers=None):
+        self.status_code, self.headers, self.text = status, headers or {}, "error"
+        self._body = body
+
+    def json(self):
+        return self._body
+
+    def close(self):
+        pass
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self._body)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def test_retries_rate_limits_and_server_errors():
+    replies = [
+        _Response(429, headers={"Retry-After": "0"}),
+        _Response(503),
+        _Response(200, {"choices": [{"message": {"content": "ok"}}], "usage": {"total_tokens": 20}}),
+    ]
+    posts = []
+
+    class Session:
+        def post(self, url, **kwargs):
+            posts.append(kwargs["json"])
+            return replies.pop(0)
+
+    saved = llm_client.get_session, llm_client.api_key, llm_client.llm_scheduler
+    llm_client.get_session, llm_client.api_key = Session, lambda: "test-key"
+    llm_client.llm_scheduler = LLMScheduler(rpm=0, tpm=0)
+    try:
+        assert llm_client.chat_completion([{"role": "user", "content": "hi"}], priority="voice") == "ok"
+        stats = llm_client.llm_scheduler.stats()
+    finally:
+        llm_client.get_session, llm_client.api_key, llm_client.llm_scheduler = saved
+
+    assert len(posts) == 3
+    assert stats["retries"] == 2 and stats["rate_limited"] == 1
+
+
+def test_streamed_usage_settles_the_estimate():
+    events = [
+        {"choices": [{"delta": {"content": "ok"}}]},
+        {"choices": [{"delta": {}, "finish_reason": "stop"}], "x_groq": {"usage": {"total_tokens": 20}}},
+    ]
+    lines = [f"data: {json.dumps(e)}" for e in events] + ["data: [DONE]"]
+
+    class Session:
+        def post(self, url, **kwargs):
+            return _Response(200, lines)
+
+    saved = llm_client.get_session, llm_client.api_key, llm_client.llm_scheduler
+    llm_client.get_session, llm_client.api_key = Session, lambda: "test-key"
+    llm_client.llm_scheduler = LLMScheduler(rpm=0, tpm=6000)
+    try:
+        assert "".join(llm_client.stream_chat_completion([{"role": "user", "content": "hi"}])) == "ok"
+        stats = llm_client.llm_scheduler.stats()
+    finally:
+        llm_client.get_session, llm_client.api_key, llm_client.llm_scheduler = saved
+
+    # only the 20 tokens reported stay spent, not the 512-token estimate
+    assert stats["tokens_available"] >= 5975
+
+
+if __name__ == "__main__":
+    test_voice_jumps_the_queue()
+    test_retry_keeps_its_place_in_line()
+    test_token_budget_and_max_wait()
+    test_retries_rate_limits_and_server_errors()
+    test_streamed_usage_settles_the_estimate()
+    print("✅ LLM scheduler checks passed.")
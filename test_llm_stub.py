@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from src import llm_client, llm_engine
+from src.llm_backends import get_backend, stub_backend
+from src.llm_scheduler import LLMScheduler
+from src.llm_stub import start_stub
+
+# The stub backend must serve every LLM path offline, including streaming and injected errors
+
+
+@pytest.fixture
+def stub(fake_llm, monkeypatch):
+    """Starts a stub server with the given config and points the LLM client at it."""
+    servers = []
+
+    def start(**config):
+        server, url = start_stub(latency_ms=0, tokens_per_s=0, **config)
+        servers.append(server)
+        monkeypatch.setattr(llm_client, "backend", stub_backend(url))
+        monkeypatch.setattr(llm_client, "llm_scheduler", LLMScheduler(rpm=0, tpm=0))
+        fake_llm()
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def test_backend_is_chosen_by_name():
+    assert get_backend("groq").url.startswith("https://api.groq.com/")
+    assert get_backend("stub").api_key()
+    try:
+        get_backend("openai")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_code_edits_and_streams_through_the_stub(stub):
+    code = "".join(f"def helper_{i}(x):\n    return x + {i}\n\n\n" for i in range(20))
+    server = stub()
+    edited = llm_engine.generate_code("add a header comment", code)
+    streamed = "".join(llm_client.stream_chat_completion([
+        {"role": "system", "content": 'Return a JSON object with "diagnosis".'},
+        {"role": "user", "content": "Code:\n```\nx = 1\n```\nError/Output:\nboom\n"},
+    ]))
+    assert server.config.stats["streamed"] == 1
+
+    assert edited == "# add a header comment\n" + code.strip()
+    assert json.loads(streamed)["fixed_code"] == "x = 1"
+
+
+def test_injected_errors_are_retried(stub, monkeypatch, tmp_path):
+    replies = tmp_path / "replies.json"
+    replies.write_text(json.dumps([{"match": "ping", "reply": "pong: $instruction"}]))
+    monkeypatch.setattr(llm_client, "MAX_RETRIES", 2)
+    server = stub(error_rate=0.5, error_status="503", replies=str(replies), seed=3)
+
+    answers = [llm_client.chat_completion([{"role": "user", "content": "ping"}]) for _ in range(4)]
+    injected = server.config.stats["errors_injected"]
+    retries = llm_client.llm_scheduler.stats()["retries"]
+
+    assert answers == ["pong: ping"] * 4
+    assert injected > 0 and retries == injected
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,103 @@
+import difflib
+import time
+
+from src import llm_engine
+from src.patching import PatchError, apply_patch
+
+# Compares diff-based edits against full-file regeneration with a fake model
+# whose latency grows with the number of tokens it writes
+
+MS_PER_TOKEN = 0.05
+# Names no function, so the edit goes through a diff rather than a context slice
+INSTRUCTION = "multiply by 120 instead of adding it"
+
+
+def _tokens(text):
+    return max(1, len(text) // 4)
+
+
+def _large_file(n_functions=150):
+    return "".join(
+        f"def helper_{i}(x):\n    \"\"\"Helper number {i}.\"\"\"\n    return x + {i}\n\n\n"
+        for i in range(n_functions)
+    )
+
+
+def _edit(code):
+    """The change the instruction asks for: one line deep in the file."""
+    return code.replace("    return x + 120\n", "    return x * 120\n")
+
+
+def _fake_model(patch_reply=None):
+    """A fake chat and the list it collects (kind, tokens) per call into."""
+    calls = []
+
+    def chat(messages, **kwargs):
+        current = messages[1]["content"].split("Current Code:\n", 1)[1].rsplit("\n\nUser Instruction:", 1)[0]
+        if "unified diff" in messages[0]["content"]:
+            reply = patch_reply if patch_reply is not None else "".join(
+                difflib.unified_diff(current.splitlines(True), _edit(current).splitlines(True), n=2)
+            )
+            kind = "patch"
+        else:
+            reply, kind = _edit(current), "full"
+        calls.append((kind, _tokens(reply)))
+        time.sleep(_tokens(reply) * MS_PER_TOKEN / 1000)
+        return reply
+
+    return chat, calls
+
+
+def test_apply_patch_tolerates_wrong_line_numbers():
+    code = "a = 1\nb = 2\nc = 3\nd = 4\n"
+    patch = "@@ -40,3 +40,3 @@\n b = 2\n-c = 3\n+c = 30\n d = 4\n"
+    assert apply_patch(code, patch) == "a = 1\nb = 2\nc = 30\nd = 4\n"
+
+
+def test_apply_patch_rejects_mismatched_context():
+    try:
+        apply_patch("a = 1\nb = 2\n", "@@ -1,2 +1,2 @@\n a = 1\n-b = 3\n+b = 4\n")
+    except PatchError:
+        return
+    raise AssertionError("expected PatchError")
+
+
+def test_patch_edit_beats_full_regeneration_on_large_file(fake_llm):
+    code = _large_file()
+    expected = _edit(code).strip()
+    chat, calls = _fake_model()
+    fake_llm(chat)
+
+    t0 = time.perf_counter()
+    full = llm_engine.generate_code(INSTRUCTION, code, edit_mode="full", bypass_cache=True)
+    full_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    patched = llm_engine.generate_code(INSTRUCTION, code, edit_mode="patch", bypass_cache=True)
+    patch_s = time.perf_counter() - t0
+
+    assert full == patched == expected
+    (_, full_tokens), (_, patch_tokens) = calls
+    print(f"\n📊 {len(code.splitlines())}-line file: full {full_tokens} tokens / {full_s * 1000:.0f} ms, "
+          f"patch {patch_tokens} tokens / {patch_s * 1000:.0f} ms")
+    assert patch_tokens * 20 < full_tokens
+    assert patch_s < full_s
+
+
+def test_falls_back_to_full_file_when_patch_does_not_apply(fake_llm):
+    code = _large_file()
+    before = llm_engine.edit_stats()["patch_fallbacks"]
+    chat, calls = _fake_model(patch_reply="@@ -1,1 +1,1 @@\n-not in the file\n+x\n")
+    fake_llm(chat)
+
+    result = llm_engine.generate_code(INSTRUCTION, code, edit_mode="patch")
+
+    assert result == _edit(code).strip()
+    assert [kind for kind, _ in calls] == ["patch", "full"]
+    assert llm_engine.edit_stats()["patch_fallbacks"] == before + 1
+
+
+if __name__ == "__main__":
+    import sys
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,87 @@
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+from src.run_stream import OutputLimiter, stream_command
+
+# Streamed runs forward output as it is written, capped, and end with the exit status
+
+
+def test_output_arrives_before_the_program_exits():
+    script = "import sys, time\nprint('first', flush=True)\ntime.sleep(0.5)\nsys.stderr.write('late')\nsys.exit(3)\n"
+    start = time.perf_counter()
+    events = []
+    for kind, data in stream_command([sys.executable, "-c", script], timeout=5):
+        events.append((kind, data, time.perf_counter() - start))
+
+    assert events[0][0] == "stdout" and events[0][2] < 0.4
+    assert b"".join(data for kind, data, _ in events if kind == "stdout") == b"first\n"
+    assert [e[:2] for e in events if e[0] != "stdout"] == [("stderr", b"late"), ("exit", 3)]
+
+
+def test_timeout_kills_the_program():
+    events = list(stream_command([sys.executable, "-c", "import time\ntime.sleep(30)"], timeout=0.3))
+    assert events == [("timeout", None)]
+
+
+def _gone(pid):
+    """True once pid has exited (a zombie counts: nothing is left running)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] == "Z"
+    except FileNotFoundError:
+        return True
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+def test_timeout_kills_what_the_program_started():
+    script = "import subprocess, time\np = subprocess.Popen(['sleep', '30'])\nprint(p.pid, flush=True)\ntime.sleep(30)"
+    events = list(stream_command([sys.executable, "-c", script], timeout=0.5))
+    assert events[-1] == ("timeout", None)
+    grandchild = int(events[0][1])
+    deadline = time.monotonic() + 2
+    while not _gone(grandchild) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert _gone(grandchild)
+
+
+@pytest.mark.skipif(shutil.which("g++") is None, reason="needs g++")
+def test_compiled_programs_are_line_buffered(tmp_path):
+    source = tmp_path / "slow.cpp"
+    source.write_text('#include <cstdio>\n#include <unistd.h>\n'
+                      'int main() { printf("first\\n"); usleep(500000); printf("second\\n"); }\n')
+    subprocess.run(["g++", "-o", str(tmp_path / "slow"), str(source)], check=True)
+    start = time.perf_counter()
+    events = [(kind, data, time.perf_counter() - start)
+              for kind, data in stream_command([str(tmp_path / "slow")], timeout=5)]
+
+    assert events[0][:2] == ("stdout", b"first\n") and events[0][2] < 0.4
+    assert events[-1][:2] == ("exit", 0)
+
+
+def test_output_is_capped_with_a_marker():
+    limiter = OutputLimiter(max_bytes=10)
+    chunks = limiter.feed("stdout", "héllo".encode()) + limiter.feed("stderr", b"0123456789")
+    chunks += limiter.feed("stdout", b"dropped")
+
+    assert chunks[0] == ("stdout", "héllo")
+    assert chunks[1] == ("stderr", "0123")  # "héllo" is 6 bytes
+    assert "truncated after 10 bytes" in chunks[2][1]
+    assert len(chunks) == 3 and limiter.truncated
+    assert limiter.bytes == {"stdout": 13, "stderr": 10}
+
+
+def test_characters_split_across_chunks_are_kept_whole():
+    limiter = OutputLimiter()
+    data = "é".encode()
+    assert limiter.feed("stdout", data[:1]) == []
+    assert limiter.feed("stdout", data[1:]) == [("stdout", "é")]
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,63 @@
+import threading
+import time
+
+from src.single_flight import SingleFlight
+
+# Concurrent duplicates should make one upstream call between them
+
+
+def _run_concurrently(n, target):
+    threads = [threading.Thread(target=target) for _ in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_concurrent_duplicates_share_one_call():
+    flight = SingleFlight()
+    calls, results = [], []
+
+    def fetch(slug):
+        calls.append(slug)
+        time.sleep(0.2)
+        return {"slug": slug}
+
+    _run_concurrently(8, lambda: results.append(flight.do("two-sum", fetch, "two-sum")))
+
+    assert calls == ["two-sum"]
+    assert results == [{"slug": "two-sum"}] * 8
+    assert flight.stats() == {"executed": 1, "coalesced": 7, "in_flight": 0}
+
+
+def test_followers_see_the_leaders_exception():
+    flight = SingleFlight()
+    errors = []
+
+    def fail():
+        time.sleep(0.2)
+        raise TimeoutError("upstream timed out")
+
+    def call():
+        try:
+            flight.do("slug", fail)
+        except TimeoutError as e:
+            errors.append(e)
+
+    _run_concurrently(4, call)
+    assert len(errors) == 4
+    assert flight.stats()["executed"] == 1
+
+
+def test_later_calls_run_again():
+    flight = SingleFlight()
+    assert flight.do("k", lambda: 1) == 1
+    assert flight.do("k", lambda: 2) == 2
+    assert flight.stats()["coalesced"] == 0
+
+
+if __name__ == "__main__":
+    test_concurrent_duplicates_share_one_call()
+    test_followers_see_the_leaders_exception()
+    test_later_calls_run_again()
+    print("✅ Single-flight checks passed.")
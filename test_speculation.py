@@ -0,0 +1,109 @@
+import time
+
+from src.speculation import SpeculativeDispatcher
+from src.streaming import SessionStore
+
+# A stable partial transcript starts generation early; the final transcript decides whether it is used
+
+
+def _dispatcher(delay=0.2):
+    calls = []
+
+    def generate(prompt, current_code="", bypass_cache=False, priority="voice"):
+        calls.append((prompt, priority) if priority == "background" else prompt)
+        time.sleep(delay)
+        return f"# {prompt}\n{current_code}"
+
+    return SpeculativeDispatcher(generate, stable_seconds=0.05, threads=2), calls
+
+
+def _speak(speculation, partials, pause=0.03):
+    for partial in partials:
+        speculation.observe(partial)
+        time.sleep(pause)
+
+
+def test_matching_transcript_reuses_the_speculative_result():
+    dispatcher, calls = _dispatcher()
+    speculation = dispatcher.track("x = 1")
+    _speak(speculation, ["add a", "add a loop", "add a loop", "add a loop", "add a loop"])
+
+    code = speculation.resolve("add  a loop.", "x = 1")
+
+    assert code == "# add a loop\nx = 1"
+    assert calls == [("add a loop", "background")]
+    stats = dispatcher.stats()
+    assert stats["hits"] == 1 and stats["hit_rate"] == 1.0
+    assert 0 < stats["saved_ms"]["total"] < 200  # part of the 200 ms generation ran before the final transcript
+
+
+def test_changed_transcript_replaces_the_guess():
+    dispatcher, calls = _dispatcher()
+    speculation = dispatcher.track("x = 1")
+    _speak(speculation, ["add a loop"] * 4)
+
+    code = speculation.resolve("add a loop that prints x", "x = 1")
+
+    assert code == "# add a loop that prints x\nx = 1"
+    assert calls == [("add a loop", "background"), "add a loop that prints x"]
+    assert dispatcher.stats()["misses"] == 1
+
+
+def test_case_changes_are_a_different_request():
+    dispatcher, calls = _dispatcher(delay=0)
+    speculation = dispatcher.track("foo = 1")
+    _speak(speculation, ["rename foo to Foo"] * 4)
+
+    code = speculation.resolve("rename foo to FOO", "foo = 1")
+
+    assert code == "# rename foo to FOO\nfoo = 1"
+    assert calls == [("rename foo to Foo", "background"), "rename foo to FOO"]
+    assert dispatcher.stats()["misses"] == 1
+
+
+def test_no_speculation_while_the_partial_keeps_changing():
+    dispatcher, calls = _dispatcher(delay=0)
+    speculation = dispatcher.track("")
+    _speak(speculation, ["add", "add a", "add a loop"])
+    assert dispatcher.stats()["started"] == 0
+    speculation.resolve("add a loop", "")
+    assert dispatcher.stats()["unspeculated"] == 1
+
+
+def test_slow_guess_is_not_regenerated_past_the_deadline():
+    dispatcher, calls = _dispatcher(delay=1)
+    speculation = dispatcher.track("")
+    _speak(speculation, ["add a loop"] * 4)
+
+    start = time.monotonic()
+    try:
+        speculation.resolve("add a loop", "", timeout=0.1)
+    except TimeoutError:
+        pass
+    else:
+        raise AssertionError("expected TimeoutError")
+    assert time.monotonic() - start < 0.5
+    assert calls == [("add a loop", "background")]
+
+
+def test_expired_sessions_cancel_their_speculation():
+    dispatcher, _ = _dispatcher(delay=1)
+    store = SessionStore(ttl=0)
+    session = store.create()
+    session.speculation = dispatcher.track("")
+    _speak(session.speculation, ["add a loop"] * 4)
+    session.last_active -= 1
+
+    store.create()  # expires the idle session
+
+    assert dispatcher.stats()["abandoned"] == 1
+
+
+if __name__ == "__main__":
+    test_matching_transcript_reuses_the_speculative_result()
+    test_changed_transcript_replaces_the_guess()
+    test_case_changes_are_a_different_request()
+    test_no_speculation_while_the_partial_keeps_changing()
+    test_slow_guess_is_not_regenerated_past_the_deadline()
+    test_expired_sessions_cancel_their_speculation()
+    print("✅ Speculation checks passed.")
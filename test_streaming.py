@@ -0,0 +1,50 @@
+import numpy as np
+
+from src.streaming import MAX_WINDOW_SECONDS, SAMPLE_RATE, StreamingSession, pcm_from_bytes
+
+# Segments are committed once two passes agree, and the live window never outgrows Whisper's view
+
+
+def _session(seconds):
+    session = StreamingSession("base")
+    session.buffer = np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+    return session
+
+
+def test_segments_are_committed_when_two_passes_agree():
+    session = _session(3)
+    session._stabilize([("open the file", 1.0), ("and", 2.0)])
+    assert session.committed == []
+
+    session._stabilize([("open the file", 1.0), ("and read it", 2.5), ("line by", 3.0)])
+    assert session.committed == ["open the file"]
+    assert session.buffer.size == 2 * SAMPLE_RATE
+    assert session.tentative == [("and read it", 1.5), ("line by", 2.0)]
+
+
+def test_one_long_segment_does_not_grow_the_window():
+    session = StreamingSession("base")
+    # every pass hears a single segment running to the end of the buffer
+    session._decode = lambda: [("one long sentence", session.buffer.size / SAMPLE_RATE)]
+    for _ in range(int(MAX_WINDOW_SECONDS) * 2):
+        session.add_audio(np.zeros(SAMPLE_RATE, dtype=np.float32))
+        assert session.buffer.size <= (MAX_WINDOW_SECONDS + 1) * SAMPLE_RATE
+    assert session.committed
+
+
+def test_silence_does_not_grow_the_window():
+    session = _session(MAX_WINDOW_SECONDS + 5)
+    session._stabilize([])
+    assert session.buffer.size == int(MAX_WINDOW_SECONDS * SAMPLE_RATE)
+
+
+def test_partial_samples_are_dropped():
+    samples = np.array([0.5, -0.25], dtype="<f4").tobytes()
+    assert pcm_from_bytes(samples + b"\x01", "f32").tolist() == [0.5, -0.25]
+    assert pcm_from_bytes(b"\x00\x40\x01", "pcm16").tolist() == [0.5]
+
+
+if __name__ == "__main__":
+    import sys
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
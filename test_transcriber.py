@@ -0,0 +1,33 @@
+import torch
+import whisper
+
+from src.transcriber import quantize_int8
+
+# int8 quantization works on a copy; the fp32 model it came from keeps running as before
+
+
+def _small_model():
+    torch.manual_seed(0)
+    dims = whisper.model.ModelDimensions(n_mels=80, n_audio_ctx=1500, n_audio_state=64, n_audio_head=2,
+                                         n_audio_layer=1, n_vocab=51865, n_text_ctx=448, n_text_state=64,
+                                         n_text_head=2, n_text_layer=1)
+    return whisper.model.Whisper(dims).eval()
+
+
+def test_quantize_int8_leaves_the_original_model_alone():
+    model = _small_model()
+    linear_types = {type(m) for m in model.modules() if isinstance(m, torch.nn.Linear)}
+
+    quantized = quantize_int8(model)
+
+    assert quantized is not model
+    assert {type(m) for m in model.modules() if isinstance(m, torch.nn.Linear)} == linear_types
+    assert any(isinstance(m, torch.ao.nn.quantized.dynamic.Linear) for m in quantized.modules())
+    mel = torch.zeros(1, 80, 3000)
+    assert model.encoder(mel).shape == quantized.encoder(mel).shape
+
+
+if __name__ == "__main__":
+    import sys
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,144 @@
+import asyncio
+import io
+import threading
+import time
+
+import pytest
+
+from src import voice_pipeline
+from src.voice_pipeline import ClientDisconnected, StageTimeout, Superseded, VoicePipeline
+
+# Voice commands time out per stage, are cancelled by newer commands and disconnects,
+# and slow LLM calls never hold the threads other stages need
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setitem(voice_pipeline.STAGE_TIMEOUTS, "llm", 0.2)
+    return VoicePipeline(threads=2, llm_threads=2)
+
+
+def test_stage_timeout(pipeline):
+    async def command():
+        return await pipeline.stage("llm", pipeline.llm(time.sleep, 1))
+
+    with pytest.raises(StageTimeout) as e:
+        pipeline.run(command())
+    assert e.value.stage == "llm"
+    assert pipeline.stats()["stage_timeouts"]["llm"] == 1
+
+
+def test_timeout_raised_by_the_stage_is_not_a_stage_timeout(pipeline):
+    def busy():
+        raise TimeoutError("No Whisper worker became free")
+
+    async def command():
+        return await pipeline.stage("llm", pipeline.llm(busy))
+
+    with pytest.raises(TimeoutError) as e:
+        pipeline.run(command())
+    assert not isinstance(e.value, StageTimeout)
+    assert pipeline.stats()["stage_timeouts"]["llm"] == 0
+
+
+def test_newer_command_supersedes_the_older_one(pipeline):
+    started = threading.Event()
+    results = {}
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(5)
+        return "old"
+
+    def first():
+        try:
+            results["first"] = pipeline.run(slow(), session_id="s1")
+        except Superseded:
+            results["first"] = "superseded"
+
+    thread = threading.Thread(target=first)
+    thread.start()
+    assert started.wait(5)
+
+    async def fast():
+        return "new"
+
+    results["second"] = pipeline.run(fast(), session_id="s1")
+    thread.join(5)
+    assert results == {"first": "superseded", "second": "new"}
+    assert pipeline.stats()["superseded"] == 1
+
+
+def test_disconnect_cancels_the_command(pipeline):
+    cancelled = threading.Event()
+
+    async def command():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    start = time.monotonic()
+    with pytest.raises(ClientDisconnected):
+        pipeline.run(command(), disconnected=lambda: time.monotonic() - start > 0.1, poll=0.05)
+    assert cancelled.wait(5)
+    assert pipeline.stats()["disconnected"] == 1
+
+
+def test_stuck_llm_calls_do_not_starve_other_stages(pipeline):
+    release = threading.Event()
+
+    async def stuck():
+        return await pipeline.stage("llm", pipeline.llm(release.wait))
+
+    async def decode():
+        return await pipeline.stage("decode", pipeline.blocking(lambda: "decoded"))
+
+    try:
+        for _ in range(2):  # both LLM threads are still busy after their stage timed out
+            with pytest.raises(StageTimeout):
+                pipeline.run(stuck())
+        assert pipeline.run(decode()) == "decoded"
+    finally:
+        release.set()
+
+
+def test_debug_voice_llm_timeout_is_a_504(monkeypatch):
+    import server
+
+    async def transcript(data, form, load_script=False):
+        return "why does it crash", "base", "x = 1 / 0"
+
+    monkeypatch.setitem(voice_pipeline.STAGE_TIMEOUTS, "llm", 0.2)
+    monkeypatch.setattr(server, "_voice_transcript", transcript)
+    monkeypatch.setattr(server, "_debug_completion", lambda *args: time.sleep(1))
+    monkeypatch.setattr(server.llm_client, "api_key", lambda: "test-key")
+
+    response = server.app.test_client().post(
+        "/api/debug_voice", data={"audio": (io.BytesIO(b"RIFF"), "clip.wav")}
+    )
+    assert response.status_code == 504
+    assert response.get_json()["stage"] == "llm"
+
+
+def test_worker_timeout_is_a_503(monkeypatch):
+    import numpy as np
+    import server
+
+    async def transcribe(audio, latency_budget_ms, profile):
+        raise TimeoutError("No Whisper worker became free within 30 s")
+
+    monkeypatch.setattr(server, "load_audio_bytes", lambda data: np.ones(16000, dtype=np.float32))
+    monkeypatch.setattr(server, "_transcribe_async", transcribe)
+
+    response = server.app.test_client().post(
+        "/api/process_voice", data={"audio": (io.BytesIO(b"RIFF"), "clip.wav")}
+    )
+    assert response.status_code == 503
+    assert "No Whisper worker" in response.get_json()["error"]
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,67 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.worker_pool import INITIAL_BUFFER_SAMPLES, WorkerCrashed, WorkerPool
+
+# Clips reach the worker processes intact, and hung or crashed workers are replaced
+
+
+def _fake_transcribe(audio, model_size, profile):
+    """Runs in the worker: 'hang' and 'crash' misbehave, anything else describes the clip it received."""
+    if model_size == "hang":
+        time.sleep(60)
+    if model_size == "crash":
+        os._exit(1)
+    return f"{audio.size}:{float(audio.sum()):g}"
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(size=1, timeout=20, transcribe_fn=_fake_transcribe)  # room for a restart
+    yield pool
+    pool.close()
+
+
+def test_clips_are_handed_over_through_shared_memory(pool):
+    short = np.full(16000, 0.5, dtype=np.float32)
+    long = np.full(INITIAL_BUFFER_SAMPLES * 2, 0.25, dtype=np.float32)  # outgrows the first buffer
+    assert pool.transcribe(short) == "16000:8000"
+    assert pool.transcribe(long) == f"{long.size}:{long.size * 0.25:g}"
+    assert pool.transcribe(short) == "16000:8000"
+
+
+def test_hung_and_crashed_workers_are_restarted(pool):
+    clip = np.ones(10, dtype=np.float32)
+    with pytest.raises(TimeoutError):
+        pool.transcribe(clip, model_size="hang", timeout=1)
+    with pytest.raises(WorkerCrashed):
+        pool.transcribe(clip, model_size="crash")
+    assert pool.transcribe(clip) == "10:10"
+
+    stats = pool.stats()
+    assert (stats["timeouts"], stats["crashes"], stats["alive"]) == (1, 1, 1)
+    assert stats["restarts"] >= 2
+
+
+def test_waiting_for_a_busy_worker_times_out(pool):
+    clip = np.ones(10, dtype=np.float32)
+    pool.transcribe(clip)  # start the worker outside the measurement
+    busy = threading.Thread(target=lambda: pytest.raises(TimeoutError, pool.transcribe, clip, "hang", timeout=2))
+    busy.start()
+    time.sleep(0.2)
+
+    start = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        pool.transcribe(clip, timeout=0.3)
+    assert time.perf_counter() - start < 1
+    assert pool.stats()["queue_timeouts"] == 1
+    busy.join()
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
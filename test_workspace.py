@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+
+import pytest
+
+from src.workspace import PREFIX, SlotTimeout, WorkspacePool, process_alive
+
+# Each execution gets its own directory, never more than max_parallel at once, always cleaned up
+
+
+def test_workspaces_are_private_and_removed(tmp_path):
+    pool = WorkspacePool(max_parallel=2, directory=tmp_path)
+    with pool.workspace() as a, pool.workspace() as b:
+        assert a.path != b.path
+        a.write("practice_harness.py", "print('a')\n")
+        assert not os.path.exists(os.path.join(b.path, "practice_harness.py"))
+    try:
+        with pool.workspace() as c:
+            c.write("practice_harness.py", "")
+            raise RuntimeError("run failed")
+    except RuntimeError:
+        pass
+    assert os.listdir(tmp_path) == []
+
+
+def test_parallelism_is_capped(tmp_path):
+    pool = WorkspacePool(max_parallel=2, directory=tmp_path)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def run():
+        with pool.workspace():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=run) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = pool.stats()
+    assert peak[0] == 2 and stats["peak_active"] == 2
+    assert stats["created"] == 6 and stats["waited"] >= 1 and stats["active"] == 0
+
+
+def test_waiting_for_a_slot_is_bounded(tmp_path):
+    pool = WorkspacePool(max_parallel=1, directory=tmp_path, slot_timeout=0.1)
+    with pool.workspace():
+        with pytest.raises(SlotTimeout):
+            with pool.workspace():
+                pass
+    with pool.workspace():  # the slot is free again
+        pass
+    stats = pool.stats()
+    assert stats["slot_timeouts"] == 1 and stats["created"] == 2 and stats["active"] == 0
+
+
+def test_busy_slots_are_a_503(tmp_path, monkeypatch):
+    import server
+
+    pool = WorkspacePool(max_parallel=1, directory=tmp_path, slot_timeout=0.05)
+    monkeypatch.setattr(server, "workspaces", pool)
+    client = server.app.test_client()
+    with pool.workspace():
+        run = client.post("/api/run", json={"language": "python"})
+        verify = client.post("/api/practice/verify", json={
+            "code": "def f(x): return x", "function_name": "f", "test_cases": [{"input": {"x": 1}, "expected": 1}],
+        })
+    assert run.status_code == 503 and "slot" in run.get_json()["output"]
+    assert verify.status_code == 503 and "slot" in verify.get_json()["error"]
+    assert pool.stats()["slot_timeouts"] == 2
+
+
+def test_workspaces_of_dead_processes_are_swept(tmp_path):
+    stale = tmp_path / f"{PREFIX}999999999-abc"  # no such pid
+    live = tmp_path / f"{PREFIX}{os.getpid()}-abc"
+    stale.mkdir()
+    live.mkdir()
+    pool = WorkspacePool(directory=tmp_path)
+    with pool.workspace():
+        pass
+    assert not stale.exists() and live.exists()
+    assert pool.stats()["swept"] == 1
+
+
+def test_old_workspaces_are_swept_even_if_the_pid_is_alive(tmp_path):
+    reused = tmp_path / f"{PREFIX}{os.getppid()}-abc"  # a live process, but not the one that made it
+    reused.mkdir()
+    os.utime(reused, (time.time() - 7200, time.time() - 7200))
+    pool = WorkspacePool(directory=tmp_path, stale_seconds=3600)
+    with pool.workspace():
+        pass
+    assert not reused.exists()
+
+
+def test_process_alive():
+    assert process_alive(os.getpid())
+    assert not process_alive(999999999)
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))